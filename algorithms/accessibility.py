@@ -0,0 +1,376 @@
+"""
+Pathway accessibility of a room.
+This module rasterizes the placed objects once, computes a clearance map (the
+chessboard distance of every cell to the nearest object) and answers for all
+objects whether a pathway of a given width leads to them from the doors, with
+the results of the grid search it replaced.
+"""
+
+from collections import deque
+
+import numpy as np
+
+_NEIGHBOURS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def chessboard_clearance(occupied, cap):
+    """
+    Chessboard distance of every cell to the nearest occupied cell, capped at `cap`.
+
+    A cell at distance > r has no occupied cell in the (2r+1)x(2r+1) square
+    centered on it. Cells outside the grid count as free. The distance along
+    the first axis is found with two cumulative scans; the second axis is then
+    folded in with `cap` shifted copies.
+
+    Args:
+        occupied (np.ndarray): Boolean grid, True where the cell is occupied
+        cap (int): Largest distance of interest
+
+    Returns:
+        np.ndarray: Integer grid of distances, `cap` where no occupied cell is closer
+    """
+    grid_width, grid_depth = occupied.shape
+    far = cap + grid_width + grid_depth
+    rows = np.arange(grid_width)[:, None]
+    before = np.maximum.accumulate(np.where(occupied, rows, -far), axis=0)
+    after = np.minimum.accumulate(np.where(occupied, rows, far)[::-1], axis=0)[::-1]
+    along = np.minimum(np.minimum(rows - before, after - rows), cap)
+
+    clearance = along.copy()
+    for k in range(1, min(cap, grid_depth)):
+        np.minimum(clearance[:, k:], np.maximum(along[:, :-k], k), out=clearance[:, k:])
+        np.minimum(clearance[:, :-k], np.maximum(along[:, k:], k), out=clearance[:, :-k])
+    return clearance
+
+
+def _run_labels(mask):
+    """Label the runs of True cells along the second axis of a grid."""
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    return np.cumsum(starts.ravel()).reshape(mask.shape)
+
+
+def fill_from(mask, seeds, diagonal=True):
+    """
+    Cells of `mask` connected to the `seeds` cells (connected component labelling from seeds).
+
+    Reached cells spread over whole runs of mask cells along the rows and the
+    columns at once, alternating until nothing changes, so the number of rounds
+    is the number of turns of the longest path rather than its length.
+
+    Args:
+        mask (np.ndarray): Boolean grid of the cells that may be entered
+        seeds (np.ndarray): Boolean grid of the start cells; seeds outside `mask` are ignored
+        diagonal (bool): Whether cells touching at a corner are connected (8-connectivity)
+
+    Returns:
+        np.ndarray: Boolean grid, True for the reached cells
+    """
+    reached = seeds & mask
+    if not reached.any():
+        return reached
+    row_labels = _run_labels(mask)
+    column_labels = _run_labels(mask.T)
+    row_hit = np.zeros(int(row_labels[-1, -1]) + 1, dtype=bool)
+    column_hit = np.zeros(int(column_labels[-1, -1]) + 1, dtype=bool)
+    count = int(reached.sum())
+    while True:
+        row_hit[row_labels[reached]] = True
+        reached = mask & row_hit[row_labels]
+        column_hit[column_labels.T[reached]] = True
+        reached = mask & column_hit[column_labels].T
+        if diagonal:
+            grown = reached.copy()
+            grown[1:, 1:] |= reached[:-1, :-1]
+            grown[1:, :-1] |= reached[:-1, 1:]
+            grown[:-1, 1:] |= reached[1:, :-1]
+            grown[:-1, :-1] |= reached[1:, 1:]
+            reached = grown & mask
+        new_count = int(reached.sum())
+        if new_count == count:
+            return reached
+        count = new_count
+
+
+def label_components(mask):
+    """
+    Label the 8-connected components of the True cells of a grid.
+
+    The runs of cells along the rows are joined where they touch a run of the
+    next row, with a union-find over the runs rather than over the cells.
+
+    Args:
+        mask (np.ndarray): Boolean grid
+
+    Returns:
+        np.ndarray: Integer grid, the same positive label for the cells of a component and 0 outside `mask`
+    """
+    runs = _run_labels(mask)
+    parent = np.arange(int(runs[-1, -1]) + 1 if runs.size else 1)
+    upper, lower = mask[:-1], mask[1:]
+    pairs = []
+    for upper_columns, lower_columns in ((slice(None), slice(None)), (slice(None, -1), slice(1, None)),
+                                         (slice(1, None), slice(None, -1))):
+        touch = upper[:, upper_columns] & lower[:, lower_columns]
+        pairs.append(np.stack((runs[:-1, upper_columns][touch], runs[1:, lower_columns][touch]), axis=1))
+    for a, b in np.unique(np.concatenate(pairs), axis=0).tolist():
+        while parent[a] != a:
+            a = parent[a]
+        while parent[b] != b:
+            b = parent[b]
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    while True:
+        roots = parent[parent]
+        if np.array_equal(roots, parent):
+            break
+        parent = roots
+    return np.where(mask, parent[runs], 0)
+
+
+class AccessibilityMap:
+    """
+    Clearance map of a room for pathways of a given width.
+
+    Objects are rasterized once as in check_pathway_accessibility (a cell is
+    occupied from int(x) to int(x + depth) inclusive). A pathway cell needs a
+    free square of path_width around it, i.e. a clearance above path_width / 2.
+    The answers are those of the former A* search: an object is accessible when
+    a pathway from a door ends within 2 cells of one of its perimeter points,
+    the 3x3 cells around that point counting as free.
+
+    The pathway cells are labelled into connected components once, and a door
+    reaches the components its neighbouring cells lie in, so every target is
+    answered from that one labelling: freeing the cells around a target only
+    makes cells near it passable, which is resolved in a window around it.
+
+    Args:
+        room_width: Width of the room in cm (x axis)
+        room_depth: Depth of the room in cm (y axis)
+        rects: Object rectangles as (x, y, width, depth)
+        path_width: Minimum width of pathways in cm
+        resolution: Cell size in cm
+    """
+
+    def __init__(self, room_width, room_depth, rects, path_width=60, resolution=1):
+        self.resolution = resolution
+        self.grid_width = int(room_width / resolution) + 1
+        self.grid_depth = int(room_depth / resolution) + 1
+        self.path_radius = max(1, int(path_width / resolution) // 2)
+        self.rects = [tuple(rect) for rect in rects]
+        occupied = np.zeros((self.grid_width, self.grid_depth), dtype=bool)
+        for x, y, width, depth in self.rects:
+            start_x = max(0, int(x / resolution))
+            start_y = max(0, int(y / resolution))
+            end_x = min(self.grid_width, int((x + depth) / resolution) + 1)
+            end_y = min(self.grid_depth, int((y + width) / resolution) + 1)
+            occupied[start_x:end_x, start_y:end_y] = True
+        self.occupied = occupied
+        self.clearance = chessboard_clearance(occupied, self.path_radius + 1)
+        self.passable = self.clearance > self.path_radius
+        # Occupied cells of every [0, i) x [0, j) block, to count the cells of any square
+        self._summed = np.zeros((self.grid_width + 1, self.grid_depth + 1), dtype=np.int64)
+        self._summed[1:, 1:] = occupied.cumsum(0).cumsum(1)
+        self._labels = None
+        self._door_labels = {}
+        self._reached = {}
+        self._arrivals = {}
+
+    def door_cell(self, wall, door_x, door_y, door_width):
+        """Grid cell of the middle of a door, clamped to the grid."""
+        if wall in ("top", "bottom"):
+            center_x = 0 if wall == "top" else (self.grid_width - 1) * self.resolution
+            center_y = door_y + door_width / 2
+        else:
+            center_x = door_x + door_width / 2
+            center_y = 0 if wall == "left" else (self.grid_depth - 1) * self.resolution
+        cell_x = max(0, min(self.grid_width - 1, int(center_x / self.resolution)))
+        cell_y = max(0, min(self.grid_depth - 1, int(center_y / self.resolution)))
+        return cell_x, cell_y
+
+    def targets(self, index):
+        """Perimeter, corner and center cells of an object that a pathway may lead to."""
+        x, y, width, depth = self.rects[index]
+        res = self.resolution
+        spacing = max(5, min(10, int(min(width, depth) / 4)))
+        points = [(int(x / res), int((y + j) / res)) for j in range(0, int(width), spacing)]
+        points += [(int((x + depth) / res), int((y + j) / res)) for j in range(0, int(width), spacing)]
+        points += [(int((x + j) / res), int(y / res)) for j in range(0, int(depth), spacing)]
+        points += [(int((x + j) / res), int((y + width) / res)) for j in range(0, int(depth), spacing)]
+        points += [(int(x / res), int(y / res)), (int((x + depth) / res), int(y / res)),
+                   (int(x / res), int((y + width) / res)), (int((x + depth) / res), int((y + width) / res)),
+                   (int((x + depth / 2) / res), int((y + width / 2) / res))]
+        return sorted(set(points))
+
+    def _count(self, x0, x1, y0, y1):
+        """Occupied cells of the [x0, x1) x [y0, y1) blocks (arrays of bounds inside the grid)."""
+        summed = self._summed
+        return summed[x1, y1] - summed[x0, y1] - summed[x1, y0] + summed[x0, y0]
+
+    def _square_counts(self, xs, ys, target):
+        """Occupied cells in the pathway square of cells (xs, ys) once the 3x3 cells around `target` are freed."""
+        radius = self.path_radius
+        x0, x1 = np.maximum(xs - radius, 0), np.minimum(xs + radius + 1, self.grid_width)
+        y0, y1 = np.maximum(ys - radius, 0), np.minimum(ys + radius + 1, self.grid_depth)
+        counts = self._count(x0, x1, y0, y1)
+        fx0, fx1 = np.maximum(x0, target[0] - 1), np.minimum(x1, target[0] + 2)
+        fy0, fy1 = np.maximum(y0, target[1] - 1), np.minimum(y1, target[1] + 2)
+        overlap = (fx0 < fx1) & (fy0 < fy1)
+        if overlap.any():
+            counts = counts - np.where(overlap, self._count(np.where(overlap, fx0, 0), np.where(overlap, fx1, 0),
+                                                            np.where(overlap, fy0, 0), np.where(overlap, fy1, 0)), 0)
+        return counts
+
+    @staticmethod
+    def _box(center, reach, limit):
+        return max(0, center - reach), min(limit, center + reach + 1)
+
+    @property
+    def labels(self):
+        """Connected components of the pathway cells, see label_components."""
+        if self._labels is None:
+            self._labels = label_components(self.passable)
+        return self._labels
+
+    def door_labels(self, door_cell):
+        """Components of the pathway cells next to a door cell, the ones a pathway from it can enter."""
+        labels = self._door_labels.get(door_cell)
+        if labels is None:
+            labels = np.zeros(0, dtype=self.labels.dtype)
+            if not self.occupied[door_cell]:
+                x0, x1 = self._box(door_cell[0], 1, self.grid_width)
+                y0, y1 = self._box(door_cell[1], 1, self.grid_depth)
+                labels = np.unique(self.labels[x0:x1, y0:y1])
+                labels = labels[labels > 0]
+            self._door_labels[door_cell] = labels
+        return labels
+
+    def reachable(self, door_cells):
+        """Pathway cells reachable from the given door cells (cached per set of doors)."""
+        key = tuple(sorted(set(door_cells)))
+        reached = self._reached.get(key)
+        if reached is None:
+            labels = [self.door_labels(door_cell) for door_cell in key]
+            reached = np.isin(self.labels, np.concatenate(labels) if labels else [])
+            for cell_x, cell_y in key:
+                if not self.occupied[cell_x, cell_y]:
+                    reached[cell_x, cell_y] = True
+            self._reached[key] = reached
+        return reached
+
+    def _freed_passable(self, target, x0, x1, y0, y1):
+        """Pathway cells of the [x0, x1) x [y0, y1) block once the 3x3 cells around `target` are freed."""
+        passable = self.passable[x0:x1, y0:y1].copy()
+        # Only cells whose pathway square overlaps the freed cells change
+        reach = self.path_radius + 1
+        fx0, fx1 = self._box(target[0], reach, self.grid_width)
+        fy0, fy1 = self._box(target[1], reach, self.grid_depth)
+        fx0, fx1, fy0, fy1 = max(fx0, x0), min(fx1, x1), max(fy0, y0), min(fy1, y1)
+        xs, ys = np.meshgrid(np.arange(fx0, fx1), np.arange(fy0, fy1), indexing="ij")
+        passable[fx0 - x0:fx1 - x0, fy0 - y0:fy1 - y0] = self._square_counts(xs, ys, target) == 0
+        return passable
+
+    def arrives(self, door_cell, target):
+        """
+        Whether a pathway from a door cell ends within 2 cells of `target`, the 3x3 cells around it counting as free.
+
+        The arrival cells are checked first with block counts. When the freed
+        cells were free already, the components the door reaches answer it.
+        Otherwise the newly passable cells lie in a window around the target:
+        a fill of that window, starting from the door's components, takes in
+        every other component it touches until it arrives or runs out.
+        """
+        key = (door_cell, target)
+        if key in self._arrivals:
+            return self._arrivals[key]
+        result = False
+        tx, ty = target
+        if (0 <= tx < self.grid_width and 0 <= ty < self.grid_depth and not self.occupied[door_cell]):
+            ax0, ax1 = self._box(tx, 2, self.grid_width)
+            ay0, ay1 = self._box(ty, 2, self.grid_depth)
+            xs, ys = np.meshgrid(np.arange(ax0, ax1), np.arange(ay0, ay1), indexing="ij")
+            if ax0 <= door_cell[0] < ax1 and ay0 <= door_cell[1] < ay1:
+                result = True
+            elif (self._square_counts(xs, ys, target) == 0).any():
+                door_labels = self.door_labels(door_cell)
+                if not self.occupied[max(0, tx - 1):tx + 2, max(0, ty - 1):ty + 2].any():
+                    result = bool(np.isin(self.labels[ax0:ax1, ay0:ay1], door_labels).any())
+                else:
+                    result = self._arrives_in_window(door_cell, target, door_labels, (ax0, ax1, ay0, ay1))
+        self._arrivals[key] = result
+        return result
+
+    def _arrives_in_window(self, door_cell, target, door_labels, arrival):
+        # One cell beyond the changed cells, so that leaving the window always goes through a labelled cell
+        reach = self.path_radius + 2
+        wx0, wx1 = self._box(target[0], reach, self.grid_width)
+        wy0, wy1 = self._box(target[1], reach, self.grid_depth)
+        passable = self._freed_passable(target, wx0, wx1, wy0, wy1)
+        labels = self.labels[wx0:wx1, wy0:wy1]
+        seeds = np.isin(labels, door_labels)
+        # The door's own neighbours may only have been freed now
+        sx0, sx1 = self._box(door_cell[0], 1, self.grid_width)
+        sy0, sy1 = self._box(door_cell[1], 1, self.grid_depth)
+        seeds[max(0, sx0 - wx0):max(0, sx1 - wx0), max(0, sy0 - wy0):max(0, sy1 - wy0)] = True
+        ax0, ax1, ay0, ay1 = arrival
+        known = set(door_labels.tolist())
+        while True:
+            reached = fill_from(passable, seeds)
+            if reached[ax0 - wx0:ax1 - wx0, ay0 - wy0:ay1 - wy0].any():
+                return True
+            # Components entered in the window lead on to their cells elsewhere in it
+            found = set(np.unique(labels[reached]).tolist()) - known - {0}
+            if not found:
+                return False
+            known |= found
+            seeds = reached | np.isin(labels, list(found))
+
+    def accessible_objects(self, door_cells):
+        """Indexes of the objects a pathway from any of the door cells leads to."""
+        accessible = set()
+        for index in range(len(self.rects)):
+            targets = self.targets(index)
+            if any(self.arrives(door_cell, target) for door_cell in door_cells for target in targets):
+                accessible.add(index)
+        return accessible
+
+    def _reached_towards(self, door_cell, target):
+        """Pathway cells reachable from a door cell once the 3x3 cells around `target` are freed."""
+        tx, ty = target
+        if not self.occupied[max(0, tx - 1):tx + 2, max(0, ty - 1):ty + 2].any():
+            return self.reachable([door_cell])
+        passable = self._freed_passable(target, 0, self.grid_width, 0, self.grid_depth)
+        seeds = np.zeros_like(passable)
+        seeds[max(0, door_cell[0] - 1):door_cell[0] + 2, max(0, door_cell[1] - 1):door_cell[1] + 2] = True
+        return fill_from(passable, seeds)
+
+    def path(self, door_cell, index):
+        """
+        Shortest pathway (8-connected cells) from a door cell to an object, for drawing.
+
+        Returns:
+            list: Cells from the door to the object, empty if the object is not accessible
+        """
+        for target in self.targets(index):
+            if not self.arrives(door_cell, target):
+                continue
+            reached = self._reached_towards(door_cell, target)
+            x0, x1 = self._box(target[0], 2, self.grid_width)
+            y0, y1 = self._box(target[1], 2, self.grid_depth)
+            came_from = {door_cell: None}
+            queue = deque([door_cell])
+            while queue:
+                current = queue.popleft()
+                if x0 <= current[0] < x1 and y0 <= current[1] < y1:
+                    path = []
+                    while current is not None:
+                        path.append(current)
+                        current = came_from[current]
+                    return path[::-1]
+                for dx, dy in _NEIGHBOURS:
+                    neighbour = (current[0] + dx, current[1] + dy)
+                    if (0 <= neighbour[0] < self.grid_width and 0 <= neighbour[1] < self.grid_depth
+                            and neighbour not in came_from and reached[neighbour]):
+                        came_from[neighbour] = current
+                        queue.append(neighbour)
+        return []
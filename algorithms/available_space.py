@@ -1,6 +1,10 @@
 import numpy as np
 import time
-def check_enclosed_spaces(spaces_dict, room_width, room_depth, min_distance=60, door_position=None):
+
+from algorithms.accessibility import fill_from
+
+
+def check_enclosed_spaces(spaces_dict, room_width, room_depth, min_distance=60, door_position=None, occupancy=None):
     """
     Check if there are any enclosed/inaccessible spaces in the room using flood-fill.
     
@@ -15,6 +19,8 @@ def check_enclosed_spaces(spaces_dict, room_width, room_depth, min_distance=60,
         min_distance (int, optional): Minimum distance threshold (legacy parameter). Defaults to 60.
         door_position (tuple, optional): Door position as (wall, x, y, width) where wall is 'top'/'bottom'/'left'/'right'.
                                          If None, starts from all room edges.
+        occupancy (OccupancyGrid, optional): Cached occupancy of the layout; the available spaces
+                                             are read from it instead of spaces_dict.
     
     Returns:
         bool: True if enclosed/inaccessible spaces detected, False otherwise.
@@ -25,133 +31,104 @@ def check_enclosed_spaces(spaces_dict, room_width, room_depth, min_distance=60,
         >>> check_enclosed_spaces(spaces, 300, 200, door_position=door_pos)
         False  # All spaces are accessible from door
     """
+    if occupancy is not None:
+        spaces_dict = occupancy.available_spaces()
+
     # Early return if no spaces
     if len(spaces_dict) < 1:
         return False
     
-    # Create a grid (1 = free space, 0 = occupied/object)
+    # Create a grid (True = free space, False = occupied/object)
     # Use 5cm grid cells for better accuracy
     grid_size = 5
     grid_width = int(room_width // grid_size)
     grid_depth = int(room_depth // grid_size)
     
-    # Initialize grid as all occupied
-    grid = [[0 for _ in range(grid_depth)] for _ in range(grid_width)]
-    
-    # Mark available spaces as free (1)
+    # Mark available spaces as free, everything else as occupied
+    free = np.zeros((grid_width, grid_depth), dtype=bool)
     for space in spaces_dict:
         x, y, width, depth = space
         start_x = max(0, int(x // grid_size))
         start_y = max(0, int(y // grid_size))
         end_x = min(grid_width, int((x + depth) // grid_size))
         end_y = min(grid_depth, int((y + width) // grid_size))
-        
-        for i in range(start_x, end_x):
-            for j in range(start_y, end_y):
-                grid[i][j] = 1
+        free[start_x:end_x, start_y:end_y] = True
     
-    # Count total free cells
-    total_free = sum(sum(row) for row in grid)
-    
-    if total_free == 0:
+    if not free.any():
         return False  # No free space at all
     
-    # Flood-fill from door or edges to mark reachable spaces
-    visited = [[False for _ in range(grid_depth)] for _ in range(grid_width)]
-    
-    def flood_fill(x, y):
-        """Flood-fill to mark all reachable free spaces."""
-        if x < 0 or x >= grid_width or y < 0 or y >= grid_depth:
-            return
-        if visited[x][y] or grid[x][y] == 0:
-            return
-        
-        # Use iterative approach to avoid stack overflow
-        stack = [(x, y)]
-        
-        while stack:
-            cx, cy = stack.pop()
-            
-            if cx < 0 or cx >= grid_width or cy < 0 or cy >= grid_depth:
-                continue
-            if visited[cx][cy] or grid[cx][cy] == 0:
-                continue
-            
-            visited[cx][cy] = True
-            
-            # Add neighbors to stack (4-directional connectivity)
-            stack.append((cx + 1, cy))
-            stack.append((cx - 1, cy))
-            stack.append((cx, cy + 1))
-            stack.append((cx, cy - 1))
-    
-    # Determine starting points for flood-fill
+    # Flood-fill (4-directional) from door or edges to mark reachable spaces
     if door_position:
         # Start from door location (more accurate)
-        wall, door_x, door_y, door_width = door_position
-        
-        # Convert door position to grid coordinates and find starting cells
-        if wall == 'top':
-            # Door on top wall (x=0)
-            start_y = int(door_y // grid_size)
-            end_y = int((door_y + door_width) // grid_size)
-            for y in range(max(0, start_y), min(grid_depth, end_y + 1)):
-                if grid[0][y] == 1:
-                    flood_fill(0, y)
-        elif wall == 'bottom':
-            # Door on bottom wall (x=room_width)
-            start_y = int(door_y // grid_size)
-            end_y = int((door_y + door_width) // grid_size)
-            for y in range(max(0, start_y), min(grid_depth, end_y + 1)):
-                if grid[grid_width - 1][y] == 1:
-                    flood_fill(grid_width - 1, y)
-        elif wall == 'left':
-            # Door on left wall (y=0)
-            start_x = int(door_x // grid_size)
-            end_x = int((door_x + door_width) // grid_size)
-            for x in range(max(0, start_x), min(grid_width, end_x + 1)):
-                if grid[x][0] == 1:
-                    flood_fill(x, 0)
-        elif wall == 'right':
-            # Door on right wall (y=room_depth)
-            start_x = int(door_x // grid_size)
-            end_x = int((door_x + door_width) // grid_size)
-            for x in range(max(0, start_x), min(grid_width, end_x + 1)):
-                if grid[x][grid_depth - 1] == 1:
-                    flood_fill(x, grid_depth - 1)
+        seeds = _door_cells(free.shape, grid_size, [door_position])
     else:
         # Fallback: Start flood-fill from all edges
-        # Top edge (x=0)
-        for y in range(grid_depth):
-            if grid[0][y] == 1 and not visited[0][y]:
-                flood_fill(0, y)
-        
-        # Bottom edge (x=grid_width-1)
-        for y in range(grid_depth):
-            if grid[grid_width - 1][y] == 1 and not visited[grid_width - 1][y]:
-                flood_fill(grid_width - 1, y)
-        
-        # Left edge (y=0)
-        for x in range(grid_width):
-            if grid[x][0] == 1 and not visited[x][0]:
-                flood_fill(x, 0)
-        
-        # Right edge (y=grid_depth-1)
-        for x in range(grid_width):
-            if grid[x][grid_depth - 1] == 1 and not visited[x][grid_depth - 1]:
-                flood_fill(x, grid_depth - 1)
+        seeds = _edge_cells(free.shape)
+    reached = fill_from(free, seeds, diagonal=False)
     
-    # Check if there are any unvisited free spaces (enclosed areas)
-    for x in range(grid_width):
-        for y in range(grid_depth):
-            if grid[x][y] == 1 and not visited[x][y]:
-                # Found an enclosed space that's not reachable from door/edges
-                return True
-    
-    return False
+    # Any free cell that is not reachable from door/edges is an enclosed space
+    return bool((free & ~reached).any())
+
+
+def _door_cells(shape, grid_size, doors):
+    """Cells along the given (wall, x, y, width) door segments on their walls."""
+    grid_width, grid_depth = shape
+    cells = np.zeros(shape, dtype=bool)
+    for wall, door_x, door_y, door_width in doors:
+        if wall in ('top', 'bottom'):
+            row = 0 if wall == 'top' else grid_width - 1
+            start = max(0, int(door_y // grid_size))
+            end = min(grid_depth, int((door_y + door_width) // grid_size) + 1)
+            if grid_width and start < end:
+                cells[row, start:end] = True
+        elif wall in ('left', 'right'):
+            column = 0 if wall == 'left' else grid_depth - 1
+            start = max(0, int(door_x // grid_size))
+            end = min(grid_width, int((door_x + door_width) // grid_size) + 1)
+            if grid_depth and start < end:
+                cells[start:end, column] = True
+    return cells
+
+
+def _edge_cells(shape):
+    """Cells along the four walls of a grid."""
+    cells = np.zeros(shape, dtype=bool)
+    cells[[0, -1], :] = True
+    cells[:, [0, -1]] = True
+    return cells
+
+
+def _pathway_cells(occupied, min_cells, both_ways=False):
+    """
+    Free cells with a pathway clearance, same rule as the former cell-by-cell scan.
+
+    A cell qualifies when the `min_cells` cells just before it along either
+    axis are inside the grid and free. With `both_ways`, the free cells after
+    it count as well: a cell qualifies when the run of free cells through it
+    along either axis is longer than `min_cells`.
+    """
+    free = ~occupied
+    pathway = np.zeros_like(free)
+    if min_cells <= 0:
+        return free
+    for axis in (0, 1):
+        cells = np.moveaxis(free, axis, 1)
+        index = np.arange(cells.shape[1])
+        # Length of the run of free cells ending at every cell
+        last_blocked = np.maximum.accumulate(np.where(cells, -1, index), axis=1)
+        run = index - last_blocked
+        if both_ways:
+            size = cells.shape[1]
+            next_blocked = np.minimum.accumulate(np.where(cells, size, index)[:, ::-1], axis=1)[:, ::-1]
+            clear = run + (next_blocked - index) - 1 > min_cells
+        else:
+            clear = np.zeros_like(cells)
+            clear[:, 1:] = run[:, :-1] >= min_cells
+        pathway |= np.moveaxis(clear, 1, axis)
+    return pathway & free
 
 
-def check_corner_accessibility(placed_objects, room_width, room_depth, min_path_width=60):
+def check_corner_accessibility(placed_objects, room_width, room_depth, min_path_width=60, occupancy=None):
     """
     Check if all room corners are either occupied by objects or accessible via adequate pathways.
     
@@ -164,6 +141,8 @@ def check_corner_accessibility(placed_objects, room_width, room_depth, min_path_
         room_width (int): Room width in cm
         room_depth (int): Room depth in cm
         min_path_width (int): Minimum pathway width in cm (default: 60)
+        occupancy (OccupancyGrid, optional): Cached occupancy of the layout, read instead of
+                                             rasterizing the objects again
     
     Returns:
         tuple: (all_corners_valid: bool, corner_status: dict)
@@ -216,7 +195,7 @@ def check_corner_accessibility(placed_objects, room_width, room_depth, min_path_
         # Corner is empty, check if it's reachable with adequate pathway
         # Use flood-fill with minimum width constraint
         is_reachable = _check_corner_reachable_with_width(
-            corner_rect, placed_objects, room_width, room_depth, min_path_width
+            corner_rect, placed_objects, room_width, room_depth, min_path_width, occupancy
         )
         
         if is_reachable:
@@ -236,7 +215,7 @@ def check_corner_accessibility(placed_objects, room_width, room_depth, min_path_
     return all_valid, corner_status
 
 
-def _check_corner_reachable_with_width(corner_rect, placed_objects, room_width, room_depth, min_width):
+def _check_corner_reachable_with_width(corner_rect, placed_objects, room_width, room_depth, min_width, occupancy=None):
     """
     Helper function to check if a corner is reachable via a pathway of minimum width.
     
@@ -247,105 +226,97 @@ def _check_corner_reachable_with_width(corner_rect, placed_objects, room_width,
     grid_width = int(room_width // grid_size)
     grid_depth = int(room_depth // grid_size)
     
-    # Create occupancy grid
-    grid = [[0 for _ in range(grid_depth)] for _ in range(grid_width)]
-    
-    # Mark occupied cells
-    for obj_entry in placed_objects:
-        obj = obj_entry['object']
-        ox, oy = obj.position
-        ow, od = obj.width, obj.depth
-        shadow = obj.shadow if hasattr(obj, 'shadow') else (0, 0, 0, 0)
-        s_top, s_left, s_right, s_bottom = shadow
-        
-        # Include shadow space
-        start_x = max(0, int((ox - s_top) // grid_size))
-        start_y = max(0, int((oy - s_left) // grid_size))
-        end_x = min(grid_width, int((ox + od + s_bottom) // grid_size))
-        end_y = min(grid_depth, int((oy + ow + s_right) // grid_size))
-        
-        for i in range(start_x, end_x):
-            for j in range(start_y, end_y):
-                grid[i][j] = 1  # Occupied
+    # Create occupancy grid (True = occupied, shadow space included)
+    if occupancy is not None:
+        grid = occupancy.downsample(grid_size, include_shadows=True)
+    else:
+        grid = rasterize_objects(placed_objects, (room_width, room_depth), grid_size, include_shadows=True)
     
-    # Create accessibility grid considering minimum width
     # A cell is accessible if it has min_width clearance in at least one direction
-    accessible = [[False for _ in range(grid_depth)] for _ in range(grid_width)]
-    min_cells = int(min_width // grid_size)
-    
-    for x in range(grid_width):
-        for y in range(grid_depth):
-            if grid[x][y] == 1:  # Occupied cell
-                continue
-            
-            # Check if there's enough clearance in any direction
-            # Check horizontal clearance (left-right)
-            h_clear = 0
-            for dy in range(-min_cells, min_cells + 1):
-                ny = y + dy
-                if 0 <= ny < grid_depth and grid[x][ny] == 0:
-                    h_clear += 1
-                else:
-                    break
-            
-            # Check vertical clearance (top-bottom)
-            v_clear = 0
-            for dx in range(-min_cells, min_cells + 1):
-                nx = x + dx
-                if 0 <= nx < grid_width and grid[nx][y] == 0:
-                    v_clear += 1
-                else:
-                    break
-            
-            # Cell is accessible if either direction has enough clearance
-            if h_clear >= min_cells or v_clear >= min_cells:
-                accessible[x][y] = True
+    accessible = _pathway_cells(grid, int(min_width // grid_size))
     
     # Get corner grid position
     cx, cy, cw, cd = corner_rect
     corner_grid_x = int((cx + cd / 2) // grid_size)
     corner_grid_y = int((cy + cw / 2) // grid_size)
     
-    # Flood-fill from room edges through accessible cells
-    visited = [[False for _ in range(grid_depth)] for _ in range(grid_width)]
-    
-    def flood_fill(x, y):
-        if x < 0 or x >= grid_width or y < 0 or y >= grid_depth:
-            return
-        if visited[x][y] or not accessible[x][y]:
-            return
-        
-        stack = [(x, y)]
-        while stack:
-            cx, cy = stack.pop()
-            if cx < 0 or cx >= grid_width or cy < 0 or cy >= grid_depth:
-                continue
-            if visited[cx][cy] or not accessible[cx][cy]:
-                continue
-            
-            visited[cx][cy] = True
-            stack.extend([(cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)])
-    
-    # Start flood-fill from all edges
-    for y in range(grid_depth):
-        if accessible[0][y]:
-            flood_fill(0, y)
-        if accessible[grid_width - 1][y]:
-            flood_fill(grid_width - 1, y)
-    
-    for x in range(grid_width):
-        if accessible[x][0]:
-            flood_fill(x, 0)
-        if accessible[x][grid_depth - 1]:
-            flood_fill(x, grid_depth - 1)
-    
-    # Check if corner is reachable
+    # Check if corner is reachable by a flood-fill from the room edges through accessible cells
     if 0 <= corner_grid_x < grid_width and 0 <= corner_grid_y < grid_depth:
-        return visited[corner_grid_x][corner_grid_y]
+        if not accessible[corner_grid_x, corner_grid_y]:
+            return False
+        return bool(fill_from(accessible, _edge_cells(accessible.shape), diagonal=False)[corner_grid_x, corner_grid_y])
     
     return False
 
 
+def space_accessibility(occupied, grid_size, doors=None, corner_size=30, min_path_width=60):
+    """
+    Enclosed-space and corner-accessibility checks of a layout from one occupancy mask.
+
+    Pathway cells are the free cells on a run of free cells longer than
+    min_path_width along either axis. A single flood-fill from the doors
+    (from the room edges when there are none) over them serves both checks:
+    pathway cells it does not reach are enclosed space, and every corner has
+    to be either occupied or reached.
+
+    This is the rule of the scoring function. It differs from the standalone
+    check_enclosed_spaces / check_corner_accessibility on many layouts:
+
+    - Only pathway cells count as space. A free pocket too narrow to walk
+      into is not enclosed space here, where check_enclosed_spaces (5 cm
+      grid, every free cell) reports it.
+    - Space and corners must be reached from a door, through all doors at
+      once; check_corner_accessibility fills from the room edges, so a
+      corner behind a row of objects still counts as reachable there.
+    - Object footprints block the way, without their shadows, and a corner
+      is occupied when any of its grid cells is; check_corner_accessibility
+      blocks shadows too and tests the corner rectangle exactly.
+    - The clearance of a cell is counted towards both walls of each axis,
+      where check_corner_accessibility counts it towards the top and left
+      walls only and so never reaches an empty top-left corner.
+
+    The scoring function reports these terms without adding them to the
+    total score, see BathroomScoringFunction._finish_score.
+
+    Args:
+        occupied (np.ndarray): Boolean grid of the object footprints, True where occupied
+        grid_size (int): Size of the grid cell in cm
+        doors (list, optional): Doors as (wall, x, y, width)
+        corner_size (int): Size of the corner area in cm
+        min_path_width (int): Minimum pathway width in cm
+
+    Returns:
+        tuple: (has_enclosed, corners_valid)
+    """
+    grid_width, grid_depth = occupied.shape
+    if grid_width == 0 or grid_depth == 0:
+        return False, True
+    pathway = _pathway_cells(occupied, int(min_path_width // grid_size), both_ways=True)
+    if doors:
+        # The door cells themselves need no clearance, the way into the room does
+        seeds = _door_cells(occupied.shape, grid_size, doors) & ~occupied
+    else:
+        seeds = _edge_cells(occupied.shape) & pathway
+    reached = fill_from(pathway | seeds, seeds, diagonal=False)
+    has_enclosed = bool((pathway & ~reached).any())
+
+    size = max(1, int(corner_size // grid_size))
+    middle = int((corner_size / 2) // grid_size)
+    corners_valid = True
+    for rows, columns, cell in (
+            (slice(0, size), slice(0, size), (middle, middle)),
+            (slice(0, size), slice(grid_depth - size, grid_depth), (middle, grid_depth - 1 - middle)),
+            (slice(grid_width - size, grid_width), slice(0, size), (grid_width - 1 - middle, middle)),
+            (slice(grid_width - size, grid_width), slice(grid_depth - size, grid_depth),
+             (grid_width - 1 - middle, grid_depth - 1 - middle))):
+        if occupied[rows, columns].any():
+            continue
+        if not (0 <= cell[0] < grid_width and 0 <= cell[1] < grid_depth and reached[cell]):
+            corners_valid = False
+            break
+    return has_enclosed, corners_valid
+
+
 def get_enclosed_spaces_debug_info(spaces_dict, room_width, room_depth):
     """
     Get detailed information about enclosed spaces for debugging/visualization.
@@ -438,7 +409,168 @@ def get_enclosed_spaces_debug_info(spaces_dict, room_width, room_depth):
     }
 
 
-def identify_available_space(placed_obj, room_sizes, grid_size=1, windows_doors=[]):
+def rasterize_objects(placed_obj, room_sizes, grid_size=1, include_shadows=False):
+    """
+    Paint placed objects onto a boolean occupancy grid.
+
+    Args:
+        placed_obj (list): List of placed object entries with an 'object' key.
+        room_sizes (tuple): Room dimensions as (width, depth).
+        grid_size (int): Size of the grid cell in cm.
+        include_shadows (bool): Whether to paint the shadow space around the objects too.
+
+    Returns:
+        np.ndarray: Boolean array of shape (width // grid_size, depth // grid_size), True where occupied.
+    """
+    room_width, room_depth = room_sizes[:2]
+    grid_width = int(room_width // grid_size)
+    grid_depth = int(room_depth // grid_size)
+    occupied = np.zeros((grid_width, grid_depth), dtype=bool)
+    for obj in placed_obj:
+        paint_object(occupied, obj['object'], grid_size, include_shadows)
+    return occupied
+
+
+def paint_object(grid, obj, grid_size=1, include_shadows=False):
+    """Mark the footprint (optionally with shadow) of a placed object as occupied on a boolean grid."""
+    grid_width, grid_depth = grid.shape
+    width = float(obj.width)
+    depth = float(obj.depth)
+    x, y = float(obj.position[0]), float(obj.position[1])
+    shadow_top, shadow_left, shadow_right, shadow_bottom = obj.shadow
+
+    if include_shadows:
+        start_x = max(0, int((x - shadow_top) // grid_size))
+        start_y = max(0, int((y - shadow_left) // grid_size))
+        end_x = min(grid_width, int((x + depth + shadow_bottom) // grid_size))
+        end_y = min(grid_depth, int((y + width + shadow_right) // grid_size))
+    else:
+        start_x = max(0, int(x // grid_size))
+        start_y = max(0, int(y // grid_size))
+        end_x = min(grid_width, int((x + depth) // grid_size))
+        end_y = min(grid_depth, int((y + width) // grid_size))
+    if start_x < end_x and start_y < end_y:
+        grid[start_x:end_x, start_y:end_y] = True
+
+
+def decompose_free_space(free):
+    """
+    Split the free cells of a grid into rectangles.
+
+    Produces exactly the rectangles of the cell-by-cell ``find_contiguous_space``
+    scan: cells are visited in row-major order and every unvisited free cell
+    starts a rectangle that first grows along the row, then over the following
+    rows while they are free across the whole span. Run lengths are computed
+    for the whole grid at once, so the Python loop only runs once per rectangle.
+
+    Args:
+        free (np.ndarray): Boolean grid, True where the cell is free.
+
+    Returns:
+        list: Rectangles as (start_x, start_y, end_x, end_y) cell indices, ends exclusive.
+    """
+    grid_width, grid_depth = free.shape
+    if grid_width == 0 or grid_depth == 0:
+        return []
+    # run[i, j] = number of consecutive free cells starting at (i, j) along the row
+    columns = np.arange(grid_depth)
+    next_blocked = np.where(free, grid_depth, columns)
+    next_blocked = np.minimum.accumulate(next_blocked[:, ::-1], axis=1)[:, ::-1]
+    run = next_blocked - columns
+
+    remaining = free.copy()
+    rectangles = []
+    for i in range(grid_width):
+        starts = remaining[i].nonzero()[0].tolist()
+        k = 0
+        while k < len(starts):
+            j = starts[k]
+            span = int(run[i, j])
+            end_y = j + span
+            # Grow downwards while the next row is free over the whole span
+            short = run[i + 1:, j] < span
+            first_short = int(short.argmax()) if short.size else 0
+            end_x = i + 1 + (first_short if short.size and short[first_short] else grid_width - i - 1)
+            remaining[i:end_x, j:end_y] = False
+            rectangles.append((i, j, end_x, end_y))
+            while k < len(starts) and starts[k] < end_y:
+                k += 1
+    return rectangles
+
+
+def _spaces_from_free(free, grid_size):
+    """Convert the free cells of a grid into available space rectangles of at least 30x30 cm."""
+    available_spaces = []
+    for start_x, start_y, end_x, end_y in decompose_free_space(free):
+        x = float(start_x * grid_size)
+        y = float(start_y * grid_size)
+        width = float((end_y - start_y) * grid_size)
+        depth = float((end_x - start_x) * grid_size)
+        if width >= 30 and depth >= 30:
+            available_spaces.append((x, y, width, depth))
+    return available_spaces
+
+
+class OccupancyGrid:
+    """
+    Occupancy bitmaps of a layout: object footprints, and footprints including shadows.
+
+    Grids are immutable once built; ``with_objects`` derives a child grid by copying
+    the bitmaps and painting only the newly placed objects, which is how a layout
+    inherits its parent's occupancy along the beam (see ``Bathroom.get_occupancy``).
+    """
+
+    def __init__(self, room_sizes, grid_size=1):
+        room_width, room_depth = room_sizes[:2]
+        self.room_sizes = (room_width, room_depth)
+        self.grid_size = grid_size
+        shape = (int(room_width // grid_size), int(room_depth // grid_size))
+        self.objects = np.zeros(shape, dtype=bool)
+        self.shadows = np.zeros(shape, dtype=bool)
+        self._available_spaces = None
+
+    @classmethod
+    def from_objects(cls, placed_obj, room_sizes, grid_size=1):
+        """Rasterize all placed objects from scratch."""
+        return cls(room_sizes, grid_size).with_objects(placed_obj)
+
+    def with_objects(self, placed_obj):
+        """Return a new grid with the given placed objects painted on top of this one."""
+        grid = OccupancyGrid.__new__(OccupancyGrid)
+        grid.room_sizes = self.room_sizes
+        grid.grid_size = self.grid_size
+        grid.objects = self.objects.copy()
+        grid.shadows = self.shadows.copy()
+        grid._available_spaces = None
+        for obj in placed_obj:
+            paint_object(grid.objects, obj['object'], grid.grid_size, include_shadows=False)
+            paint_object(grid.shadows, obj['object'], grid.grid_size, include_shadows=True)
+        return grid
+
+    def available_spaces(self):
+        """Available space rectangles without shadows, as returned by ``identify_available_space``."""
+        if self._available_spaces is None:
+            self._available_spaces = _spaces_from_free(~self.objects, self.grid_size)
+        return self._available_spaces
+
+    def downsample(self, cell_size, include_shadows=False):
+        """
+        Occupancy at a coarser cell size.
+
+        Picking the last fine cell of every coarse cell gives exactly the grid that
+        rasterizing the objects directly at ``cell_size`` would produce.
+        """
+        grid = self.shadows if include_shadows else self.objects
+        factor = int(cell_size // self.grid_size)
+        if factor <= 1:
+            return grid
+        room_width, room_depth = self.room_sizes
+        end_x = int(room_width // cell_size) * factor
+        end_y = int(room_depth // cell_size) * factor
+        return grid[factor - 1:end_x:factor, factor - 1:end_y:factor]
+
+
+def identify_available_space(placed_obj, room_sizes, grid_size=1, windows_doors=[], occupancy=None):
     """
     Identifies available space in a room after objects have been placed.
     Returns both with and without shadow.
@@ -448,76 +580,19 @@ def identify_available_space(placed_obj, room_sizes, grid_size=1, windows_doors=
         room_sizes (tuple): Room dimensions as (width, depth).
         grid_size (int): Size of the grid cell in cm.
         windows_doors (list): List of windows and doors.
+        occupancy (OccupancyGrid, optional): Cached occupancy of the placed objects; used instead of
+            rasterizing them again when its grid size matches.
     Returns:
         dict: {'with_shadow': [...], 'without_shadow': [...]} available spaces as (x, y, width, depth) tuples.
     """
-    def _find_spaces(include_shadows):
-        #check time 
+    if occupancy is not None and occupancy.grid_size == grid_size:
+        return {
+            'without_shadow': list(occupancy.available_spaces())
+        }
 
-        room_width, room_depth = room_sizes
-        # Convert to int for grid calculations
-        grid_width = int(room_width // grid_size)
-        grid_depth = int(room_depth // grid_size)
-        grid = [[1 for _ in range(grid_depth)] for _ in range(grid_width)]
-        
-        # Mark occupied spaces
-        for obj in placed_obj:
-            name = obj['object'].name
-            width = float(obj['object'].width)
-            depth = float(obj['object'].depth)
-            height = float(obj['object'].height)
-            shadow = obj['object'].shadow
-            position = obj['object'].position
-            wall = obj['object'].wall
-            x, y = float(position[0]), float(position[1])
-            shadow_top, shadow_left, shadow_right, shadow_bottom = shadow
-            
-            if include_shadows:
-                start_x = max(0, int((x - shadow_top) // grid_size))
-                start_y = max(0, int((y - shadow_left) // grid_size))
-                end_x = min(grid_width, int((x + depth + shadow_bottom) // grid_size))
-                end_y = min(grid_depth, int((y + width + shadow_right) // grid_size))
-            else:
-                start_x = max(0, int(x // grid_size))
-                start_y = max(0, int(y // grid_size))
-                end_x = min(grid_width, int((x + depth) // grid_size))
-                end_y = min(grid_depth, int((y + width) // grid_size))
-                
-            for i in range(start_x, end_x):
-                for j in range(start_y, end_y):
-                    grid[i][j] = 0
-        # if include_shadows:
-        #     for i in windows_doors:
-        #         id_, wall, x, y,  width, height, parapet, way, hinge = i
-        #         start_x = max(0, int(float(x) // grid_size))
-        #         start_y = max(0, int(float(y) // grid_size))
-        #         end_x = min(grid_width, int((float(x) + float(width)) // grid_size))
-        #         end_y = min(grid_depth, int((float(y) + float(width)) // grid_size))
-        #         if wall == "right":
-        #             end_y = start_y
-        #             start_y = max(0, int(start_y - float(width) // grid_size))
-        #         if wall == "bottom":
-        #             end_x = start_x
-        #             start_x = max(0, int(start_x - float(width) // grid_size))
-        #         for i in range(start_x, end_x):
-        #             for j in range(start_y, end_y):
-        #                 grid[i][j] = 0
-        available_spaces = []
-        visited = [[False for _ in range(grid_depth)] for _ in range(grid_width)]
-        for i in range(grid_width):
-            for j in range(grid_depth):
-                if grid[i][j] == 1 and not visited[i][j]:
-                    space = find_contiguous_space(grid, visited, i, j, grid_width, grid_depth)
-                    x = float(space["start_x"] * grid_size)
-                    y = float(space["start_y"] * grid_size)
-                    width = float((space["end_y"] - space["start_y"]) * grid_size)
-                    depth = float((space["end_x"] - space["start_x"]) * grid_size)
-                    if width >= 30 and depth >= 30:
-                        available_spaces.append((x, y, width, depth))
-        # closed = check_enclosed_spaces(grid, grid_size, room_width, room_depth)
-        # if closed:
-        #     st.warning("Warning: The available space in the room is not convex. This may affect optimal object placement.")
-        return available_spaces
+    def _find_spaces(include_shadows):
+        occupied = rasterize_objects(placed_obj, room_sizes, grid_size, include_shadows)
+        return _spaces_from_free(~occupied, grid_size)
 
     return {
         #'with_shadow': _find_spaces(True),
@@ -1,24 +1,149 @@
 from utils.helpers import sort_objects_by_size
+from models.bathroom import Bathroom
 from models.layout import Layout
-from .placement import DefaultPlacementStrategy
+from models.object import BathroomObject
+from models.windows_doors import WindowsDoors
+from .placement import DefaultPlacementStrategy, PlacementCandidate
 from optimization.scoring import BathroomScoringFunction
+import enum
 import gc
+import heapq
 import random
 import uuid
 import time
+from itertools import islice
+from types import SimpleNamespace
+from utils.layout_hash import scoring_placements
 from utils.timing_logger import TimingContext
 from validation.object_constraints import ObjectConstraintValidator
+
+
+def _plain(value):
+    """Unwrap enum members so encodings do not depend on the module defining the enum."""
+    return value.value if isinstance(value, enum.Enum) else value
+
+
+def encode_windows_doors(windows_doors):
+    """Encode windows/doors as plain tuples for sending them to worker processes."""
+    return tuple(
+        (hasattr(wd, "get_door_walls"), _plain(wd.name), _plain(wd.wall), tuple(wd.position),
+         wd.width, wd.depth, wd.height, _plain(getattr(wd, "hinge", None)), _plain(getattr(wd, "way", None)))
+        for wd in windows_doors or []
+    )
+
+
+def decode_windows_doors(encoded):
+    """Rebuild windows/doors encoded by encode_windows_doors."""
+    windows_doors = []
+    for has_door_walls, name, wall, position, width, depth, height, hinge, way in encoded:
+        if has_door_walls:
+            windows_doors.append(WindowsDoors(name, wall, position, width, depth, height, hinge, way))
+        else:
+            # Request models (e.g. the API's) only carry attributes
+            windows_doors.append(SimpleNamespace(name=name, wall=wall, position=position, width=width,
+                                                 depth=depth, height=height, hinge=hinge, way=way))
+    return windows_doors
+
+
+def encode_placement(entry):
+    """Encode a placed object entry as a plain tuple."""
+    obj = entry["object"]
+    return (obj.object_type, obj.width, obj.depth, obj.height, obj.shadow, obj.position, obj.wall, entry["position"])
+
+
+def decode_placement(encoded):
+    """Rebuild a placed object entry encoded by encode_placement."""
+    object_type, width, depth, height, shadow, position, wall, entry_position = encoded
+    obj = BathroomObject(object_type, width, depth, height, shadow, position, wall)
+    return {"object": obj, "position": entry_position}
+
+
+def expand_encoded_layout(task):
+    """Generate and score the children of one encoded beam layout.
+
+    Entry point of the executor workers used by BeamSearch. Returns a list of
+    (encoded placement, score, score_breakdown) in placement option order; the
+    children are scored total-only, so score_breakdown may be None.
+    """
+    (room_size, windows_doors, room_windows_doors, requested_objects, placements,
+     obj, obj_def, placement_strategy, scoring_function) = task
+    width, depth, height = room_size
+    bathroom = Bathroom(width, depth, height, [decode_placement(p) for p in placements],
+                        decode_windows_doors(room_windows_doors))
+    layout = Layout(bathroom, requested_objects)
+    placement_options = placement_strategy.generate_options(
+        layout, obj, obj_def, room_size, bathroom.get_placed_objects(), decode_windows_doors(windows_doors)
+    )
+    children = []
+    for placement in placement_options:
+        new_layout = layout.clone()
+        new_layout.bathroom.add_object(placement)
+        children.append(new_layout)
+    Layout.evaluate_batch(children, scoring_function, True, total_only=True)
+    return [(encode_placement(placement),) + child.score_result()
+            for placement, child in zip(placement_options, children)]
+
+
+def _option_entry(option):
+    """Placed object entry of a placement option; a PlacementCandidate builds its BathroomObject here."""
+    return option.entry() if isinstance(option, PlacementCandidate) else option
+
+
+def _bound_entry(option):
+    """Entry for score bounds, which only read the geometry: a PlacementCandidate stands in for its object."""
+    return {"object": option} if isinstance(option, PlacementCandidate) else option
+
+
 # algorithms/beam_search.py
+# Number of layouts kept after placing a bathtub or shower
+FIXTURE_BEAM_SIZE = 30
+
+
+class _PrunedCandidate:
+    """
+    Child layout skipped by branch-and-bound.
+
+    It stands in for the child in the candidate list, so the candidates are
+    shuffled exactly as if the child had been built; ``score`` is the bound,
+    which is the real score when it is 0. Only built if it gets selected.
+    """
+
+    __slots__ = ("parent", "placement", "score")
+
+    def __init__(self, parent, placement, score):
+        self.parent = parent
+        self.placement = placement
+        self.score = score
+
+    def materialize(self, scoring_function):
+        """Build and score the child layout with `scoring_function`, which computed its bound."""
+        layout = self.parent.clone()
+        layout.bathroom.add_object(_option_entry(self.placement))
+        Layout.evaluate_batch([layout], scoring_function, False, total_only=True)
+        return layout
+
+
 class BeamSearch:
     """Implements beam search algorithm for layout generation."""
     
-    def __init__(self, bathroom, object_types, beam_width=10):
+    def __init__(self, bathroom, object_types, beam_width=10, executor=None, time_budget_ms=None):
         self.bathroom = bathroom
         self.object_types = object_types  #only names
         self.beam_width = beam_width
         self.placement_strategy = DefaultPlacementStrategy()
         self.scoring_function = BathroomScoringFunction()
         self.backtracking_strategy = None
+        self.executor = executor
+        self.time_budget_ms = time_budget_ms
+        # Set by generate(): whether the time budget cut the search short
+        self.truncated = False
+        self._seconds_per_layout = None
+        # Scores of the layouts seen during generate(), by Layout.layout_hash
+        self._transpositions = {}
+        self.transposition_hits = 0
+        # Candidates skipped by branch-and-bound / generated in generate(), by object type
+        self.pruned_candidates = {}
+        self.generated_candidates = {}
         
     def set_placement_strategy(self, strategy):
         """Set the placement strategy."""
@@ -31,6 +156,244 @@ class BeamSearch:
     def set_backtracking_strategy(self, strategy):
         """Set the backtracking strategy."""
         self.backtracking_strategy = strategy
+
+    def set_executor(self, executor):
+        """Set a concurrent.futures executor to expand beam layouts in parallel (None for serial)."""
+        self.executor = executor
+
+    def set_time_budget(self, time_budget_ms):
+        """Set the time budget of generate() in milliseconds (None for no limit)."""
+        self.time_budget_ms = time_budget_ms
+
+    def _budget_width(self, beam_size, remaining_steps, deadline):
+        """
+        Number of beam layouts to expand in the next object step under the time budget.
+
+        The time left is split evenly over the remaining object steps and divided
+        by the measured time it takes to expand one beam layout. Once the deadline
+        has passed, only the first layout is expanded, so the remaining objects are
+        still placed greedily and the returned layouts are complete.
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.truncated = self.truncated or beam_size > 1
+            return 1
+        if self._seconds_per_layout is None:
+            return beam_size
+        width = int(remaining / max(remaining_steps, 1) / max(self._seconds_per_layout, 1e-6))
+        width = max(1, min(beam_size, width))
+        if width < beam_size:
+            self.truncated = True
+        return width
+
+    def _record_throughput(self, expanded_layouts, duration):
+        """Update the moving average of the time spent per expanded beam layout."""
+        if expanded_layouts <= 0:
+            return
+        seconds = duration / expanded_layouts
+        if self._seconds_per_layout is None:
+            self._seconds_per_layout = seconds
+        else:
+            self._seconds_per_layout = 0.5 * self._seconds_per_layout + 0.5 * seconds
+
+    def _expand_beam_parallel(self, beam, obj, obj_def, windows_doors):
+        """Generate and score the children of every beam layout on the executor.
+
+        Workers receive compact encodings of the layouts instead of pickled
+        Bathroom objects. Results come back in beam order and are rebuilt as
+        clones of their parent, so the candidates equal the serial expansion.
+        """
+        room_size = self.bathroom.get_size()
+        encoded_windows_doors = encode_windows_doors(windows_doors)
+        tasks = [
+            (room_size, encoded_windows_doors, encode_windows_doors(layout.bathroom.windows_doors),
+             layout.requested_objects, [encode_placement(p) for p in layout.bathroom.get_placed_objects()],
+             obj, obj_def, self.placement_strategy, self.scoring_function)
+            for layout in beam
+        ]
+        expanded = []
+        for layout, results in zip(beam, self.executor.map(expand_encoded_layout, tasks)):
+            children = []
+            for placement, score, score_breakdown in results:
+                new_layout = layout.clone()
+                new_layout.bathroom.add_object(decode_placement(placement))
+                new_layout.set_score(score, score_breakdown, self.scoring_function)
+                children.append(new_layout)
+            expanded.append(children)
+        return expanded
+
+    def _transposition_entry(self, layout):
+        placements = scoring_placements(layout.bathroom.get_placement_keys(), self.scoring_function)
+        return placements, tuple(layout.requested_objects or ())
+
+    def _reuse_transpositions(self, children):
+        """
+        Give children already scored in this search their stored score.
+
+        Layouts are looked up by their Zobrist hash and reuse a stored score when
+        they have the same placements (and requested objects), in any order
+        except for the placements whose terms depend on the order (see
+        utils.layout_hash.scoring_placements), so a reused total is exact.
+
+        Returns:
+            list: The children that still have to be scored
+        """
+        unscored = []
+        for layout in children:
+            entry = self._transposition_entry(layout)
+            for stored_entry, score in self._transpositions.get(layout.layout_hash, ()):
+                if stored_entry == entry:
+                    # The breakdown of overlapping layouts may differ, it is computed for the layout when read
+                    layout.set_score(score, None, self.scoring_function)
+                    self.transposition_hits += 1
+                    break
+            else:
+                unscored.append(layout)
+        return unscored
+
+    def _store_transpositions(self, layouts):
+        """Remember the scores of evaluated layouts for _reuse_transpositions."""
+        for layout in layouts:
+            stored = self._transpositions.setdefault(layout.layout_hash, [])
+            stored.append((self._transposition_entry(layout), layout.score))
+
+    def _use_cpp_scoring(self):
+        """
+        Whether children may be scored by the C++ scorer.
+
+        The bounds of score_bound() hold for the scores of the scoring function
+        itself, so when they prune children, the children are scored by it too.
+        """
+        return getattr(self.scoring_function, "score_bound", None) is None
+
+    def _evaluate_children(self, children):
+        """Score children, reusing the scores of arrangements seen before in this search."""
+        unscored = self._reuse_transpositions(children)
+        Layout.evaluate_batch(unscored, self.scoring_function, self._use_cpp_scoring(), total_only=True)
+        self._store_transpositions(unscored)
+
+    def _expand_layout(self, layout, obj, placement_options, top_scores):
+        """
+        Build and score the children of a beam layout, skipping the ones that cannot be selected.
+
+        When the scoring function provides score_bound(), every placement gets an
+        upper bound of its child's score first, and the children are scored by
+        the scoring function (see _use_cpp_scoring). A child is not built when its
+        bound is 0 (the child scores 0 and is dropped by the selection) or, in
+        a bathtub/shower step, when its bound is below the FIXTURE_BEAM_SIZE-th
+        best score of the step so far: children are scored best bound first, so
+        the threshold rises quickly. Skipped children are returned as
+        _PrunedCandidate entries in their place, which keeps the selection and
+        its random tie-breaking the same as without pruning.
+
+        Placement options may be PlacementCandidates (see
+        DefaultPlacementStrategy.iter_candidates), which are bounded before
+        their BathroomObject is built; pruned ones are only built if selected.
+
+        Args:
+            layout: The beam layout to expand
+            obj: Type of the object being placed
+            placement_options: Placements of the object in `layout`, any iterable
+            top_scores: Min-heap of the best scores of this step, updated in place
+                        (only used in bathtub/shower steps)
+
+        Returns:
+            list: The children (Layout or _PrunedCandidate) in placement order
+        """
+        score_bound = getattr(self.scoring_function, "score_bound", None)
+        if score_bound is None:
+            children = []
+            for placement in placement_options:
+                new_layout = layout.clone()
+                # add the new object to the layout
+                new_layout.bathroom.add_object(_option_entry(placement))
+                children.append(new_layout)
+            self._evaluate_children(children)
+            return children
+
+        keep = FIXTURE_BEAM_SIZE if obj.lower() in ("bathtub", "shower") else None
+        placement_options = list(placement_options)
+        bound_entries = [_bound_entry(placement) for placement in placement_options]
+        score_bounds = getattr(self.scoring_function, "score_bounds", None)
+        if score_bounds is not None:
+            bounds = score_bounds(layout, bound_entries)
+        else:
+            bounds = [score_bound(layout, placement) for placement in bound_entries]
+        order = sorted(range(len(bounds)), key=lambda i: bounds[i], reverse=True)
+        children = [None] * len(bounds)
+        pruned = 0
+        position = 0
+        while position < len(order):
+            batch = []
+            while position < len(order) and (keep is None or len(batch) < keep):
+                i = order[position]
+                position += 1
+                bound = bounds[i]
+                if bound <= 0 or (keep is not None and len(top_scores) >= keep and bound < top_scores[0]):
+                    children[i] = _PrunedCandidate(layout, placement_options[i], bound)
+                    pruned += 1
+                    continue
+                new_layout = layout.clone()
+                new_layout.bathroom.add_object(_option_entry(placement_options[i]))
+                children[i] = new_layout
+                batch.append(new_layout)
+            self._evaluate_children(batch)
+            if keep is not None:
+                for new_layout in batch:
+                    if len(top_scores) < keep:
+                        heapq.heappush(top_scores, new_layout.score)
+                    elif new_layout.score > top_scores[0]:
+                        heapq.heapreplace(top_scores, new_layout.score)
+        self.pruned_candidates[obj] = self.pruned_candidates.get(obj, 0) + pruned
+        return children
+
+    def _expand_stream(self, layout, obj, placement_options, top_scores):
+        """
+        Expand a beam layout from a lazy stream of placements, stopping early.
+
+        Placements are taken beam_width at a time, in the order of the stream
+        (optimal size and most likely positions first), until beam_width
+        children score above 0 or the stream ends. Placements that are never
+        taken are never built. Used to complete the layouts once the time
+        budget is spent, so skipping options sets ``self.truncated``.
+
+        Returns:
+            list: The children (Layout or _PrunedCandidate) of the taken placements
+        """
+        size = max(1, self.beam_width)
+        children = []
+        scored = 0
+        while True:
+            chunk = list(islice(placement_options, size))
+            if not chunk:
+                break
+            batch = self._expand_layout(layout, obj, chunk, top_scores)
+            children.extend(batch)
+            scored += sum(1 for child in batch if child.score > 0)
+            if scored >= size:
+                if next(placement_options, None) is not None:
+                    self.truncated = True
+                break
+        return children
+
+    def _add_candidates(self, new_candidates, children):
+        """Add the children of one beam layout to the candidates."""
+        for new_layout in children:
+            # add the new layout to the candidates
+            new_candidates.append(new_layout)
+
+            # delete candidates with the exact same score and keep only one
+            # if obj == "bathtub" or obj == "shower":
+            #     continue
+            # # delete candidates with the exact same score and keep only one
+            # else:
+            #     seen = set()
+            #     new_candidates = [
+            #         layout for layout in sorted(new_candidates, key=lambda x: x.score, reverse=True)
+            #         if (rounded := round(layout.score, 5)) not in seen and not seen.add(rounded)
+            #     ]
+            # random shuffle the candidates
+            random.shuffle(new_candidates)
     def layout_signature(self,layout):
         """Create a unique signature of the layout based on placed objects."""
         placed = layout.bathroom.get_placed_objects()
@@ -121,8 +484,29 @@ class BeamSearch:
         return selected[:10]
     
     def generate(self, objects_to_place, windows_doors):
+        """
+        Place the objects one by one, keeping the best layouts of every step.
+
+        With a time budget (time_budget_ms), the number of beam layouts expanded
+        per object step is adapted to the measured throughput, and after the
+        deadline the remaining objects are placed greedily. ``self.truncated``
+        tells whether the budget made the search skip any beam layout.
+
+        Returns:
+            list: The final beam of layouts
+        """
         # Generate a unique ID for this layout generation process
         layout_id = str(uuid.uuid4())[:8]
+        self.truncated = False
+        self._seconds_per_layout = None
+        self._transpositions = {}
+        self.transposition_hits = 0
+        self.pruned_candidates = {}
+        self.generated_candidates = {}
+        deadline = None
+        if self.time_budget_ms is not None:
+            deadline = time.monotonic() + self.time_budget_ms / 1000.0
+        steps_done = 0
         room_size = (self.bathroom.width, self.bathroom.depth)
         num_objects = len(objects_to_place)
         
@@ -143,25 +527,63 @@ class BeamSearch:
             obj_def = self.bathroom.OBJECT_TYPES[obj]
             validator = ObjectConstraintValidator.get_validator(obj)
             new_candidates = []
+            top_scores = []
+            if deadline is not None:
+                beam = beam[:self._budget_width(len(beam), len(sorted_objects) - steps_done, deadline)]
+            steps_done += 1
+            step_start = time.monotonic()
             start_time = time.time()
-            # Generate placement options for the object
-            for layout in beam:
-                # Generate placement options
+            # The double sink fallback changes obj_def within the step, so that step stays serial
+            expanded = None
+            if self.executor is not None and obj != "double sink":
                 from utils.timing_logger import log_time
-                start_time = time.time()
-                placement_options = self.placement_strategy.generate_options(
-                    layout, obj, obj_def, self.bathroom.get_size(), layout.bathroom.get_placed_objects(), windows_doors
-                )
-                end_time = time.time()
-                duration_ms = (end_time - start_time) * 1000
+                expanded = self._expand_beam_parallel(beam, obj, obj_def, windows_doors)
                 log_time(
-                    operation="placement_option_generation",
-                    duration_ms=duration_ms,
-                    layout_id=f"beam_{beam.index(layout)}",
+                    operation="parallel_beam_expansion",
+                    duration_ms=(time.time() - start_time) * 1000,
+                    layout_id=layout_id,
                     room_size=(self.bathroom.width, self.bathroom.depth),
-                    num_objects=len(layout.bathroom.get_placed_objects()) + 1,
-                    additional_info={"object_type": obj, "num_options": len(placement_options) if placement_options else 0}
+                    num_objects=len(beam),
+                    additional_info={"object_type": obj, "num_candidates": sum(len(c) for c in expanded)}
                 )
+            # Generate placement options for the object
+            expanded_layouts = len(beam) if expanded is not None else 0
+            for index, layout in enumerate(beam):
+                if expanded is not None:
+                    self._store_transpositions(expanded[index])
+                    self._add_candidates(new_candidates, expanded[index])
+                    continue
+                if deadline is not None and index > 0 and time.monotonic() >= deadline:
+                    # Out of time: keep the candidates of the layouts expanded so far
+                    self.truncated = True
+                    break
+                expanded_layouts += 1
+                # Generate placement options
+                from utils.timing_logger import log_time
+                start_time = time.time()
+                # Options are streamed and built only when kept; past the deadline they are
+                # only taken until enough children score above 0. The double sink fallback
+                # needs to know whether there are options at all, so it gets the list.
+                lazy = obj != "double sink" and hasattr(self.placement_strategy, "iter_candidates")
+                streaming = lazy and deadline is not None and time.monotonic() >= deadline
+                if lazy:
+                    placement_options = self.placement_strategy.iter_candidates(
+                        layout, obj, obj_def, self.bathroom.get_size(), layout.bathroom.get_placed_objects(), windows_doors
+                    )
+                else:
+                    placement_options = self.placement_strategy.generate_options(
+                        layout, obj, obj_def, self.bathroom.get_size(), layout.bathroom.get_placed_objects(), windows_doors
+                    )
+                    end_time = time.time()
+                    duration_ms = (end_time - start_time) * 1000
+                    log_time(
+                        operation="placement_option_generation",
+                        duration_ms=duration_ms,
+                        layout_id=f"beam_{beam.index(layout)}",
+                        room_size=(self.bathroom.width, self.bathroom.depth),
+                        num_objects=len(layout.bathroom.get_placed_objects()) + 1,
+                        additional_info={"object_type": obj, "num_options": len(placement_options) if placement_options else 0}
+                    )
 
                 if not placement_options and obj == "double sink":
                     obj_def = self.bathroom.OBJECT_TYPES["sink"]
@@ -188,46 +610,30 @@ class BeamSearch:
                 #         new_candidates.append(backtrack_layout)
                 # else:
                 #     # Add each placement option to candidates
-                for placement in placement_options:
-                    # create a the layout with the object placed
-                    new_layout = layout.clone()
-                    # add the new object to the layout
-                    new_layout.bathroom.add_object(placement)
-                    # evaluate the object on the layout
-                    #new_layout.score = validator.validate(placement, self.bathroom)
-                    from utils.timing_logger import log_time
-                    start_time = time.time()
-                    new_layout.evaluate(self.scoring_function, True)
-                    end_time = time.time()
-                    duration_ms = (end_time - start_time) * 1000
+                # create the layouts with the object placed
+                # evaluate all children of this beam layout at once
+                #new_layout.score = validator.validate(placement, self.bathroom)
+                start_time = time.time()
+                if streaming:
+                    children = self._expand_stream(layout, obj, placement_options, top_scores)
+                else:
+                    children = self._expand_layout(layout, obj, placement_options, top_scores)
+                self.generated_candidates[obj] = self.generated_candidates.get(obj, 0) + len(children)
+                end_time = time.time()
+                duration_ms = (end_time - start_time) * 1000
+                if children:
                     log_time(
                         operation="layout_scoring",
                         duration_ms=duration_ms,
-                        layout_id=f"candidate_{len(new_candidates)}",
+                        layout_id=f"candidates_{len(new_candidates)}",
                         room_size=(self.bathroom.width, self.bathroom.depth),
-                        num_objects=len(new_layout.bathroom.get_placed_objects()),
-                        additional_info={ "object_added": obj}
+                        num_objects=len(layout.bathroom.get_placed_objects()) + 1,
+                        additional_info={"object_added": obj, "num_candidates": len(children),
+                                         "num_pruned": sum(isinstance(c, _PrunedCandidate) for c in children)}
                     )
-                    # add the new layout to the candidates
-                    new_candidates.append(new_layout)
-                    
-                    # Log individual object placement time
-                    # if hasattr(new_layout, "score") and new_layout.score > 0:
-                    #     with TimingContext("object_placement", layout_id=layout_id, room_size=room_size, num_objects=1) as tc_obj:
-                    #         tc_obj.add_info({"object_type": obj, "position": placement["position"][:2], "score": new_layout.score})
-
-                    # delete candidates with the exact same score and keep only one
-                    # if obj == "bathtub" or obj == "shower":
-                    #     continue
-                    # # delete candidates with the exact same score and keep only one
-                    # else:
-                    #     seen = set()
-                    #     new_candidates = [
-                    #         layout for layout in sorted(new_candidates, key=lambda x: x.score, reverse=True)
-                    #         if (rounded := round(layout.score, 5)) not in seen and not seen.add(rounded)
-                    #     ]
-                    # random shuffle the candidates
-                    random.shuffle(new_candidates)
+                self._add_candidates(new_candidates, children)
+            if deadline is not None:
+                self._record_throughput(expanded_layouts, time.monotonic() - step_start)
             # If no candidates, we're stuck
             if not new_candidates:
                 continue
@@ -242,7 +648,8 @@ class BeamSearch:
                 continue  # beam marad változatlan
             if obj.lower() == "bathtub" or obj.lower() == "shower":
                 new_candidates = sorted(new_candidates, key=lambda x: x.score, reverse=True)
-                beam = new_candidates[:30]
+                beam = [candidate.materialize(self.scoring_function) if isinstance(candidate, _PrunedCandidate)
+                        else candidate for candidate in new_candidates[:FIXTURE_BEAM_SIZE]]
                 # Only log timing for objects that made it into the final beam
                 for idx, selected_layout in enumerate(beam):
                     # Get the objects in this layout
@@ -290,7 +697,7 @@ class BeamSearch:
                         continue  # ha túl sok layout van ugyanazzal a score-val, kihagyjuk
 
                     # Layout deduplikáció
-                    sig = self.layout_signature(layout)
+                    sig = layout.signature_hash
                     count = seen_layout.get(sig, 0)
                     if count >= max_repeat:
                         continue  # ha már elértük az ismétlések max számát, kihagyjuk
@@ -347,5 +754,8 @@ class BeamSearch:
 
 
 
+        # Pending breakdowns are computed here, before the layouts are shared with other threads or cached
+        for layout in beam:
+            layout.score_breakdown
         return beam
 
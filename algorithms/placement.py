@@ -7,13 +7,55 @@ import sys
 import os
 import random
 from abc import ABC, abstractmethod
+from collections import namedtuple
 from models.object import BathroomObject, BaseObject
-from utils.helpers import check_which_wall, is_valid_placement, windows_doors_overlap, extract_object_based_on_type, extract_door_window_based_on_type, convert_values, generate_random_position
+from utils.helpers import check_which_wall, is_valid_placement, windows_doors_overlap, extract_object_based_on_type, extract_door_window_based_on_type, convert_values
 
 # Add the project root to the path so we can import from other modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from validation import get_constraint_validator
+from algorithms.wall_intervals import WallIntervalIndex
+from utils.geometry import PlacementIndex, RoomGeometry, FeasibilityCheck
+
+
+def _run_length(holds, estimate):
+    """Number of leading indices i = 0, 1, ... for which the monotonic condition holds(i) is true."""
+    length = max(int(estimate), 0)
+    while length > 0 and not holds(length - 1):
+        length -= 1
+    while holds(length):
+        length += 1
+    return length
+
+
+class PlacementCandidate(namedtuple("PlacementCandidate", (
+        "object_type", "width", "depth", "height", "shadow", "position", "wall", "entry_position"))):
+    """
+    A checked placement position whose BathroomObject is not built yet.
+
+    It has the attributes the feasibility check and the score bounds read
+    from a BathroomObject, so a search can prune it first and build the
+    {"object", "position"} entry with entry() only if it keeps the option.
+    """
+    __slots__ = ()
+
+    @property
+    def name(self):
+        return self.object_type
+
+    def entry(self):
+        """The placed object entry of this position."""
+        bathroom_obj = BathroomObject(
+            object_type=self.object_type,
+            width=self.width,
+            depth=self.depth,
+            height=self.height,
+            shadow=self.shadow,
+            position=self.position,
+            wall=self.wall
+        )
+        return {"object": bathroom_obj, "position": self.entry_position}
 
 
 class PlacementStrategy(ABC):
@@ -47,7 +89,40 @@ class DefaultPlacementStrategy(PlacementStrategy):
         Returns:
             List of placement options as dictionaries with 'object' and 'position' keys
         """
-        options = []
+        return list(self.iter_options(layout, obj_type, obj_def, bathroom_size, placed_objects, windows_doors,
+                                      num_options, use_optimal_size))
+
+    def iter_options(self, layout, obj_type, obj_def, bathroom_size, placed_objects, windows_doors, num_options=50, use_optimal_size=True):
+        """Lazily generate the placement options of generate_options, in the same order.
+
+        Args:
+            Same as generate_options
+
+        Yields:
+            Placement options as dictionaries with 'object' and 'position' keys
+        """
+        for candidate in self.iter_candidates(layout, obj_type, obj_def, bathroom_size, placed_objects, windows_doors,
+                                              num_options, use_optimal_size):
+            yield candidate.entry()
+
+    def iter_candidates(self, layout, obj_type, obj_def, bathroom_size, placed_objects, windows_doors, num_options=50, use_optimal_size=True):
+        """Lazily generate the placement options of generate_options as PlacementCandidates.
+
+        Options come size variation by size variation, the optimal size first and
+        then smaller sizes; within a size, corner objects try the corners and wall
+        objects the positions next to the objects, windows and doors before the
+        free wall positions. Each position is checked before it is yielded, and no
+        BathroomObject is built until the consumer calls entry(), so a caller can
+        prune options first or stop once it has enough good placements. Options
+        that break a hard constraint of the scoring function (see FeasibilityCheck)
+        are dropped, as a layout with them would score 0.
+
+        Args:
+            Same as generate_options
+
+        Yields:
+            PlacementCandidate: The options, in the order of generate_options
+        """
         room_width, room_depth, room_height = bathroom_size
         shadow = obj_def["shadow_space"]
         #use_optimal_size = random.choice([True, False])
@@ -92,32 +167,64 @@ class DefaultPlacementStrategy(PlacementStrategy):
                     door_walls.append(windows_doors.get_door_walls())
                 elif hasattr(windows_doors, 'wall'):
                     door_walls.append(windows_doors.wall)
+        # Door/window geometry, collision index and free wall intervals are shared by all size variations
+        room_geometry = self._room_geometry(layout, room_width, room_depth, windows_doors)
+        placement_index = self._placement_index(layout, placed_objects)
+        wall_index = None
+        if obj_def["must_be_against_wall"] and not obj_def["must_be_corner"]:
+            wall_index = WallIntervalIndex(placed_objects, room_width, room_depth, windows_doors, room_geometry)
+        feasibility = FeasibilityCheck(placed_objects)
         # For each size variation, try different positions
         for obj_width, obj_depth, obj_height in size_variations:
             # Try different positions based on constraints
             if obj_def["must_be_corner"]:
-                options.extend(self._generate_corner_positions(
+                positions = self._generate_corner_positions(
                     obj_type, obj_def, obj_width, obj_depth, obj_height, shadow,
-                    bathroom_size, placed_objects, windows_doors, num_options, door_walls
-                ))
+                    bathroom_size, placed_objects, windows_doors, num_options, door_walls, placement_index,
+                    room_geometry
+                )
             elif obj_def["must_be_against_wall"]:
-                options.extend(self._generate_wall_positions(
+                positions = self._generate_wall_positions(
                     obj_type, obj_def, obj_width, obj_depth, obj_height, shadow,
-                    bathroom_size, placed_objects, windows_doors, num_options, door_walls
-                ))
+                    bathroom_size, placed_objects, windows_doors, num_options, door_walls, wall_index,
+                    placement_index, room_geometry
+                )
             else:
-                options.extend(self._generate_free_positions(
+                positions = self._generate_free_positions(
                     obj_type, obj_def, obj_width, obj_depth, obj_height, shadow,
                     bathroom_size, placed_objects, windows_doors, num_options, door_walls
-                ))
+                )
+            for candidate in positions:
+                if feasibility.allows(candidate):
+                    yield candidate
 
             # If we have enough options, stop
         # if len(options) >= num_options:
         #     return options[:num_options]
-        return options
     
     def __str__(self):
         return "DefaultPlacementStrategy"
+
+    @staticmethod
+    def _room_geometry(layout, room_width, room_depth, windows_doors):
+        """Door/window geometry of the room, reusing the one cached on the layout's bathroom if it matches."""
+        bathroom = getattr(layout, "bathroom", None)
+        if bathroom is not None and hasattr(bathroom, "get_room_geometry"):
+            room_geometry = bathroom.get_room_geometry()
+            if room_geometry.matches(room_width, room_depth, windows_doors):
+                return room_geometry
+        return RoomGeometry(room_width, room_depth, windows_doors)
+
+    @staticmethod
+    def _placement_index(layout, placed_objects):
+        """Spatial index of placed_objects, reusing the one cached on the layout's bathroom if they match."""
+        bathroom = getattr(layout, "bathroom", None)
+        if bathroom is not None and hasattr(bathroom, "get_placement_index"):
+            bathroom_objects = bathroom.get_placed_objects()
+            if len(bathroom_objects) == len(placed_objects) and all(
+                    a is b for a, b in zip(bathroom_objects, placed_objects)):
+                return bathroom.get_placement_index()
+        return PlacementIndex.from_objects(placed_objects)
     
     def _generate_size_variations(self, obj_def, bathroom_size):
         """Generate size variations within min/max range using 5cm increments."""
@@ -189,11 +296,15 @@ class DefaultPlacementStrategy(PlacementStrategy):
         return variations
     
     def _generate_corner_positions(self, obj_type, obj_def, obj_width, obj_depth, obj_height, shadow,
-                            bathroom_size, placed_objects, windows_doors, num_options, door_walls):
+                            bathroom_size, placed_objects, windows_doors, num_options, door_walls, placement_index=None,
+                            room_geometry=None):
         """Generate positions for objects that must be in a corner."""
-        options = []
-        
+
         room_width, room_depth, room_height = bathroom_size
+        if placement_index is None:
+            placement_index = PlacementIndex.from_objects(placed_objects)
+        if room_geometry is None:
+            room_geometry = RoomGeometry(room_width, room_depth, windows_doors)
         # Try each corner
         corner_positions = [
             (0, 0),  # Top-left
@@ -229,35 +340,27 @@ class DefaultPlacementStrategy(PlacementStrategy):
             _,_,_,_,shadow_top, shadow_left, shadow_right, shadow_bottom = convert_values((x, y, obj_width, obj_depth, obj_height), shadow, corner_positions_dict[(x, y)])
             shadow = [shadow_top, shadow_left, shadow_right, shadow_bottom]
             width, depth = corner_positions_dict_sizes[(x, y)]
-            if is_valid_placement((x, y, width, depth, obj_height,corner_positions_dict[(x, y)]), placed_objects, shadow, room_width, room_depth, door_walls):
-                    if not windows_doors_overlap(windows_doors, x, y, 0,width, depth, obj_height, room_width, room_depth, shadow,obj_type):
-                        # Create a BathroomObject instance
-                        bathroom_obj = BathroomObject(
-                            object_type=obj_type,
-                            
-                            width=width,
-                            depth=depth,
-                            height=obj_height,
-                            shadow=shadow,
-                            position=(x, y),
-                            wall=corner_positions_dict[(x, y)]
-                            
-                        )
-                        
-                        options.append({
-                            "object": bathroom_obj,
-                            "position": (x, y, width, depth, obj_height, shadow)
-                        })
-                        
-
-        
-        return options
+            if placement_index.is_valid((x, y, width, depth, obj_height,corner_positions_dict[(x, y)]), shadow, room_width, room_depth):
+                    if not room_geometry.windows_doors_overlap(x, y, width, depth, obj_height, shadow, obj_type):
+                        yield PlacementCandidate(obj_type, width, depth, obj_height, shadow, (x, y),
+                                                 corner_positions_dict[(x, y)],
+                                                 (x, y, width, depth, obj_height, shadow))
     
     def _generate_wall_positions(self, obj_type, obj_def, obj_width, obj_depth, obj_height, shadow,
-                              bathroom_size, placed_objects, windows_doors, num_options, door_walls):
-        """Generate positions for objects that must be against a wall."""
-        options = []
+                              bathroom_size, placed_objects, windows_doors, num_options, door_walls, wall_index=None,
+                              placement_index=None, room_geometry=None):
+        """Generate positions for objects that must be against a wall.
+
+        Positions come in runs 5 cm apart along the walls; only the positions of a
+        run inside the free intervals of `wall_index` are visited and validated.
+        """
         room_width, room_depth, room_height = bathroom_size
+        if room_geometry is None:
+            room_geometry = RoomGeometry(room_width, room_depth, windows_doors)
+        if wall_index is None:
+            wall_index = WallIntervalIndex(placed_objects, room_width, room_depth, windows_doors, room_geometry)
+        if placement_index is None:
+            placement_index = PlacementIndex.from_objects(placed_objects)
         # Get all objects that are against walls
         wall_objects = []
         for obj in placed_objects:
@@ -316,129 +419,73 @@ class DefaultPlacementStrategy(PlacementStrategy):
                         "height": height
                     })
             
-        # generate all possible positions for the new object considering the wall objects
-        # go through all the wall objects and check if the new object can be placed next to it
-        wall_positions = []
+        # generate all possible positions for the new object considering the wall objects:
+        # runs of positions 5 cm apart sliding away from each wall object, as
+        # (wall, fixed coordinate, position of index i, number of positions)
+        wall_runs = []
 
-        for obj in wall_objects:
-
-            
-            if "top" in obj["wall"] :
+        def add_run(wall, fixed, position, holds, estimate):
+            wall_runs.append((wall, fixed, position, _run_length(holds, estimate)))
 
+        for obj in wall_objects:
+            ox, oy, o_width, o_depth = obj["x"], obj["y"], obj["width"], obj["depth"]
+            if "top" in obj["wall"] or "bottom" in obj["wall"]:
+                fixed = int(ox) if "top" in obj["wall"] else int(room_width-obj_depth)
+                wall = "top" if "top" in obj["wall"] else "bottom"
                 # check if the new object can be placed next to it
-                if room_depth - obj["y"] - obj["width"] > obj_width and "right" not in obj["wall"]:
-                    wall_positions.append((int(obj["x"]), int(obj["y"]+obj["width"]), "top"))
-                    i = 1
-                    while room_depth - obj["y"] - obj["width"] > obj_width+i*5:
-                        wall_positions.append((int(obj["x"]), int(obj["y"]+obj["width"]+i*5), "top"))
-                        i += 1
-                if obj["y"] > obj_width:
-                    wall_positions.append((int(obj["x"]), int(obj["y"]-obj["width"]), "top"))
-                    i = 1
-                    while obj["y"] > obj_width+i*5:
-                        wall_positions.append((int(obj["x"]), int(obj["y"]-obj["width"]-i*5), "top"))
-                        i += 1
-            elif "bottom" in obj["wall"]:
-
-                if room_depth - obj["y"] - obj["width"] > obj_width and "right" not in obj["wall"]:
-                    wall_positions.append((int(room_width-obj_depth), int(obj["y"]+obj["width"]), "bottom"))
-                    i = 1
-                    while room_depth - obj["y"] - obj["width"] > obj_width+i*5:
-                        wall_positions.append((int(room_width-obj_depth), int(obj["y"]+obj["width"]+i*5), "bottom"))
-                        i += 1
-                if obj["y"] > obj_width:
-                    wall_positions.append((int(room_width-obj_depth), int(obj["y"]-obj_width), "bottom"))
-                    i = 1
-                    while obj["y"] > obj_width+i*5:
-                        wall_positions.append((int(room_width-obj_depth), int(obj["y"]-obj_width-i*5), "bottom"))
-                        i += 1
-            elif "left" in obj["wall"] :
-
-                if room_width - obj["x"] - obj["depth"] > obj_width and "bottom" not in obj["wall"]:
-                    wall_positions.append((int(obj["x"]+obj["depth"]), int(obj["y"]), "left"))
-                    i = 1
-                    while room_width - obj["x"] - obj["depth"] > obj_width+i*5:
-                        wall_positions.append((int(obj["x"]+obj["depth"]+i*5), int(obj["y"]), "left"))
-                        i += 1
-                if obj["x"] > obj_width:
-                    wall_positions.append((int(obj["x"]-obj_width), int(obj["y"]), "left"))
-                    i = 1
-                    while obj["x"] > obj_width+i*5:
-                        wall_positions.append((int(obj["x"]-obj_width-i*5), int(obj["y"]), "left"))
-                        i += 1
-            elif "right" in obj["wall"]:
-
-                if room_width - obj["x"] - obj["depth"] > obj_width and "bottom" not in obj["wall"]:
-                    wall_positions.append((int(obj["x"]+obj["depth"]), int(room_depth-obj_depth), "right"))
-                    i = 1
-                    while room_width - obj["x"] - obj["depth"] > obj_width+i*5:
-                        wall_positions.append((int(obj["x"]+obj["depth"]+i*5), int(room_depth-obj_depth), "right"))
-                        i += 1
-                if obj["x"] > obj_width:
-                    wall_positions.append((int(obj["x"]-obj_width), int(room_depth-obj_depth), "right"))
-                    i = 1
-                    while obj["x"] > obj_width+i*5:
-                        wall_positions.append((int(obj["x"]-obj_width-i*5), int(room_depth-obj_depth), "right"))
-                        i += 1
-        # place object randomly in room where there are no wall objects
-
-        top_positions = generate_random_position("top",room_width,room_depth,obj_width,obj_depth)
-        if top_positions:
-            for pos in top_positions:
-                wall_positions.append(pos)
-
-        bottom_positions = generate_random_position("bottom",room_width,room_depth,obj_width,obj_depth)
-        if bottom_positions:
-            for pos in bottom_positions:
-                wall_positions.append(pos)
-
-        left_positions = generate_random_position("left",room_width,room_depth,obj_width,obj_depth)
-        if left_positions:
-            for pos in left_positions:
-                wall_positions.append(pos)
-
-        right_positions = generate_random_position("right",room_width,room_depth,obj_width,obj_depth)
-        if right_positions:
-            for pos in right_positions:
-                wall_positions.append(pos)
-        for (x,y,wall) in wall_positions:
-            if x < 0 or y < 0:
+                if room_depth - oy - o_width > obj_width and "right" not in obj["wall"]:
+                    add_run(wall, fixed, lambda i, oy=oy, o_width=o_width: int(oy+o_width+i*5),
+                            lambda i, oy=oy, o_width=o_width: room_depth - oy - o_width > obj_width+i*5,
+                            (room_depth - oy - o_width - obj_width) / 5)
+                if oy > obj_width:
+                    # Next to the top wall the gap is the size of the wall object itself
+                    before = o_width if wall == "top" else obj_width
+                    add_run(wall, fixed, lambda i, oy=oy, before=before: int(oy-before-i*5),
+                            lambda i, oy=oy: oy > obj_width+i*5, (oy - obj_width) / 5)
+            elif "left" in obj["wall"] or "right" in obj["wall"]:
+                fixed = int(oy) if "left" in obj["wall"] else int(room_depth-obj_depth)
+                wall = "left" if "left" in obj["wall"] else "right"
+                if room_width - ox - o_depth > obj_width and "bottom" not in obj["wall"]:
+                    add_run(wall, fixed, lambda i, ox=ox, o_depth=o_depth: int(ox+o_depth+i*5),
+                            lambda i, ox=ox, o_depth=o_depth: room_width - ox - o_depth > obj_width+i*5,
+                            (room_width - ox - o_depth - obj_width) / 5)
+                if ox > obj_width:
+                    add_run(wall, fixed, lambda i, ox=ox: int(ox-obj_width-i*5),
+                            lambda i, ox=ox: ox > obj_width+i*5, (ox - obj_width) / 5)
+        # place object anywhere along the walls where there are no wall objects
+        for wall, fixed, length in (("top", 0, room_depth), ("bottom", room_width-obj_depth, room_depth),
+                                    ("left", 0, room_width), ("right", room_depth-obj_depth, room_width)):
+            add_run(wall, fixed, lambda i: i*5, lambda i, length=length: i == 0 or length-obj_width >= i*5,
+                    (length - obj_width) / 5 + 1)
+
+        # Size and shadow of the object only depend on the wall it is placed against
+        wall_shapes = {}
+        for wall, fixed, position, count in wall_runs:
+            if fixed < 0:
                 continue
-            shadow = obj_def["shadow_space"]
-            obj_width_TEMP, obj_depth_TEMP = obj_width, obj_depth
-
-            if wall == "right" or wall == "left" :
-                obj_width_TEMP, obj_depth_TEMP = obj_depth, obj_width
-
-
-                
-            _,_,_,_,shadow_top, shadow_left, shadow_right, shadow_bottom = convert_values((x, y, obj_width_TEMP, obj_depth_TEMP, obj_height), shadow, wall)
-            shadow = [shadow_top, shadow_left, shadow_right, shadow_bottom]
-            if is_valid_placement((x, y, obj_width_TEMP, obj_depth_TEMP, obj_height,wall), placed_objects, shadow, room_width, room_depth, door_walls):
-                if not windows_doors_overlap(windows_doors, x, y, 0, obj_width_TEMP, obj_depth_TEMP, obj_height, room_width, room_depth, shadow,obj_type):
-                    # Create a BathroomObject instance
-                    bathroom_obj = BathroomObject(
-                        object_type=obj_type,
-                        
-                        width=obj_width_TEMP,
-                        depth=obj_depth_TEMP,
-                        height=obj_height,
-                        shadow=shadow,
-                        position=(x,y),
-                        wall=wall
-                    )
-                    
-                    options.append({
-                        "object": bathroom_obj,
-                        "position": (x,y, obj_width_TEMP, obj_depth_TEMP, obj_height, shadow)
-                    })
+            shape = wall_shapes.get(wall)
+            if shape is None:
+                obj_width_TEMP, obj_depth_TEMP = obj_width, obj_depth
+
+                if wall == "right" or wall == "left" :
+                    obj_width_TEMP, obj_depth_TEMP = obj_depth, obj_width
+
+                _,_,_,_,shadow_top, shadow_left, shadow_right, shadow_bottom = convert_values((0, 0, obj_width_TEMP, obj_depth_TEMP, obj_height), obj_def["shadow_space"], wall)
+                shape = wall_shapes[wall] = (obj_width_TEMP, obj_depth_TEMP, (shadow_top, shadow_left, shadow_right, shadow_bottom))
+            obj_width_TEMP, obj_depth_TEMP, wall_shadow = shape
+            axis = WallIntervalIndex.axis(wall)
+            # Only the positions in the free intervals of the wall are visited and checked exactly
+            for i in wall_index.free_indices(axis, fixed, obj_width_TEMP, obj_depth_TEMP, wall_shadow, position, count):
+                x, y = (fixed, position(i)) if axis == "y" else (position(i), fixed)
+                shadow = list(wall_shadow)
+                if placement_index.is_valid((x, y, obj_width_TEMP, obj_depth_TEMP, obj_height,wall), shadow, room_width, room_depth):
+                    if not room_geometry.windows_doors_overlap(x, y, obj_width_TEMP, obj_depth_TEMP, obj_height, shadow, obj_type):
+                        yield PlacementCandidate(obj_type, obj_width_TEMP, obj_depth_TEMP, obj_height, shadow, (x, y), wall,
+                                                 (x, y, obj_width_TEMP, obj_depth_TEMP, obj_height, shadow))
 
-                    
                     # if len(options) >= num_options:
                     #     break
         
-        return options 
-        
         # Function to check if a position is next to an existing object along a wall
     def is_next_to_object(x, y, wall):
         for obj in wall_objects:
@@ -551,7 +598,7 @@ class DefaultPlacementStrategy(PlacementStrategy):
     def _generate_free_positions(self, obj_type, obj_def, obj_width, obj_depth, obj_height, shadow,
                                bathroom_size, placed_objects, windows_doors, num_options, door_walls):
         """Generate positions for free-standing objects that can be placed anywhere."""
-        options = []
+        generated = 0
         room_width, room_depth, room_height = bathroom_size
         
         # Try grid positions with a smaller step for more options
@@ -566,26 +613,13 @@ class DefaultPlacementStrategy(PlacementStrategy):
             for y in range(start_y, room_depth - obj_width - shadow[3], step_size):
                 if is_valid_placement((x, y, obj_width, obj_depth, obj_height), placed_objects, shadow, room_width, room_depth, room_height):
                     if not windows_doors_overlap(windows_doors, x, y, 0, obj_width, obj_depth, obj_height, room_width, room_depth, shadow):
-                        # Create a BathroomObject instance
-                        bathroom_obj = BathroomObject(
-                            object_type=obj_type,
-                            
-                            width=obj_width,
-                            depth=obj_depth,
-                            height=obj_height,
-                            shadow=shadow,
-                            position=(x, y),
-                            wall=None  # Free-standing object
-                        )
-                        
-                        options.append({
-                            "object": bathroom_obj,
-                            "position": (x, y, obj_width, obj_depth, obj_height, obj_def['name'], 
-                                        obj_def['must_be_corner'], obj_def['must_be_against_wall'], shadow)
-                        })
-                        
-                        if len(options) >= num_options:
-                            return options
+                        # Free-standing object, against no wall
+                        yield PlacementCandidate(obj_type, obj_width, obj_depth, obj_height, shadow, (x, y), None,
+                                                 (x, y, obj_width, obj_depth, obj_height, obj_def['name'],
+                                                  obj_def['must_be_corner'], obj_def['must_be_against_wall'], shadow))
+                        generated += 1
+                        if generated >= num_options:
+                            return
 
     def fit_objects_in_room(bathroom_size, object_list, windows_doors, OBJECT_TYPES, attempt=1000, validator=None):
 
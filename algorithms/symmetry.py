@@ -0,0 +1,295 @@
+"""
+Symmetries of a rectangular room.
+
+A room with the door on the left wall is the mirror image of the same room with
+the door on the right, and a 250x200 room is the 200x250 room turned by 90
+degrees. This module maps a request to a canonical orientation, so the beam
+search runs once for the symmetric variants of a room, and maps the resulting
+layouts back to the orientation that was asked for.
+
+Variants are only shared across the transforms in SCORE_INVARIANT_TRANSFORMS:
+the search optimizes the score of the canonical room, which has to be the
+score of the room that was asked for. Mapped layouts are scored again in
+their target orientation all the same.
+
+Coordinates follow the placement code: x runs along the room width (top wall
+at x=0, bottom wall at x=room_width), y along the room depth (left wall at
+y=0, right wall at y=room_depth). A rectangle (x, y, width, depth) spans
+`depth` along x and `width` along y, and shadows are (top, left, right, bottom).
+Windows and doors are positioned at the start of their wall segment:
+top (0, s), bottom (room_width, s), left (s, 0) and right (s, room_depth).
+"""
+
+from itertools import product
+
+from models.bathroom import Bathroom
+from models.layout import Layout
+from models.object import BathroomObject
+from optimization.scoring import BathroomScoringFunction
+
+# Elementary transforms, each one is its own inverse
+FLIP_X = "flip_x"        # mirror top <-> bottom
+FLIP_Y = "flip_y"        # mirror left <-> right
+TRANSPOSE = "transpose"  # swap the x and y axes
+
+_WALL_MAPS = {
+    FLIP_X: {"top": "bottom", "bottom": "top"},
+    FLIP_Y: {"left": "right", "right": "left"},
+    TRANSPOSE: {"top": "left", "left": "top", "bottom": "right", "right": "bottom"},
+}
+
+
+def _text(value):
+    value = getattr(value, "value", value)  # enum members
+    return str(value).lower() if value is not None else ""
+
+
+def _map_wall(wall, step):
+    """Map a wall ("top", "left", "top-left", ...) through one elementary transform."""
+    if not isinstance(wall, str):
+        return wall
+    parts = [_WALL_MAPS[step].get(part, part) for part in wall.split("-")]
+    # Corner walls are written vertical part first, e.g. "top-left"
+    parts.sort(key=lambda part: part not in ("top", "bottom"))
+    return "-".join(parts)
+
+
+def _map_rect(x, y, width, depth, room_width, room_depth, step):
+    if step == FLIP_X:
+        return room_width - x - depth, y, width, depth
+    if step == FLIP_Y:
+        return x, room_depth - y - width, width, depth
+    return y, x, depth, width
+
+
+def _map_shadow(shadow, step):
+    if shadow is None or len(shadow) != 4:
+        return shadow
+    top, left, right, bottom = shadow
+    if step == FLIP_X:
+        mapped = (bottom, left, right, top)
+    elif step == FLIP_Y:
+        mapped = (top, right, left, bottom)
+    else:
+        mapped = (left, top, bottom, right)
+    return list(mapped) if isinstance(shadow, list) else mapped
+
+
+def _map_hinge(hinge):
+    # Every elementary transform is a reflection, which turns a left hinged door into a right hinged one
+    return {"left": "right", "right": "left"}.get(_text(hinge), hinge)
+
+
+def _wall_start(windows_door, room_width, room_depth):
+    """Start of a window/door segment along its wall, or None if it is not positioned on its wall."""
+    wall = _text(windows_door.wall)
+    px, py = windows_door.position[0], windows_door.position[1]
+    if wall == "top" and px == 0:
+        return py
+    if wall == "bottom" and px == room_width:
+        return py
+    if wall == "left" and py == 0:
+        return px
+    if wall == "right" and py == room_depth:
+        return px
+    return None
+
+
+class RoomTransform:
+    """A symmetry of the room, stored as a sequence of elementary transforms applied in order."""
+
+    def __init__(self, steps=()):
+        self.steps = tuple(steps)
+
+    def __repr__(self):
+        return f"RoomTransform({list(self.steps)})"
+
+    def __eq__(self, other):
+        return isinstance(other, RoomTransform) and self.steps == other.steps
+
+    def __hash__(self):
+        return hash(self.steps)
+
+    @property
+    def is_identity(self):
+        return not self.steps
+
+    def inverse(self):
+        """The transform undoing this one."""
+        return RoomTransform(reversed(self.steps))
+
+    def room_size(self, room_width, room_depth):
+        """Width and depth of the transformed room."""
+        if self.steps.count(TRANSPOSE) % 2:
+            return room_depth, room_width
+        return room_width, room_depth
+
+    def map_rect(self, rect, room_width, room_depth):
+        """Map an (x, y, width, depth) rectangle of a room_width x room_depth room."""
+        x, y, width, depth = rect
+        for step in self.steps:
+            x, y, width, depth = _map_rect(x, y, width, depth, room_width, room_depth, step)
+            if step == TRANSPOSE:
+                room_width, room_depth = room_depth, room_width
+        return x, y, width, depth
+
+    def map_wall(self, wall):
+        for step in self.steps:
+            wall = _map_wall(wall, step)
+        return wall
+
+    def map_shadow(self, shadow):
+        for step in self.steps:
+            shadow = _map_shadow(shadow, step)
+        return shadow
+
+    def map_windows_door(self, windows_door, room_width, room_depth):
+        """
+        Return a transformed copy of a window/door.
+
+        Raises:
+            ValueError: If the window/door is not positioned at the start of its wall segment
+        """
+        if self.is_identity:
+            return windows_door
+        start = _wall_start(windows_door, room_width, room_depth)
+        if start is None:
+            raise ValueError(f"{windows_door.name} is not positioned on the {windows_door.wall} wall")
+
+        wall = _text(windows_door.wall)
+        hinge = windows_door.hinge
+        width = windows_door.width
+        for step in self.steps:
+            if step == FLIP_X and wall in ("left", "right"):
+                start = room_width - start - width
+            elif step == FLIP_Y and wall in ("top", "bottom"):
+                start = room_depth - start - width
+            wall = _map_wall(wall, step)
+            hinge = _map_hinge(hinge)
+            if step == TRANSPOSE:
+                room_width, room_depth = room_depth, room_width
+
+        position = {
+            "top": (0.0, start),
+            "bottom": (room_width, start),
+            "left": (start, 0.0),
+            "right": (start, room_depth),
+        }[wall]
+        mapped = _copy_windows_door(windows_door)
+        mapped.wall = wall
+        mapped.position = tuple(float(v) for v in position)
+        mapped.hinge = hinge
+        return mapped
+
+    def map_placed_object(self, entry, room_width, room_depth):
+        """Return a transformed copy of a placed {"object", "position"} entry."""
+        obj = entry["object"]
+        position = entry["position"]
+        x, y, width, depth = self.map_rect(position[:4], room_width, room_depth)
+        shadow = self.map_shadow(position[5]) if len(position) > 5 else None
+
+        mapped_obj = BathroomObject(
+            object_type=obj.object_type,
+            width=width,
+            depth=depth,
+            height=obj.height,
+            shadow=self.map_shadow(obj.shadow),
+            position=(x, y),
+            wall=self.map_wall(obj.wall)
+        )
+        mapped_position = (x, y, width, depth) + tuple(position[4:5])
+        if len(position) > 5:
+            mapped_position += (shadow,) + tuple(position[6:])
+        return {"object": mapped_obj, "position": mapped_position}
+
+    def map_layout(self, layout, windows_doors=None, scoring_function=None):
+        """
+        Return a transformed copy of a layout, scored in the target orientation.
+
+        Args:
+            layout: Layout in the source orientation
+            windows_doors: Windows/doors of the target room, mapped from the layout's when None
+            scoring_function: Scores the copy, BathroomScoringFunction when None
+
+        Returns:
+            Layout in the target orientation
+        """
+        bathroom = layout.bathroom
+        room_width, room_depth = bathroom.width, bathroom.depth
+        target_width, target_depth = self.room_size(room_width, room_depth)
+        if windows_doors is None:
+            windows_doors = [self.map_windows_door(wd, room_width, room_depth) for wd in bathroom.windows_doors]
+        objects = [self.map_placed_object(entry, room_width, room_depth) for entry in bathroom.objects]
+
+        mapped_bathroom = Bathroom(target_width, target_depth, bathroom.height,
+                                   objects, list(windows_doors), bathroom.OBJECT_TYPES)
+        mapped = Layout(mapped_bathroom, layout.requested_objects)
+        mapped.evaluate(scoring_function if scoring_function is not None else BathroomScoringFunction())
+        return mapped
+
+
+def _copy_windows_door(windows_door):
+    if hasattr(windows_door, "copy") and callable(windows_door.copy):
+        return windows_door.copy()  # pydantic models
+    import copy
+    return copy.copy(windows_door)
+
+
+def all_transforms():
+    """The 8 symmetries of a rectangle, identity first."""
+    return [RoomTransform(step for step, used in zip((FLIP_X, FLIP_Y, TRANSPOSE), flags) if used)
+            for flags in product((False, True), repeat=3)]
+
+
+# Transforms BathroomScoringFunction gives every layout the same score under.
+# None of the 7 other symmetries qualifies: the door side of the toilet and
+# sink terms, the free space before toilets and the door depth of
+# sink_symmetrial_door all change when a room is mirrored or turned.
+# test_symmetry checks that every transform listed here keeps the scores.
+SCORE_INVARIANT_TRANSFORMS = (RoomTransform(),)
+
+
+def _orientation_key(room_width, room_depth, windows_doors, precision):
+    return (
+        round(float(room_width), precision),
+        round(float(room_depth), precision),
+        tuple(
+            (_text(wd.name), _text(wd.wall),
+             round(float(_wall_start(wd, room_width, room_depth)), precision),
+             round(float(wd.width), precision), round(float(wd.depth), precision),
+             round(float(wd.height), precision), _text(wd.hinge), _text(wd.way))
+            for wd in windows_doors
+        ),
+    )
+
+
+def canonical_transform(room_width, room_depth, windows_doors, precision=1, transforms=None):
+    """
+    Find the transform mapping a room to its canonical orientation.
+
+    The variants of a room under `transforms` (mirrored or turned, with the
+    windows and doors moved along) get the same canonical room. Rooms whose
+    windows/doors do not follow the wall position convention are left as they are.
+
+    Args:
+        room_width: Width of the room in cm
+        room_depth: Depth of the room in cm
+        windows_doors: Windows and doors of the room
+        precision: Number of decimals compared of every dimension
+        transforms: Candidate transforms, SCORE_INVARIANT_TRANSFORMS when None
+
+    Returns:
+        The RoomTransform to apply before the search
+    """
+    windows_doors = list(windows_doors or [])
+    if any(_wall_start(wd, room_width, room_depth) is None for wd in windows_doors):
+        return RoomTransform()
+
+    best_transform, best_key = RoomTransform(), None
+    for transform in (SCORE_INVARIANT_TRANSFORMS if transforms is None else transforms):
+        width, depth = transform.room_size(room_width, room_depth)
+        mapped = [transform.map_windows_door(wd, room_width, room_depth) for wd in windows_doors]
+        key = _orientation_key(width, depth, mapped, precision)
+        if best_key is None or key < best_key:
+            best_transform, best_key = transform, key
+    return best_transform
@@ -0,0 +1,164 @@
+"""
+Free intervals along the walls of a layout.
+This module indexes, for an object sliding along a wall, which start positions are
+blocked by the placed objects, their shadows and the door swing, so wall placement
+candidates can be rejected with a binary search instead of a full validity check.
+"""
+
+from bisect import bisect_left, bisect_right
+
+from utils.geometry import RoomGeometry, shadow_rect
+
+# Blocked intervals are shrunk by this much so rounding never rejects a valid position;
+# candidates inside a free interval are still checked exactly afterwards.
+_EPSILON = 1e-9
+
+
+class WallIntervalIndex:
+    """
+    Free start positions of an object sliding along a wall.
+
+    Placement candidates on the top/bottom walls slide along y with a fixed x,
+    candidates on the left/right walls slide along x with a fixed y. For a given
+    fixed coordinate, object size and shadow, every placed object (and the door
+    swing) blocks an open interval of start positions; the rest of the room
+    range is kept as sorted free intervals. Intervals are computed on first use
+    and cached.
+
+    A position in a free interval passes the object/shadow checks of
+    is_valid_placement and the door swing check of windows_doors_overlap;
+    the index is only used to skip positions that would fail them.
+    """
+
+    def __init__(self, placed_objects, room_width, room_depth, windows_doors=None, room_geometry=None):
+        self.room_width = room_width
+        self.room_depth = room_depth
+        # Rectangles an object may not overlap, with the shadow rectangles it must stay out of
+        self._objects = []
+        self._shadows = []
+        for rect in placed_objects:
+            obj = rect["object"]
+            rx, ry = obj.position[0], obj.position[1]
+            self._objects.append((rx, ry, obj.width, obj.depth))
+            self._shadows.append(shadow_rect(rx, ry, obj.width, obj.depth, obj.shadow))
+        door_rect = None
+        if windows_doors:
+            if room_geometry is None:
+                room_geometry = RoomGeometry(room_width, room_depth, windows_doors)
+            door_rect = room_geometry.door_swing_rect()
+        self._door = [door_rect] if door_rect is not None else []
+        self._intervals = {}
+
+    @staticmethod
+    def axis(wall):
+        """Axis along which objects on `wall` slide."""
+        return "y" if wall in ("top", "bottom") else "x"
+
+    def free_intervals(self, axis, fixed, width, depth, shadow):
+        """
+        Sorted, disjoint (start, end) intervals of valid start positions.
+
+        Args:
+            axis: "y" for the top/bottom walls, "x" for the left/right walls
+            fixed: The coordinate on the other axis (x for "y", y for "x")
+            width: Extent of the object along y
+            depth: Extent of the object along x
+            shadow: Shadow of the object as (top, left, right, bottom)
+
+        Returns:
+            List of closed (start, end) intervals
+        """
+        key = (axis, fixed, width, depth, tuple(shadow))
+        intervals = self._intervals.get(key)
+        if intervals is None:
+            intervals = self._compute(axis, fixed, width, depth, shadow)
+            self._intervals[key] = intervals
+        return intervals
+
+    def is_free(self, x, y, width, depth, shadow, wall):
+        """Whether an object at (x, y) against `wall` can pass the validity checks."""
+        axis = self.axis(wall)
+        fixed, position = (x, y) if axis == "y" else (y, x)
+        intervals = self.free_intervals(axis, fixed, width, depth, shadow)
+        i = bisect_right(intervals, (position, float("inf"))) - 1
+        return i >= 0 and intervals[i][0] <= position <= intervals[i][1]
+
+    def free_indices(self, axis, fixed, width, depth, shadow, position, count):
+        """
+        Indices of a run of start positions that lie in a free interval, in increasing order.
+
+        Args:
+            axis, fixed, width, depth, shadow: As for free_intervals
+            position: Function giving the start position of index i, monotonic in i
+            count: Number of positions in the run
+
+        Returns:
+            Iterator over the indices i < count with a free position(i)
+        """
+        if count <= 0:
+            return
+        intervals = self.free_intervals(axis, fixed, width, depth, shadow)
+        indices = range(count)
+        if position(0) <= position(count - 1):
+            for start, end in intervals:
+                yield from range(bisect_left(indices, start, key=position),
+                                 bisect_right(indices, end, key=position))
+        else:
+            def descending(i):
+                return -position(i)
+
+            for start, end in reversed(intervals):
+                yield from range(bisect_left(indices, -end, key=descending),
+                                 bisect_right(indices, -start, key=descending))
+
+    def _compute(self, axis, fixed, width, depth, shadow):
+        # Rectangles are split into (along, length, across, thickness), along being the sliding axis
+        if axis == "y":
+            along_limit, across_limit = self.room_depth, self.room_width
+            own = (fixed, 0, width, depth)
+
+            def split(rect):
+                return rect[1], rect[2], rect[0], rect[3]
+        else:
+            along_limit, across_limit = self.room_width, self.room_depth
+            own = (0, fixed, width, depth)
+
+            def split(rect):
+                return rect[0], rect[3], rect[1], rect[2]
+
+        _, own_length, own_across, own_thickness = split(own)
+        if own_across < 0 or own_across + own_thickness > across_limit or along_limit - own_length < 0:
+            return []
+
+        own_shadow = shadow_rect(*own, shadow)
+        pairs = [(own, other) for other in self._objects]
+        pairs += [(own_shadow, other) for other in self._objects]
+        pairs += [(own, other) for other in self._shadows]
+        pairs += [(own, other) for other in self._door]
+
+        blocked = []
+        for moving, other in pairs:
+            m_along, m_length, m_across, m_thickness = split(moving)
+            o_along, o_length, o_across, o_thickness = split(other)
+            if not (m_across < o_across + o_thickness and o_across < m_across + m_thickness):
+                continue
+            # Start positions at which `moving` overlaps `other` strictly inside
+            start = o_along - m_length - m_along + _EPSILON
+            end = o_along + o_length - m_along - _EPSILON
+            if start < end:
+                blocked.append((start, end))
+        blocked.sort()
+
+        intervals = []
+        low, high = 0, along_limit - own_length
+        for start, end in blocked:
+            if start > high:
+                break
+            if end <= low:
+                continue
+            if start >= low:
+                intervals.append((low, start))
+            low = max(low, end)
+        if low <= high:
+            intervals.append((low, high))
+        return intervals
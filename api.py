@@ -7,6 +7,9 @@ import os
 import uuid
 import pickle
 import enum
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
@@ -31,14 +34,87 @@ from models.layout import Layout
 
 from algorithms.beam_search import BeamSearch
 
-from optimization.scoring import BathroomScoringFunction
+from optimization.scoring import SCORING_VERSION, BathroomScoringFunction
 from utils.helpers import sort_objects_by_size
+from utils.layout_cache import LayoutCache, canonical_request_key
+from algorithms.symmetry import canonical_transform
 generated_layouts = {}
 
 # Create a directory for saving layout states if it doesn't exist
 LAYOUT_STATES_DIR = Path("data/layout_states")
 LAYOUT_STATES_DIR.mkdir(parents=True, exist_ok=True)
 
+# Optional process pool expanding the beam layouts of a request in parallel,
+# e.g. BEAM_SEARCH_WORKERS=8 on an 8 core host (0 or 1 keeps generation serial)
+BEAM_SEARCH_WORKERS = int(os.environ.get("BEAM_SEARCH_WORKERS", "0"))
+beam_search_executor = None
+if BEAM_SEARCH_WORKERS > 1:
+    from concurrent.futures import ProcessPoolExecutor
+    beam_search_executor = ProcessPoolExecutor(max_workers=BEAM_SEARCH_WORKERS)
+
+# Layout generation is CPU bound and runs on a bounded pool instead of the event loop.
+# At most GENERATION_WORKERS run at once and GENERATION_QUEUE_DEPTH more may wait,
+# further requests are rejected with 429 and a Retry-After header.
+GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", "2"))
+GENERATION_QUEUE_DEPTH = int(os.environ.get("GENERATION_QUEUE_DEPTH", "8"))
+GENERATION_RETRY_AFTER = int(os.environ.get("GENERATION_RETRY_AFTER", "5"))
+generation_executor = ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix="layout-generation")
+generation_slots = threading.BoundedSemaphore(GENERATION_WORKERS + GENERATION_QUEUE_DEPTH)
+
+
+# Beam search results of recent requests, LAYOUT_CACHE_DIR adds a persistent tier
+layout_cache = LayoutCache(
+    max_entries=int(os.environ.get("LAYOUT_CACHE_SIZE", "256")),
+    disk_dir=os.environ.get("LAYOUT_CACHE_DIR") or None
+)
+
+
+def generation_cache_key(request: "GenerateLayoutRequest") -> str:
+    """Cache key of a generate request, see canonical_request_key.
+
+    The key is built from the canonical orientation of the room, so variants
+    of a room the scoring cannot tell apart share one entry.
+    """
+    windows_doors = [
+        wd.copy(update={"hinge": wd.hinge or WallType.LEFT, "way": wd.way or DoorWay.INWARD})
+        for wd in request.windows_doors
+    ]
+    transform = canonical_transform(request.room_width, request.room_depth, windows_doors)
+    room_width, room_depth = transform.room_size(request.room_width, request.room_depth)
+    windows_doors = [transform.map_windows_door(wd, request.room_width, request.room_depth)
+                     for wd in windows_doors]
+    return canonical_request_key(room_width, room_depth, request.room_height,
+                                 request.objects_to_place, windows_doors, request.beam_width,
+                                 scorer_version=SCORING_VERSION)
+
+
+async def run_generation(func, *args):
+    """Run a blocking generation call on the generation pool and await its result.
+
+    Raises:
+        HTTPException: 429 if all workers are busy and the queue is full,
+                       503 if the pool is shutting down
+    """
+    retry_headers = {"Retry-After": str(GENERATION_RETRY_AFTER)}
+    if not generation_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=429,
+            detail="Too many layout generations in progress, please retry later",
+            headers=retry_headers
+        )
+    try:
+        future = generation_executor.submit(func, *args)
+    except RuntimeError:
+        generation_slots.release()
+        raise HTTPException(
+            status_code=503,
+            detail="Layout generation is not available, please retry later",
+            headers=retry_headers
+        )
+    # Free the slot when the work is done, even if the client went away meanwhile
+    future.add_done_callback(lambda _: generation_slots.release())
+    return await asyncio.wrap_future(future)
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Bathroom Layout Generator API",
@@ -85,6 +161,7 @@ class GenerateLayoutRequest(BaseModel):
     objects_to_place: List[str] = Field(description="List of object types to place in the bathroom")
     windows_doors: List[WindowsDoors] = Field(description="List of windows and doors in the bathroom")
     beam_width: int = Field(description="Beam width for the search algorithm (higher = more thorough but slower)")
+    time_budget_ms: Optional[int] = Field(default=None, gt=0, description="Time budget of the search in milliseconds; the search narrows its beam to finish within it")
     user_id: Optional[str] = Field(default=None, description="User ID for authenticated requests")
 
 class ObjectPosition(BaseModel):
@@ -108,6 +185,7 @@ class GenerateLayoutResponse(BaseModel):
     score_breakdown: Dict[str, float] = {}
     processing_time: float
     windows_doors: List[WindowsDoors]
+    truncated: bool = False  # True if the time budget cut the search short
 
 # Store generated layouts in memory (in production, consider using a database)
 generated_layouts = {}
@@ -176,9 +254,22 @@ def save_layout_state(layout_id: str, state_type: str, data: dict):
 @app.post("/api/generate", response_model=GenerateLayoutResponse)
 async def generate_layout(request: GenerateLayoutRequest, background_tasks: BackgroundTasks):
     """Generate a bathroom layout based on user input (public endpoint)."""
+    # Cache hits read the disk tier and save layout states, so they run on the pool too
+    return await run_generation(generate_layout_blocking, request, None, generation_cache_key(request))
+
+
+def generate_layout_blocking(request: GenerateLayoutRequest, layouts=None, cache_key=None):
+    """Build the response of a generate request, running the beam search unless layouts are given.
+
+    Called on the generation pool. With a `cache_key`, the layouts are looked up
+    in the layout cache first and the search only runs on a miss.
+    The search runs on the canonical orientation of the room (see algorithms.symmetry),
+    cached layouts are in that orientation too; they are mapped back and ranked again.
+    """
     try:
         import time
         start_time = time.time()
+        truncated = False
         # Convert object names to lowercase
         print("objects_to_place type", type(request.objects_to_place))
         objects_to_place = [obj.lower() for obj in request.objects_to_place]
@@ -216,10 +307,32 @@ async def generate_layout(request: GenerateLayoutRequest, background_tasks: Back
         }
         save_layout_state(request.id, "before", initial_state)
         
-        # Set up beam search
-        beam_search = BeamSearch(bathroom, objects_to_place, beam_width=request.beam_width)
-        # Run beam search to generate layouts
-        layouts = beam_search.generate(objects_to_place, windows_doors_objects)
+        transform = canonical_transform(request.room_width, request.room_depth, windows_doors_objects)
+        if layouts is None and cache_key is not None:
+            layouts = layout_cache.get(cache_key)
+        if layouts is None:
+            search_bathroom, search_windows_doors = bathroom, windows_doors_objects
+            if not transform.is_identity:
+                # Variants of a room the scoring cannot tell apart are searched as the same canonical room
+                search_width, search_depth = transform.room_size(request.room_width, request.room_depth)
+                search_windows_doors = [transform.map_windows_door(wd, request.room_width, request.room_depth)
+                                        for wd in windows_doors_objects]
+                search_bathroom = Bathroom(
+                    width=search_width,
+                    depth=search_depth,
+                    height=request.room_height,
+                    windows_doors=list(search_windows_doors),
+                    object_types=OBJECT_TYPES
+                )
+            # Set up beam search
+            beam_search = BeamSearch(search_bathroom, objects_to_place, beam_width=request.beam_width,
+                                     executor=beam_search_executor, time_budget_ms=request.time_budget_ms)
+            # Run beam search to generate layouts
+            layouts = beam_search.generate(objects_to_place, search_windows_doors)
+            truncated = beam_search.truncated
+            # Only complete searches are cached, a later request may have more time
+            if layouts and cache_key is not None and not truncated:
+                layout_cache.put(cache_key, layouts)
         print("ok")
         # If no layouts were generated, raise an error
         if not layouts or len(layouts) == 0:
@@ -229,6 +342,11 @@ async def generate_layout(request: GenerateLayoutRequest, background_tasks: Back
             )
         # Select the best layout (highest score)
         best_layout = layouts[0]  # Layouts are already sorted by score
+        if not transform.is_identity:
+            # Scores differ between orientations, so the layouts are ranked again once mapped back
+            inverse = transform.inverse()
+            mapped_layouts = [inverse.map_layout(layout, windows_doors_objects) for layout in layouts]
+            best_layout = max(mapped_layouts, key=lambda layout: layout.score)
         
         # Format the response
         objects_name = []
@@ -276,7 +394,8 @@ async def generate_layout(request: GenerateLayoutRequest, background_tasks: Back
             objects=objects,
             score_breakdown=best_layout.score_breakdown if hasattr(best_layout, 'score_breakdown') else {},
             processing_time=processing_time,
-            windows_doors = request.windows_doors
+            windows_doors = request.windows_doors,
+            truncated=truncated
         )
         
         # Store the layout in memory using the same ID
@@ -312,6 +431,12 @@ async def generate_layout(request: GenerateLayoutRequest, background_tasks: Back
             detail=f"Error generating layout: {str(e)}"
         )
 
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters of the generation result cache and of the layout score memo"""
+    from utils.score_memo import score_memo
+    return {**layout_cache.stats(), "score_memo": score_memo.stats()}
+
 @app.get("/api/layout/{layout_id}", response_model=GenerateLayoutResponse)
 async def get_layout(layout_id: str):
     """Retrieve a previously generated layout by ID"""
@@ -465,6 +590,13 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         print(f"Client {client_id} disconnected")
         del active_connections[client_id]
 
+@app.on_event("shutdown")
+def shutdown_generation_pools():
+    """Stop accepting generation work and release the worker pools."""
+    generation_executor.shutdown(wait=False, cancel_futures=True)
+    if beam_search_executor is not None:
+        beam_search_executor.shutdown(wait=False, cancel_futures=True)
+
 # Protected endpoints for authenticated users
 @app.post("/api/protected/generate", response_model=GenerateLayoutResponse)
 async def generate_layout_protected(
@@ -1,19 +1,117 @@
+class _PlacementChain:
+    """Persistent, append-only chain of placed object entries.
+
+    A node only stores the entries appended at that step plus a pointer to its
+    parent, so a cloned bathroom shares everything placed before it and adding
+    an object never touches the parent. The flattened tuple, the occupancy
+    grids, the placement index and the object table are built lazily and
+    cached per node.
+    """
+    __slots__ = ("entries", "parent", "_items", "occupancy", "placement_index", "object_table", "_placed", "_hashes", "scoring")
+
+    def __init__(self, entries, parent=None):
+        self.entries = tuple(entries)
+        self.parent = parent
+        self._items = None
+        self.occupancy = {}
+        self.placement_index = None
+        self.object_table = None
+        self._placed = None
+        self._hashes = None
+        self.scoring = {}
+
+    def __getstate__(self):
+        # Caches are rebuilt on demand and are not worth pickling
+        return (self.entries, self.parent)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def items(self):
+        """Return all entries of the chain, oldest first."""
+        if self._items is None:
+            if self.parent is None:
+                self._items = self.entries
+            else:
+                self._items = self.parent.items() + self.entries
+        return self._items
+
+    def placed(self):
+        """Return the entries that have a position, oldest first."""
+        if self._placed is None:
+            placed = []
+            for obj in self.items():
+                # Handle both object instances and dictionaries
+                if isinstance(obj, dict):
+                    if 'position' in obj and obj['position'] is not None:
+                        placed.append(obj)
+                elif hasattr(obj, 'position') and obj.position is not None:
+                    placed.append(obj)
+            self._placed = tuple(placed)
+        return self._placed
+
+    def hashes(self):
+        """Return (signature hash, layout hash, placement keys) of the placed entries.
+
+        Both hashes are Zobrist hashes (see utils.layout_hash): the parent's
+        hash XOR the keys of the entries added at this node. The placement keys
+        are the full descriptions of the placed objects, in placement order.
+        """
+        if self._hashes is None:
+            from utils.layout_hash import full_placement, signature_placement, xor_keys
+
+            placed = [entry for entry in self.entries
+                      if isinstance(entry, dict) and entry.get('position') is not None]
+            keys = tuple(full_placement(entry) for entry in placed)
+            signature = xor_keys(signature_placement(entry) for entry in placed)
+            layout = xor_keys(keys)
+            if self.parent is not None:
+                parent_signature, parent_layout, parent_keys = self.parent.hashes()
+                signature ^= parent_signature
+                layout ^= parent_layout
+                keys = parent_keys + keys
+            self._hashes = (signature, layout, keys)
+        return self._hashes
+
+
 # A Bathroom is a room with a specific size and fixtures
 class Bathroom:
-    """Represents a bathroom with its dimensions and fixtures."""
+    """Represents a bathroom with its dimensions and fixtures.
+
+    Placed objects are stored copy-on-write: ``clone()`` shares the placed
+    entries, windows/doors and object types with the original, and
+    ``add_object`` only extends the clone's own chain. Placed entries must be
+    treated as immutable; call ``detach_objects()`` before editing them in place.
+    """
     
     def __init__(self, width, depth, height,objects=None,windows_doors=None,object_types=None):
         self.width = width
         self.depth = depth
         self.height = height
-        self.objects = objects if objects else []
+        self._chain = _PlacementChain(objects) if objects else None
         self.windows_doors = windows_doors if windows_doors else []
         self.OBJECT_TYPES = object_types
-        
-        
+        self._geometry = None
+
+    @property
+    def objects(self):
+        """Read-only view of the objects in the bathroom; use add_object or assign a new list to change them."""
+        return self._chain.items() if self._chain is not None else ()
+
+    @objects.setter
+    def objects(self, objects):
+        self._chain = _PlacementChain(objects) if objects else None
+
+    def __setstate__(self, state):
+        # Layout states pickled before copy-on-write storage hold a plain list
+        if "objects" in state:
+            objects = state.pop("objects")
+            state["_chain"] = _PlacementChain(objects) if objects else None
+        self.__dict__.update(state)
+
     def add_object(self, bathroom_object):
         """Add an object to the bathroom."""
-        self.objects.append(bathroom_object)
+        self._chain = _PlacementChain((bathroom_object,), self._chain)
         
     def add_window_door(self, window_door):
         """Add a window or door to the bathroom."""
@@ -21,15 +119,7 @@ class Bathroom:
         
     def get_placed_objects(self):
         """Get all placed objects."""
-        placed_objects = []
-        for obj in self.objects:
-            # Handle both object instances and dictionaries
-            if isinstance(obj, dict):
-                if 'position' in obj and obj['position'] is not None:
-                    placed_objects.append(obj)
-            elif hasattr(obj, 'position') and obj.position is not None:
-                placed_objects.append(obj)
-        return placed_objects
+        return list(self._chain.placed()) if self._chain is not None else []
     def get_placed_objects_name(self):
         """Get all placed objects."""
         placed_objects = []
@@ -55,8 +145,134 @@ class Bathroom:
         
     def clear_objects(self):
         """Remove all objects from the bathroom."""
-        self.objects = []
+        self._chain = None
+
+    def detach_objects(self):
+        """Replace the shared object entries with private copies that may be modified in place."""
+        import copy
+        if self._chain is not None:
+            self._chain = _PlacementChain(copy.deepcopy(self._chain.items()))
         
+    def get_occupancy(self, grid_size=1):
+        """Get the occupancy grid of the placed objects.
+
+        The grid is cached on the placement chain: a clone derives it from the
+        closest ancestor that already has one by painting only the objects
+        added since, instead of rasterizing the whole room again.
+        """
+        from algorithms.available_space import OccupancyGrid
+
+        key = (grid_size, self.width, self.depth)
+        pending = []
+        node = self._chain
+        while node is not None and key not in node.occupancy:
+            pending.append(node)
+            node = node.parent
+        grid = node.occupancy[key] if node is not None else OccupancyGrid((self.width, self.depth), grid_size)
+        for node in reversed(pending):
+            placed = [entry for entry in node.entries
+                      if isinstance(entry, dict) and entry.get('position') is not None]
+            grid = grid.with_objects(placed)
+            node.occupancy[key] = grid
+        return grid
+
+    def get_placement_index(self):
+        """Get the spatial index of the placed objects used for collision checks.
+
+        Like the occupancy grid, the index is cached on the placement chain and
+        a clone extends the closest ancestor's index with the objects added since.
+        """
+        from utils.geometry import PlacementIndex
+
+        pending = []
+        node = self._chain
+        while node is not None and node.placement_index is None:
+            pending.append(node)
+            node = node.parent
+        index = node.placement_index if node is not None else PlacementIndex()
+        for node in reversed(pending):
+            placed = [entry for entry in node.entries
+                      if isinstance(entry, dict) and entry.get('position') is not None]
+            index = index.with_objects(placed)
+            node.placement_index = index
+        return index
+
+    def get_object_table(self):
+        """Get the placed objects as a struct-of-arrays table (see models.object.PlacedObjectTable).
+
+        The table is cached on the placement chain like the placement index, and
+        its ``entries`` are the same dicts get_placed_objects() returns.
+        """
+        from models.object import PlacedObjectTable
+
+        pending = []
+        node = self._chain
+        while node is not None and node.object_table is None:
+            pending.append(node)
+            node = node.parent
+        table = node.object_table if node is not None else PlacedObjectTable()
+        for node in reversed(pending):
+            placed = [entry for entry in node.entries
+                      if isinstance(entry, dict) and entry.get('position') is not None]
+            table = table.with_objects(placed)
+            node.object_table = table
+        return table
+
+    def get_scoring_state(self, key, start, add):
+        """Get a per-object scoring state of the placed objects, folded along the placement chain.
+
+        The state is cached per chain node under `key`, so a clone extends the
+        closest ancestor's state with the objects placed since, like the
+        occupancy grid.
+
+        Args:
+            key: Hashable key of the scorer and room the state belongs to
+            start: Callable returning the state of an empty room
+            add: Callable (state, placed_objects, index) returning a new state
+                 with placed_objects[index] added; states must not be modified
+
+        Returns:
+            The state of all placed objects
+        """
+        pending = []
+        node = self._chain
+        while node is not None and key not in node.scoring:
+            pending.append(node)
+            node = node.parent
+        state = node.scoring[key] if node is not None else start()
+        count = len(node.placed()) if node is not None else 0
+        for node in reversed(pending):
+            placed = node.placed()
+            for index in range(count, len(placed)):
+                state = add(state, placed, index)
+            count = len(placed)
+            node.scoring[key] = state
+        return state
+
+    def get_layout_hash(self):
+        """Order independent 64-bit hash of the placed objects and their full geometry."""
+        return self._chain.hashes()[1] if self._chain is not None else 0
+
+    def get_signature_hash(self):
+        """Order independent 64-bit hash of the placed object types and rounded positions."""
+        return self._chain.hashes()[0] if self._chain is not None else 0
+
+    def get_placement_keys(self):
+        """Full descriptions of the placed objects in placement order (see utils.layout_hash.full_placement)."""
+        return self._chain.hashes()[2] if self._chain is not None else ()
+
+    def get_room_geometry(self):
+        """Get the door/window geometry of the room (see utils.geometry.RoomGeometry).
+
+        The geometry is shared with all clones and rebuilt only if the room size
+        or the windows/doors change.
+        """
+        geometry = getattr(self, "_geometry", None)
+        if geometry is None or not geometry.matches(self.width, self.depth, self.windows_doors):
+            from utils.geometry import RoomGeometry
+            geometry = self._geometry = RoomGeometry(self.width, self.depth, self.windows_doors)
+        return geometry
+
     def get_size(self):
         """Get the bathroom size."""
         return (self.width, self.depth, self.height)
@@ -74,5 +290,8 @@ class Bathroom:
             return [self.windows_doors.wall]
 
     def clone(self):
-        """Clone the bathroom."""
-        return Bathroom(self.width, self.depth, self.height, self.objects, self.windows_doors, self.OBJECT_TYPES)
\ No newline at end of file
+        """Clone the bathroom in O(1), sharing placed objects, windows/doors, their geometry and object types."""
+        bathroom = Bathroom(self.width, self.depth, self.height, None, self.windows_doors, self.OBJECT_TYPES)
+        bathroom._chain = self._chain
+        bathroom._geometry = getattr(self, "_geometry", None)
+        return bathroom
@@ -1,6 +1,31 @@
 
 
 # models/layout.py
+import threading
+
+_cpp_scorer = None
+_cpp_scorer_checked = False
+# Guards the pending breakdowns of layouts read from several threads
+_breakdown_lock = threading.Lock()
+
+
+def _get_cpp_scorer():
+    """Return the process wide C++ scorer, or None if the extension is not built.
+
+    Availability is decided on the first call and reused afterwards.
+    """
+    global _cpp_scorer, _cpp_scorer_checked
+    if not _cpp_scorer_checked:
+        try:
+            # Import here to avoid circular import
+            from optimization.cpp_scoring.python_wrapper import get_cpp_scorer, is_cpp_available
+            _cpp_scorer = get_cpp_scorer() if is_cpp_available() else None
+        except ImportError:
+            _cpp_scorer = None
+        _cpp_scorer_checked = True
+    return _cpp_scorer
+
+
 class Layout:
     """Represents a specific layout configuration."""
     
@@ -11,26 +36,182 @@ class Layout:
         self.requested_objects = requested_objects
         
     def clone(self):
-        """Create a deep copy of this layout."""
-        import copy
-        return copy.deepcopy(self)
+        """Create a copy-on-write child of this layout.
+
+        The child shares the parent's placed objects, windows/doors and object
+        type table (see ``Bathroom.clone``); only the objects added to the
+        child afterwards are stored on it.
+        """
+        new_layout = Layout.__new__(Layout)
+        new_layout.__dict__.update(self.__dict__)
+        new_layout.bathroom = self.bathroom.clone()
+        if self._score_breakdown is not None:
+            new_layout._score_breakdown = dict(self._score_breakdown)
+        if self.requested_objects is not None:
+            new_layout.requested_objects = list(self.requested_objects)
+        return new_layout
+
+    def __getstate__(self):
+        # Scorers are not pickled: a pending breakdown is computed first
+        state = dict(self.__dict__)
+        state["_score_breakdown"] = self.score_breakdown
+        state.pop("_breakdown_source", None)
+        return state
+
+    def __setstate__(self, state):
+        # Layouts pickled before the lazy breakdown carry a plain score_breakdown
+        state = dict(state)
+        if "_score_breakdown" not in state:
+            state["_score_breakdown"] = state.pop("score_breakdown", {})
+        state["_breakdown_source"] = None
+        self.__dict__.update(state)
         
+    @property
+    def score_breakdown(self):
+        """Breakdown of the score by category.
+
+        Layouts scored total-only (see evaluate_batch) compute it when it is
+        first read, with the scorer that computed their total.
+        """
+        if self._score_breakdown is None:
+            with _breakdown_lock:
+                if self._score_breakdown is None:
+                    scoring_function = self._breakdown_source
+                    score_breakdown = scoring_function.score(self)[1] if scoring_function is not None else {}
+                    self._score_breakdown, self._breakdown_source = score_breakdown, None
+        return self._score_breakdown
+
+    @score_breakdown.setter
+    def score_breakdown(self, score_breakdown):
+        self._score_breakdown = score_breakdown
+        self._breakdown_source = None
+
+    def set_score(self, score, score_breakdown, scoring_function=None):
+        """Set the score computed by `scoring_function`; a None breakdown is computed with it when first read."""
+        self.score = score
+        self._score_breakdown = score_breakdown
+        self._breakdown_source = scoring_function if score_breakdown is None else None
+
+    def score_result(self):
+        """The score and a copy of its breakdown, or None in its place if it was not computed yet."""
+        score_breakdown = self._score_breakdown
+        return self.score, dict(score_breakdown) if score_breakdown is not None else None
+
+    @property
+    def layout_hash(self):
+        """Zobrist hash of the placed objects, updated incrementally as objects are added."""
+        return self.bathroom.get_layout_hash()
+
+    @property
+    def signature_hash(self):
+        """Zobrist hash of the placed object types and positions rounded like BeamSearch.layout_signature."""
+        return self.bathroom.get_signature_hash()
+
+    def _memoizable(self):
+        return hasattr(self.bathroom, "get_layout_hash")
+
     def evaluate(self, scoring_function, use_cpp_scoring=False):
-        """Evaluate the layout using the provided scoring function."""
-        if use_cpp_scoring:
+        """Evaluate the layout using the provided scoring function.
+
+        Scores are memoized by layout hash and room (see utils.score_memo), so
+        an arrangement that was already scored is not scored again.
+        """
+        from utils.score_memo import score_memo
+
+        scorer = _get_cpp_scorer() if use_cpp_scoring else None
+        memoizable = self._memoizable()
+        if memoizable:
+            memo_scorer = scorer if scorer is not None else scoring_function
+            cached = score_memo.get(self, memo_scorer)
+            if cached is not None:
+                self.set_score(*cached, memo_scorer)
+                return
+        if scorer is not None:
             try:
-                # Import here to avoid circular import
-                from optimization.cpp_scoring.python_wrapper import CppBathroomScoringWrapper
-                scorer = CppBathroomScoringWrapper()
                 self.score, self.score_breakdown = scorer.score(self)
-            except (ImportError, Exception) as e:
-                # Fallback to Python scorer if C++ not available
-                print(f"[Warning] C++ scorer not available, using Python: {e}")
-                self.score, self.score_breakdown = scoring_function.score(self)
-        else:
-            # Use the provided scoring function (default behavior)
-            self.score, self.score_breakdown = scoring_function.score(self)
+                if memoizable:
+                    score_memo.put(self, scorer, self.score, self.score_breakdown)
+                return
+            except Exception as e:
+                print(f"[Warning] C++ scorer failed, using Python: {e}")
+        # Use the provided scoring function (default behavior)
+        self.score, self.score_breakdown = scoring_function.score(self)
+        if memoizable:
+            score_memo.put(self, scoring_function, self.score, self.score_breakdown)
+
+    @staticmethod
+    def evaluate_batch(layouts, scoring_function, use_cpp_scoring=False, total_only=False):
+        """Evaluate several layouts, e.g. all children of one beam parent, in one call.
+
+        With the C++ scorer the layouts are marshalled in bulk, otherwise
+        ``scoring_function.score_batch`` is used when available. Layouts found in
+        the score memo are not passed to the scorer. With `total_only`, the
+        Python scorer only computes the totals and the breakdowns are computed
+        when they are first read.
+        """
+        from utils.layout_hash import scoring_placements
+        from utils.score_memo import score_memo
+
+        scorer = _get_cpp_scorer() if use_cpp_scoring else None
+        if not hasattr(scoring_function, "score_batch") and scorer is None:
+            for layout in layouts:
+                layout.evaluate(scoring_function)
+            return
+        memo_scorer = scorer if scorer is not None else scoring_function
+        pending = []
+        # Placement options may repeat within a batch, such layouts are scored once
+        repeats = []
+        first = {}
+        for layout in layouts:
+            if not layout._memoizable():
+                pending.append(layout)
+                repeats.append([])
+                continue
+            cached = score_memo.get(layout, memo_scorer)
+            if cached is not None:
+                layout.set_score(*cached, memo_scorer)
+                continue
+            key = (score_memo.key(layout, memo_scorer),
+                   scoring_placements(layout.bathroom.get_placement_keys(), memo_scorer))
+            if key in first:
+                repeats[first[key]].append(layout)
+            else:
+                first[key] = len(pending)
+                pending.append(layout)
+                repeats.append([])
+        if not pending:
+            return
+        results = None
+        if scorer is not None:
+            try:
+                results = scorer.score_batch(pending)
+            except Exception as e:
+                print(f"[Warning] C++ scorer failed, using Python: {e}")
+                memo_scorer = scoring_function
+        if results is None:
+            if hasattr(scoring_function, "score_batch"):
+                if total_only:
+                    results = scoring_function.score_batch(pending, total_only=True)
+                else:
+                    results = scoring_function.score_batch(pending)
+            else:
+                for layout in pending:
+                    layout.evaluate(scoring_function)
+                results = [(layout.score, layout.score_breakdown) for layout in pending]
+        for layout, layout_repeats, (score, score_breakdown) in zip(pending, repeats, results):
+            layout.set_score(score, score_breakdown, memo_scorer)
+            if layout._memoizable():
+                score_memo.put(layout, memo_scorer, score, score_breakdown)
+            placements = layout.bathroom.get_placement_keys()
+            for repeat in layout_repeats:
+                # The breakdown of overlapping placements may depend on their order
+                same_order = repeat.bathroom.get_placement_keys() == placements
+                repeat.set_score(score, layout.score_result()[1] if same_order else None, memo_scorer)
         
+    def get_occupancy(self, grid_size=1):
+        """Get the occupancy grid of the layout, derived incrementally from its parent's."""
+        return self.bathroom.get_occupancy(grid_size)
+
     def get_object_positions(self):
         """Get positions of all objects in the layout."""
         return [(obj.position[0], obj.position[1], obj.width, obj.depth, 
@@ -1,6 +1,12 @@
 # import object_types from utils
-from utils.helpers import get_object_def, convert_values
+import hashlib
+
+import numpy as np
+from utils.helpers import OBJECT_TYPES, get_object_def, convert_values
 class BaseObject:
+    # Slotted: a search creates one object per placement candidate
+    __slots__ = ("object_type", "name", "width", "depth", "height", "shadow", "position", "wall")
+
     def __init__(self, object_type, width=None, depth=None, height=None, shadow=None, position=None, wall=None):
         self.object_type = object_type  # Type of object (e.g., 'sink', 'toilet')
         self.name = object_type  # Use object_type as name for compatibility
@@ -10,6 +16,17 @@ class BaseObject:
         self.shadow = shadow  # Shadow space (top, right, bottom, left)
         self.position = position  # (x, y) or None if not placed
         self.wall = wall # wall the object is against
+
+    def __getstate__(self):
+        return {slot: getattr(self, slot, None) for slot in BaseObject.__slots__}
+
+    def __setstate__(self, state):
+        # Objects pickled before __slots__ carry a plain __dict__
+        if isinstance(state, tuple):
+            state = dict(state[0] or {}, **(state[1] or {}))
+        for key, value in state.items():
+            if key in BaseObject.__slots__:
+                setattr(self, key, value)
         
 
 
@@ -17,6 +34,7 @@ class BaseObject:
 # A BathroomObject is an object that can be placed in a bathroom
 class BathroomObject(BaseObject):
     """Represents a bathroom object with its properties and constraints."""
+    __slots__ = ()
     
     def __init__(self, object_type, width=None, depth=None, height=None, shadow=None, position=None, wall=None):
         super().__init__(object_type, width, depth, height, shadow, position, wall)
@@ -52,4 +70,85 @@ class BathroomObject(BaseObject):
         _,_,_,_,shadow_top, shadow_left, shadow_right, shadow_bottom = convert_values(self.get_footprint(), shadow, self.wall)
         
         
-        return (shadow_top, shadow_left, shadow_right, shadow_bottom)
\ No newline at end of file
+        return (shadow_top, shadow_left, shadow_right, shadow_bottom)
+
+
+# Wall and object type codes of PlacedObjectTable rows
+WALL_CODES = {wall: code for code, wall in enumerate(
+    ("top", "bottom", "left", "right", "top-left", "top-right", "bottom-left", "bottom-right"))}
+_TYPE_NAMES = {}
+
+
+def object_type_code(name):
+    """Integer code of an object type name, a hash of the name that is the same in every process.
+
+    The 48 bit code is stored exactly in the float64 table rows.
+    """
+    code = int.from_bytes(hashlib.blake2b(name.encode("utf-8"), digest_size=6).digest(), "big")
+    _TYPE_NAMES.setdefault(code, name)
+    return code
+
+
+def object_type_name(code):
+    """Object type name of a code returned by object_type_code."""
+    return _TYPE_NAMES[int(code)]
+
+
+for _name in OBJECT_TYPES:
+    object_type_code(_name)
+
+
+class PlacedObjectTable:
+    """
+    Struct-of-arrays view of placed objects.
+
+    One float64 row per placed object with the COLUMNS below, in placement
+    order. Walls are stored as WALL_CODES (-1 if unknown) and object types as
+    object_type_code() codes. The {"object", "position"} entries the rows were
+    built from are kept, so ``entry(i)`` gives the dict view back. Tables are
+    immutable; ``with_objects`` returns an extended copy.
+    """
+    COLUMNS = ("x", "y", "width", "depth", "height", "wall", "type",
+               "shadow_top", "shadow_left", "shadow_right", "shadow_bottom")
+    X, Y, WIDTH, DEPTH, HEIGHT, WALL, TYPE = range(7)
+    SHADOW = slice(7, 11)
+    GEOMETRY = [0, 1, 2, 3, 4, 7, 8, 9, 10]  # x, y, width, depth, height and the shadow
+
+    def __init__(self, rows=None, entries=()):
+        self.rows = rows if rows is not None else np.empty((0, len(self.COLUMNS)))
+        self.rows.flags.writeable = False
+        self.entries = tuple(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def row(obj):
+        """Table row of a placed object; shadows that are not 4 values are stored as 0."""
+        shadow = obj.shadow
+        if not (isinstance(shadow, (list, tuple)) and len(shadow) >= 4):
+            shadow = (0, 0, 0, 0)
+        return (obj.position[0], obj.position[1], obj.width, obj.depth, obj.height,
+                WALL_CODES.get(obj.wall, -1), object_type_code(obj.name),
+                shadow[0], shadow[1], shadow[2], shadow[3])
+
+    @classmethod
+    def from_objects(cls, placed_objects):
+        """Build a table of placed {"object", "position"} entries."""
+        return cls().with_objects(placed_objects)
+
+    def with_objects(self, placed_objects):
+        """Return a copy of the table with more placed objects appended."""
+        placed_objects = tuple(placed_objects)
+        if not placed_objects:
+            return self
+        new_rows = np.array([self.row(entry["object"]) for entry in placed_objects], dtype=np.float64)
+        return PlacedObjectTable(np.concatenate((self.rows, new_rows)), self.entries + placed_objects)
+
+    def entry(self, i):
+        """The {"object", "position"} entry of row i."""
+        return self.entries[i]
+
+    def column(self, name):
+        """One column of the table by name."""
+        return self.rows[:, self.COLUMNS.index(name)]
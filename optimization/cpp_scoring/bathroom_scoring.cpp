@@ -3,49 +3,86 @@
 #include <set>
 #include <queue>
 #include <algorithm>
+#include <array>
 
 namespace bathroom_scoring {
 
-BathroomScoringFunction::BathroomScoringFunction() {}
+namespace {
 
-BathroomScoringFunction::~BathroomScoringFunction() {}
+// Grid used for the enclosed-space and corner-accessibility terms (SPACE_GRID_SIZE in scoring.py)
+const int SPACE_GRID_SIZE = 10;
+const double CORNER_SIZE = 30.0;
+const double MIN_PATH_WIDTH = 60.0;
 
-// Get the four corners of a rectangular object
-std::vector<std::tuple<double, double>> BathroomScoringFunction::get_corners(
-    double x, double y, double width, double depth) const {
-    return {
-        std::make_tuple(x, y),                  // top-left
-        std::make_tuple(x, y + width),          // top-right
-        std::make_tuple(x + depth, y),          // bottom-left
-        std::make_tuple(x + depth, y + width)   // bottom-right
-    };
+std::string to_lower(const std::string& text) {
+    std::string result = text;
+    std::transform(result.begin(), result.end(), result.begin(),
+                   [](unsigned char c) { return static_cast<char>(std::tolower(c)); });
+    return result;
 }
 
-// Calculate minimum distance between corners of two objects
-double BathroomScoringFunction::min_corner_distance(
-    const std::vector<std::tuple<double, double>>& corners1,
-    const std::vector<std::tuple<double, double>>& corners2) const {
-    
-    double min_dist = std::numeric_limits<double>::max();
-    
-    for (const auto& c1 : corners1) {
-        for (const auto& c2 : corners2) {
-            double dx = std::get<0>(c1) - std::get<0>(c2);
-            double dy = std::get<1>(c1) - std::get<1>(c2);
-            double dist = std::sqrt(dx * dx + dy * dy);
-            min_dist = std::min(min_dist, dist);
-        }
+bool starts_with(const std::string& text, const std::string& prefix) {
+    return text.compare(0, prefix.size(), prefix) == 0;
+}
+
+bool contains(const std::string& text, const std::string& part) {
+    return text.find(part) != std::string::npos;
+}
+
+// Python's int(value // grid_size) for the grid cells of a coordinate
+int grid_index(double value, int grid_size) {
+    return static_cast<int>(std::floor(value / grid_size));
+}
+
+// Python's slice start clamping for slices like grid[gw - 3:gw]
+int slice_start(int start, int length) {
+    if (start < 0) {
+        return std::max(0, start + length);
     }
-    
-    return min_dist;
+    return std::min(start, length);
+}
+
+bool is_door(const WindowDoor& wd) {
+    return starts_with(wd.name, "door");
+}
+
+Rectangle object_rect(const PlacedObject& obj) {
+    return Rectangle(obj.x, obj.y, obj.width, obj.depth);
 }
 
-// Check if two rectangles overlap
+}  // namespace
+
+BathroomScoringFunction::BathroomScoringFunction() {}
+
+BathroomScoringFunction::~BathroomScoringFunction() {}
+
+// Check if two rectangles overlap; width runs along y and depth along x,
+// and a rectangle contained in the other counts as an overlap
 bool BathroomScoringFunction::check_overlap(const Rectangle& rect1, const Rectangle& rect2) const {
-    return !(rect1.x + rect1.depth <= rect2.x ||
-             rect2.x + rect2.depth <= rect1.x ||
-             rect1.y + rect1.width <= rect2.y ||
-             rect2.y + rect2.width <= rect1.y);
+    double left1 = rect1.y, right1 = rect1.y + rect1.width;
+    double top1 = rect1.x, bottom1 = rect1.x + rect1.depth;
+    double left2 = rect2.y, right2 = rect2.y + rect2.width;
+    double top2 = rect2.x, bottom2 = rect2.x + rect2.depth;
+
+    if (left1 >= left2 && right1 <= right2 && top1 >= top2 && bottom1 <= bottom2) {
+        return true;
+    }
+    if (left2 >= left1 && right2 <= right1 && top2 >= top1 && bottom2 <= bottom1) {
+        return true;
+    }
+    if (right1 <= left2 || right2 <= left1 || bottom1 <= top2 || bottom2 <= top1) {
+        return false;
+    }
+    return true;
+}
+
+// Check if two objects overlap; objects without height never overlap
+bool BathroomScoringFunction::check_overlap(
+    const Rectangle& rect1, double height1, const Rectangle& rect2, double height2) const {
+    if (height1 <= 0 || height2 <= 0) {
+        return false;
+    }
+    return check_overlap(rect1, rect2);
 }
 
 // Check if a rectangle overlaps with any in a vector
@@ -58,17 +95,13 @@ bool BathroomScoringFunction::check_overlap(const std::vector<Rectangle>& rects,
     return false;
 }
 
-// Calculate overlap area between two rectangles
+// Calculate overlap area between two rectangles; like calculate_single_overlap_area
+// this pairs x with width and y with depth
 double BathroomScoringFunction::calculate_overlap_area(const Rectangle& rect1, const Rectangle& rect2) const {
-    if (!check_overlap(rect1, rect2)) {
-        return 0.0;
-    }
-    
-    double x_overlap = std::min(rect1.x + rect1.depth, rect2.x + rect2.depth) - 
-                       std::max(rect1.x, rect2.x);
-    double y_overlap = std::min(rect1.y + rect1.width, rect2.y + rect2.width) - 
-                       std::max(rect1.y, rect2.y);
-    
+    double x_overlap = std::max(0.0, std::min(rect1.x + rect1.width, rect2.x + rect2.width) -
+                                     std::max(rect1.x, rect2.x));
+    double y_overlap = std::max(0.0, std::min(rect1.y + rect1.depth, rect2.y + rect2.depth) -
+                                     std::max(rect1.y, rect2.y));
     return x_overlap * y_overlap;
 }
 
@@ -81,20 +114,37 @@ double BathroomScoringFunction::calculate_overlap_area(const std::vector<Rectang
     return total_area;
 }
 
-// Check if object is placed in a corner
-bool BathroomScoringFunction::is_corner_placement(
+// Calculate minimum distance between the corners of two objects
+double BathroomScoringFunction::min_corner_distance(const PlacedObject& obj1, const PlacedObject& obj2) const {
+    const double corners1[4][2] = {
+        {obj1.x, obj1.y}, {obj1.x, obj1.y + obj1.width},
+        {obj1.x + obj1.depth, obj1.y}, {obj1.x + obj1.depth, obj1.y + obj1.width}
+    };
+    const double corners2[4][2] = {
+        {obj2.x, obj2.y}, {obj2.x, obj2.y + obj2.width},
+        {obj2.x + obj2.depth, obj2.y}, {obj2.x + obj2.depth, obj2.y + obj2.width}
+    };
+
+    double min_dist = std::numeric_limits<double>::infinity();
+    for (const auto& c1 : corners1) {
+        for (const auto& c2 : corners2) {
+            double dx = c1[0] - c2[0];
+            double dy = c1[1] - c2[1];
+            min_dist = std::min(min_dist, std::sqrt(dx * dx + dy * dy));
+        }
+    }
+    return min_dist;
+}
+
+// Check if an object lies within 50cm of any wall (the room sides are
+// compared the same way as the Python is_corner_placement_sink)
+bool BathroomScoringFunction::is_corner_placement_sink(
     double x, double y, double room_width, double room_depth,
     double obj_width, double obj_depth) const {
-    
-    const double tolerance = 1.0;  // 1cm tolerance
-    
-    bool at_top = std::abs(x) < tolerance;
-    bool at_bottom = std::abs(x + obj_depth - room_width) < tolerance;
-    bool at_left = std::abs(y) < tolerance;
-    bool at_right = std::abs(y + obj_width - room_depth) < tolerance;
-    
-    return (at_top && at_left) || (at_top && at_right) || 
-           (at_bottom && at_left) || (at_bottom && at_right);
+    const double corner_threshold = 50.0;
+    return x < corner_threshold || y < corner_threshold ||
+           x + obj_depth > room_depth - corner_threshold ||
+           y + obj_width > room_width - corner_threshold;
 }
 
 // Get opposite wall
@@ -110,731 +160,648 @@ std::string BathroomScoringFunction::get_opposite_wall(const std::string& wall)
     return "unknown";
 }
 
-// Calculate space behind door
-Rectangle BathroomScoringFunction::calculate_behind_door_space(
+// Calculate space behind door; returns false if the wall/hinge pair has none
+bool BathroomScoringFunction::calculate_behind_door_space(
     double door_x, double door_y, double door_width, double door_depth,
     const std::string& door_wall, const std::string& hinge,
-    double room_width, double room_depth) const {
-    
-    Rectangle space;
-    
-    if (door_wall == "top") {
-        if (hinge == "left") {
-            space = Rectangle(0, door_y, door_width, door_y);
-        } else {
-            space = Rectangle(0, door_y + door_width, door_width, room_depth - door_y - door_width);
-        }
-    } else if (door_wall == "bottom") {
-        if (hinge == "left") {
-            space = Rectangle(room_width - door_width, door_y, door_width, door_y);
-        } else {
-            space = Rectangle(room_width - door_width, door_y + door_width, door_width, room_depth - door_y - door_width);
-        }
-    } else if (door_wall == "left") {
-        if (hinge == "left") {
-            space = Rectangle(door_x, 0, door_x, door_width);
-        } else {
-            space = Rectangle(door_x + door_depth, 0, room_width - door_x - door_depth, door_width);
-        }
-    } else if (door_wall == "right") {
-        if (hinge == "left") {
-            space = Rectangle(door_x, room_depth - door_width, door_x, door_width);
-        } else {
-            space = Rectangle(door_x + door_depth, room_depth - door_width, room_width - door_x - door_depth, door_width);
-        }
-    }
-    
-    return space;
+    double room_width, double room_depth, Rectangle& space) const {
+
+    std::string hinge_lower = to_lower(hinge);
+
+    if ((door_wall == "top" && hinge_lower == "left") || (door_wall == "bottom" && hinge_lower == "right")) {
+        space = Rectangle(0, door_y + door_width, room_depth, room_width);
+    }
+    else if ((door_wall == "bottom" && hinge_lower == "left") || (door_wall == "top" && hinge_lower == "right")) {
+        space = Rectangle(0, 0, door_y, room_width);
+    }
+    else if ((door_wall == "left" && hinge_lower == "left") || (door_wall == "right" && hinge_lower == "right")) {
+        space = Rectangle(0, 0, room_depth, door_x);
+    }
+    else if ((door_wall == "right" && hinge_lower == "left") || (door_wall == "left" && hinge_lower == "right")) {
+        space = Rectangle(door_x + door_width, 0, room_depth, room_width);
+    }
+    else {
+        return false;
+    }
+    return true;
 }
 
-// Calculate space before door
-Rectangle BathroomScoringFunction::calculate_before_door_space(
+// Calculate space in front of door; returns false for an unknown wall
+bool BathroomScoringFunction::calculate_before_door_space(
     double door_x, double door_y, double door_width, double door_depth,
-    const std::string& door_wall, const std::string& hinge,
-    double room_width, double room_depth) const {
-    
-    Rectangle space;
-    const double clearance = 60.0;  // 60cm clearance
-    
+    const std::string& door_wall, double room_width, double room_depth,
+    Rectangle& space) const {
+
     if (door_wall == "top") {
-        space = Rectangle(0, door_y, clearance, door_width);
-    } else if (door_wall == "bottom") {
-        space = Rectangle(room_width - clearance, door_y, clearance, door_width);
-    } else if (door_wall == "left") {
-        space = Rectangle(door_x, 0, door_depth, clearance);
-    } else if (door_wall == "right") {
-        space = Rectangle(door_x, room_depth - clearance, door_depth, clearance);
-    }
-    
-    return space;
+        space = Rectangle(door_x + door_width, door_y, door_width, door_width);
+    }
+    else if (door_wall == "bottom") {
+        space = Rectangle(door_x - door_width, door_y, door_width, door_width);
+    }
+    else if (door_wall == "left") {
+        space = Rectangle(door_x, door_y + door_width, door_width, door_width);
+    }
+    else if (door_wall == "right") {
+        space = Rectangle(door_x, door_y - door_width, room_width, room_width);
+    }
+    else {
+        return false;
+    }
+    return true;
 }
 
-// Calculate free space before an object
+// Calculate free space in front of an object
 double BathroomScoringFunction::calculate_space_before_object(
-    const PlacedObject& obj,
-    const std::vector<PlacedObject>& placed_objects,
+    const PlacedObject& obj, const std::vector<PlacedObject>& placed_objects,
     const RoomSize& room_size) const {
-    
-    double min_space = std::numeric_limits<double>::max();
-    
-    // Determine the direction to check based on wall
-    if (obj.wall == "top" || obj.wall.find("top") != std::string::npos) {
-        // Check space in front (toward bottom)
-        double space_to_room = room_size.width - (obj.x + obj.depth);
-        min_space = std::min(min_space, space_to_room);
-        
-        // Check distance to other objects
-        for (const auto& other : placed_objects) {
-            if (&other == &obj) continue;
-            if (other.x > obj.x + obj.depth && other.y < obj.y + obj.width && other.y + other.width > obj.y) {
-                double dist = other.x - (obj.x + obj.depth);
-                min_space = std::min(min_space, dist);
-            }
-        }
-    } else if (obj.wall == "bottom" || obj.wall.find("bottom") != std::string::npos) {
-        // Check space in front (toward top)
-        min_space = std::min(min_space, obj.x);
-        
-        for (const auto& other : placed_objects) {
-            if (&other == &obj) continue;
-            if (other.x + other.depth < obj.x && other.y < obj.y + obj.width && other.y + other.width > obj.y) {
-                double dist = obj.x - (other.x + other.depth);
-                min_space = std::min(min_space, dist);
-            }
-        }
-    } else if (obj.wall == "left" || obj.wall.find("left") != std::string::npos) {
-        // Check space in front (toward right)
-        double space_to_room = room_size.depth - (obj.y + obj.width);
-        min_space = std::min(min_space, space_to_room);
-        
-        for (const auto& other : placed_objects) {
-            if (&other == &obj) continue;
-            if (other.y > obj.y + obj.width && other.x < obj.x + obj.depth && other.x + other.depth > obj.x) {
-                double dist = other.y - (obj.y + obj.width);
-                min_space = std::min(min_space, dist);
-            }
-        }
-    } else if (obj.wall == "right" || obj.wall.find("right") != std::string::npos) {
-        // Check space in front (toward left)
-        min_space = std::min(min_space, obj.y);
-        
-        for (const auto& other : placed_objects) {
-            if (&other == &obj) continue;
-            if (other.y + other.width < obj.y && other.x < obj.x + obj.depth && other.x + other.depth > obj.x) {
-                double dist = obj.y - (other.y + other.width);
-                min_space = std::min(min_space, dist);
-            }
+
+    const double x = obj.x, y = obj.y, width = obj.width, depth = obj.depth;
+    const double room_width = room_size.width, room_depth = room_size.depth;
+
+    std::string against_wall = "middle";
+    if (x == 0) against_wall = "top";
+    else if (y == 0) against_wall = "left";
+    else if (x + depth >= room_width) against_wall = "bottom";
+    else if (y + width >= room_depth) against_wall = "right";
+
+    if (x == 0 && y == 0) against_wall = "top-left";
+    else if (x == 0 && y + width >= room_depth) against_wall = "top-right";
+    else if (x + depth >= room_width && y == 0) against_wall = "bottom-left";
+    else if (x + depth >= room_width && y + width >= room_depth) against_wall = "bottom-right";
+
+    double free_space = 0.0;
+    Rectangle coords(x, y, width, depth);
+
+    if (against_wall == "middle") {
+        free_space = room_width * room_depth - width * depth;
+    }
+    else if (against_wall == "top") {
+        coords = Rectangle(x, y + width, depth, room_depth - width);
+        free_space = coords.width * coords.depth;
+    }
+    else if (against_wall == "left") {
+        coords = Rectangle(x + depth, y, room_width - depth, width);
+        free_space = coords.width * coords.depth;
+    }
+    else if (against_wall == "bottom") {
+        coords = Rectangle(x, 0, depth, y);
+        free_space = coords.width * coords.depth;
+    }
+    else if (against_wall == "right") {
+        coords = Rectangle(0, y, x, width);
+        free_space = coords.width * coords.depth;
+    }
+
+    // Subtract space occupied by placed objects, the object itself included
+    for (const auto& other : placed_objects) {
+        Rectangle other_rect = object_rect(other);
+        if (check_overlap(coords, other_rect)) {
+            free_space -= calculate_overlap_area(coords, other_rect);
         }
     }
-    
-    return min_space;
+
+    return free_space;
 }
 
-// Calculate Euclidean distance between two rectangles
+// Calculate Euclidean distance between rectangle top-left points
 double BathroomScoringFunction::check_euclidean_distance(const Rectangle& rect1, const Rectangle& rect2) const {
-    double center1_x = rect1.x + rect1.depth / 2.0;
-    double center1_y = rect1.y + rect1.width / 2.0;
-    double center2_x = rect2.x + rect2.depth / 2.0;
-    double center2_y = rect2.y + rect2.width / 2.0;
-    
-    double dx = center1_x - center2_x;
-    double dy = center1_y - center2_y;
-    
+    double dx = rect2.x - rect1.x;
+    double dy = rect2.y - rect1.y;
     return std::sqrt(dx * dx + dy * dy);
 }
 
-// Check if windows/doors overlap with object
+// Check if an object collides with the last window/door of the room
 bool BathroomScoringFunction::windows_doors_overlap(
-    const std::vector<WindowDoor>& windows_doors,
-    double x, double y, double z, double width, double depth, double height,
-    double room_width, double room_depth,
-    const std::tuple<double, double, double, double>& shadow,
-    const std::string& name) const {
-    
-    Rectangle obj_rect(x, y, width, depth);
-    
-    for (const auto& wd : windows_doors) {
-        Rectangle wd_rect(wd.x, wd.y, wd.width, wd.depth);
-        if (check_overlap(obj_rect, wd_rect)) {
+    const std::vector<WindowDoor>& windows_doors, const PlacedObject& obj,
+    const RoomSize& room_size) const {
+
+    if (windows_doors.empty()) {
+        return false;
+    }
+
+    const WindowDoor& wd = windows_doors.back();
+    const std::string name = to_lower(wd.name);
+    const Rectangle rect = object_rect(obj);
+    const double door_shadow = 75.0;
+
+    if (contains(name, "door")) {
+        Rectangle shadow;
+        bool has_shadow = true;
+        if (wd.wall == "top") {
+            shadow = Rectangle(wd.x, wd.y, wd.width, door_shadow);
+        }
+        else if (wd.wall == "bottom") {
+            shadow = Rectangle(wd.x - door_shadow, wd.y, wd.width, door_shadow);
+        }
+        else if (wd.wall == "left") {
+            shadow = Rectangle(wd.x, wd.y, door_shadow, wd.width);
+        }
+        else if (wd.wall == "right") {
+            shadow = Rectangle(wd.x, room_size.depth - door_shadow, door_shadow, wd.width);
+        }
+        else {
+            has_shadow = false;
+        }
+
+        if (has_shadow && check_overlap(shadow, rect)) {
             return true;
         }
+
+        if (contains(to_lower(obj.name), "toilet")) {
+            Rectangle behind;
+            if (calculate_behind_door_space(wd.x, wd.y, wd.width, wd.height, wd.wall, wd.hinge,
+                                            room_size.width, room_size.depth, behind) &&
+                check_overlap(behind, rect)) {
+                double overlap = calculate_overlap_area(behind, rect);
+                return !(overlap < room_size.width * room_size.depth - 3600);
+            }
+        }
     }
-    
+
+    if (contains(name, "window")) {
+        if (!(wd.x + wd.width <= obj.x || obj.x + obj.width <= wd.x)) {
+            return true;
+        }
+        if (!(wd.y + wd.height <= obj.y || obj.y + obj.depth <= wd.y)) {
+            return true;
+        }
+    }
+
     return false;
 }
 
-// Check if shower has at least one free side
+// Check if the shower has a free side; false once two nearby objects block it
 bool BathroomScoringFunction::has_free_side(
-    const Rectangle& shower_rect,
-    const std::vector<Rectangle>& objects_rect) const {
-    
-    const double min_clearance = 60.0;  // 60cm minimum clearance
-    
-    // Check each side
-    bool top_free = true, bottom_free = true, left_free = true, right_free = true;
-    
-    for (const auto& obj : objects_rect) {
-        // Skip if it's the shower itself
-        if (std::abs(obj.x - shower_rect.x) < 0.1 && 
-            std::abs(obj.y - shower_rect.y) < 0.1 &&
-            std::abs(obj.width - shower_rect.width) < 0.1 && 
-            std::abs(obj.depth - shower_rect.depth) < 0.1) {
+    const Rectangle& shower_rect, const std::vector<Rectangle>& objects_rect) const {
+
+    const double clearance = 60.0;
+    const double x = shower_rect.x, y = shower_rect.y;
+    const double width = shower_rect.width, depth = shower_rect.depth;
+    const Rectangle bigger_rect(x - clearance, y - clearance, width + 2 * clearance, depth + 2 * clearance);
+
+    int wrong_count = 0;
+    for (const auto& other : objects_rect) {
+        if (other.x == x && other.y == y && other.width == width && other.depth == depth) {
             continue;
         }
-        
-        // Check if object blocks any side
-        if (obj.x < shower_rect.x && obj.x + obj.depth > shower_rect.x - min_clearance) {
-            top_free = false;
+        if (!check_overlap(bigger_rect, other)) {
+            continue;
         }
-        if (obj.x > shower_rect.x + shower_rect.depth && obj.x < shower_rect.x + shower_rect.depth + min_clearance) {
-            bottom_free = false;
+        if ((other.y + width < y || other.y > y + depth) && depth > other.depth * 2) {
+            continue;
         }
-        if (obj.y < shower_rect.y && obj.y + obj.width > shower_rect.y - min_clearance) {
-            left_free = false;
+        if ((other.x + depth < x || other.x > x + depth) && width > other.width * 2) {
+            continue;
         }
-        if (obj.y > shower_rect.y + shower_rect.width && obj.y < shower_rect.y + shower_rect.width + min_clearance) {
-            right_free = false;
+        wrong_count++;
+        if (wrong_count == 2) {
+            return false;
         }
     }
-    
-    return top_free || bottom_free || left_free || right_free;
+    return true;
 }
 
-// Identify available space (simplified version)
-AvailableSpace BathroomScoringFunction::identify_available_space(
-    const std::vector<PlacedObject>& placed_objects,
-    const RoomSize& room_size,
-    int grid_size,
-    const std::vector<WindowDoor>& windows_doors) const {
-    
-    AvailableSpace result;
-    
-    // Create a grid representation
-    int grid_width = static_cast<int>(room_size.width / grid_size);
-    int grid_depth = static_cast<int>(room_size.depth / grid_size);
-    
-    std::vector<std::vector<bool>> grid(grid_width, std::vector<bool>(grid_depth, true));
-    
-    // Mark occupied spaces
+// Check that objects on opposite walls keep the minimum distance; like
+// opposite_wall_groups in utils/geometry.py, corner objects belong to the
+// wall their longer side runs along (square objects to both)
+bool BathroomScoringFunction::check_opposite_walls_distance(
+    const std::vector<PlacedObject>& placed_objects, double min_distance) const {
+
+    // left, right, top, bottom membership of each object
+    std::vector<std::array<bool, 4>> groups;
+    groups.reserve(placed_objects.size());
     for (const auto& obj : placed_objects) {
-        int start_x = static_cast<int>(obj.x / grid_size);
-        int start_y = static_cast<int>(obj.y / grid_size);
-        int end_x = static_cast<int>((obj.x + obj.depth) / grid_size);
-        int end_y = static_cast<int>((obj.y + obj.width) / grid_size);
-        
-        for (int i = start_x; i < end_x && i < grid_width; ++i) {
-            for (int j = start_y; j < end_y && j < grid_depth; ++j) {
-                grid[i][j] = false;
-            }
-        }
+        std::string wall = to_lower(obj.wall);
+        std::array<bool, 4> group = {false, false, false, false};
+        if (wall == "left" || wall == "right" || wall == "top" || wall == "bottom") {
+            group = {wall == "left", wall == "right", wall == "top", wall == "bottom"};
+        }
+        else if (wall == "top-left" || wall == "top-right" || wall == "bottom-left" || wall == "bottom-right") {
+            bool along_vertical = obj.width >= obj.depth;
+            bool along_horizontal = obj.width <= obj.depth;
+            group = {contains(wall, "left") && along_horizontal, contains(wall, "right") && along_horizontal,
+                     starts_with(wall, "top") && along_vertical, starts_with(wall, "bottom") && along_vertical};
+        }
+        groups.push_back(group);
     }
-    
-    // Find contiguous free spaces (simplified)
-    for (int i = 0; i < grid_width; ++i) {
-        for (int j = 0; j < grid_depth; ++j) {
-            if (grid[i][j]) {
-                result.without_shadow.push_back(
-                    Rectangle(i * grid_size, j * grid_size, grid_size, grid_size)
-                );
+
+    auto too_close = [min_distance](const PlacedObject& left, const std::array<bool, 4>& left_groups,
+                                    const PlacedObject& right, const std::array<bool, 4>& right_groups) {
+        if (left_groups[0] && right_groups[1] &&
+            left.x <= right.x + right.depth && left.x + left.depth >= right.x &&
+            right.y - (left.y + left.width) < min_distance) {
+            return true;
+        }
+        if (left_groups[2] && right_groups[3] &&
+            left.y <= right.y + right.width && left.y + left.width >= right.y &&
+            right.x - (left.x + left.depth) < min_distance) {
+            return true;
+        }
+        return false;
+    };
+
+    for (size_t i = 0; i < placed_objects.size(); ++i) {
+        for (size_t j = i + 1; j < placed_objects.size(); ++j) {
+            if (too_close(placed_objects[i], groups[i], placed_objects[j], groups[j]) ||
+                too_close(placed_objects[j], groups[j], placed_objects[i], groups[i])) {
+                return false;
             }
         }
     }
-    
-    return result;
+    return true;
 }
 
-// Check for enclosed spaces using flood-fill
-bool BathroomScoringFunction::check_enclosed_spaces(
-    const std::vector<Rectangle>& spaces,
-    double room_width, double room_depth,
-    int min_distance,
-    const std::tuple<std::string, double, double, double>& door_position) const {
-    
-    if (spaces.empty()) {
-        return false;
+// Port of algorithms.available_space.space_accessibility on the scoring grid:
+// returns (has_enclosed_spaces, corners_accessible)
+std::tuple<bool, bool> BathroomScoringFunction::space_accessibility(
+    const std::vector<PlacedObject>& placed_objects,
+    const std::vector<WindowDoor>& windows_doors,
+    const RoomSize& room_size) const {
+
+    const int grid = SPACE_GRID_SIZE;
+    const int gw = grid_index(room_size.width, grid);
+    const int gd = grid_index(room_size.depth, grid);
+    if (gw <= 0 || gd <= 0) {
+        return std::make_tuple(false, true);
     }
-    
-    const int grid_size = 5;
-    int grid_width = static_cast<int>(room_width / grid_size);
-    int grid_depth = static_cast<int>(room_depth / grid_size);
-    
-    // Create grid
-    std::vector<std::vector<int>> grid(grid_width, std::vector<int>(grid_depth, 0));
-    
-    // Mark available spaces
-    for (const auto& space : spaces) {
-        int start_x = std::max(0, static_cast<int>(space.x / grid_size));
-        int start_y = std::max(0, static_cast<int>(space.y / grid_size));
-        int end_x = std::min(grid_width, static_cast<int>((space.x + space.depth) / grid_size));
-        int end_y = std::min(grid_depth, static_cast<int>((space.y + space.width) / grid_size));
-        
+
+    auto at = [gd](int i, int j) { return static_cast<size_t>(i) * gd + j; };
+
+    std::vector<char> occupied(static_cast<size_t>(gw) * gd, 0);
+    for (const auto& obj : placed_objects) {
+        int start_x = std::max(0, grid_index(obj.x, grid));
+        int end_x = std::min(gw, grid_index(obj.x + obj.depth, grid));
+        int start_y = std::max(0, grid_index(obj.y, grid));
+        int end_y = std::min(gd, grid_index(obj.y + obj.width, grid));
         for (int i = start_x; i < end_x; ++i) {
             for (int j = start_y; j < end_y; ++j) {
-                grid[i][j] = 1;
+                occupied[at(i, j)] = 1;
             }
         }
     }
-    
-    // Count total free cells
-    int total_free = 0;
-    for (const auto& row : grid) {
-        for (int cell : row) {
-            total_free += cell;
+
+    // A free cell is on a pathway if the run of free cells through it along
+    // either axis is longer than min_cells
+    const int min_cells = static_cast<int>(std::floor(MIN_PATH_WIDTH / grid));
+    std::vector<int> run_x(occupied.size(), 0), run_y(occupied.size(), 0);
+    for (int i = 0; i < gw; ++i) {
+        for (int j = 0; j < gd; ++j) {
+            if (!occupied[at(i, j)]) {
+                run_x[at(i, j)] = (i > 0 ? run_x[at(i - 1, j)] : 0) + 1;
+                run_y[at(i, j)] = (j > 0 ? run_y[at(i, j - 1)] : 0) + 1;
+            }
         }
     }
-    
-    if (total_free == 0) {
-        return false;
+    // Spread the length of every run, found at its last cell, back over the run
+    for (int i = gw - 2; i >= 0; --i) {
+        for (int j = 0; j < gd; ++j) {
+            if (run_x[at(i, j)] && run_x[at(i + 1, j)]) {
+                run_x[at(i, j)] = run_x[at(i + 1, j)];
+            }
+        }
     }
-    
-    // Flood-fill from door or edges
-    std::vector<std::vector<bool>> visited(grid_width, std::vector<bool>(grid_depth, false));
-    std::queue<std::pair<int, int>> queue;
-    
-    // Start from door if specified, otherwise from edges
-    std::string door_wall = std::get<0>(door_position);
-    if (!door_wall.empty()) {
-        double door_x = std::get<1>(door_position);
-        double door_y = std::get<2>(door_position);
-        double door_width = std::get<3>(door_position);
-        
-        if (door_wall == "top") {
-            int start_y = static_cast<int>(door_y / grid_size);
-            int end_y = static_cast<int>((door_y + door_width) / grid_size);
-            for (int y = start_y; y <= end_y && y < grid_depth; ++y) {
-                if (grid[0][y] == 1) {
-                    queue.push({0, y});
-                    visited[0][y] = true;
-                }
+    for (int i = 0; i < gw; ++i) {
+        for (int j = gd - 2; j >= 0; --j) {
+            if (run_y[at(i, j)] && run_y[at(i, j + 1)]) {
+                run_y[at(i, j)] = run_y[at(i, j + 1)];
             }
         }
-        // Similar for other walls...
-    } else {
-        // Start from all edges
-        for (int i = 0; i < grid_width; ++i) {
-            if (grid[i][0] == 1) {
-                queue.push({i, 0});
-                visited[i][0] = true;
+    }
+    std::vector<char> pathway(occupied.size(), 0);
+    for (size_t cell = 0; cell < occupied.size(); ++cell) {
+        pathway[cell] = !occupied[cell] && (run_x[cell] > min_cells || run_y[cell] > min_cells);
+    }
+
+    // Seed the fill from the door cells, or from the pathway along the walls
+    std::vector<char> seeds(occupied.size(), 0);
+    bool has_doors = false;
+    for (const auto& wd : windows_doors) {
+        if (!is_door(wd)) {
+            continue;
+        }
+        has_doors = true;
+        if (wd.wall == "top" || wd.wall == "bottom") {
+            int row = wd.wall == "top" ? 0 : gw - 1;
+            int start = std::max(0, grid_index(wd.y, grid));
+            int end = std::min(gd, grid_index(wd.y + wd.width, grid) + 1);
+            for (int j = start; j < end; ++j) {
+                seeds[at(row, j)] = 1;
             }
-            if (grid[i][grid_depth - 1] == 1) {
-                queue.push({i, grid_depth - 1});
-                visited[i][grid_depth - 1] = true;
+        }
+        else if (wd.wall == "left" || wd.wall == "right") {
+            int column = wd.wall == "left" ? 0 : gd - 1;
+            int start = std::max(0, grid_index(wd.x, grid));
+            int end = std::min(gw, grid_index(wd.x + wd.width, grid) + 1);
+            for (int i = start; i < end; ++i) {
+                seeds[at(i, column)] = 1;
             }
         }
-        for (int j = 0; j < grid_depth; ++j) {
-            if (grid[0][j] == 1) {
-                queue.push({0, j});
-                visited[0][j] = true;
+    }
+    for (int i = 0; i < gw; ++i) {
+        for (int j = 0; j < gd; ++j) {
+            size_t cell = at(i, j);
+            if (has_doors) {
+                seeds[cell] = seeds[cell] && !occupied[cell];
+            }
+            else {
+                bool edge = i == 0 || j == 0 || i == gw - 1 || j == gd - 1;
+                seeds[cell] = edge && pathway[cell];
             }
-            if (grid[grid_width - 1][j] == 1) {
-                queue.push({grid_width - 1, j});
-                visited[grid_width - 1][j] = true;
+        }
+    }
+
+    std::vector<char> reached(occupied.size(), 0);
+    std::queue<std::pair<int, int>> queue;
+    for (int i = 0; i < gw; ++i) {
+        for (int j = 0; j < gd; ++j) {
+            if (seeds[at(i, j)]) {
+                reached[at(i, j)] = 1;
+                queue.push(std::make_pair(i, j));
             }
         }
     }
-    
-    // BFS flood-fill
-    int reachable = 0;
+    const int steps[4][2] = {{1, 0}, {-1, 0}, {0, 1}, {0, -1}};
     while (!queue.empty()) {
-        auto [x, y] = queue.front();
+        auto [i, j] = queue.front();
         queue.pop();
-        reachable++;
-        
-        // Check 4 neighbors
-        const int dx[] = {1, -1, 0, 0};
-        const int dy[] = {0, 0, 1, -1};
-        
-        for (int i = 0; i < 4; ++i) {
-            int nx = x + dx[i];
-            int ny = y + dy[i];
-            
-            if (nx >= 0 && nx < grid_width && ny >= 0 && ny < grid_depth &&
-                !visited[nx][ny] && grid[nx][ny] == 1) {
-                visited[nx][ny] = true;
-                queue.push({nx, ny});
+        for (const auto& step : steps) {
+            int ni = i + step[0], nj = j + step[1];
+            if (ni < 0 || nj < 0 || ni >= gw || nj >= gd) {
+                continue;
+            }
+            size_t cell = at(ni, nj);
+            if (!reached[cell] && (pathway[cell] || seeds[cell])) {
+                reached[cell] = 1;
+                queue.push(std::make_pair(ni, nj));
             }
         }
     }
-    
-    // If not all free spaces are reachable, there are enclosed spaces
-    return reachable < total_free;
-}
 
-// Check corner accessibility
-std::tuple<bool, std::map<std::string, std::map<std::string, bool>>> 
-BathroomScoringFunction::check_corner_accessibility(
-    const std::vector<PlacedObject>& placed_objects,
-    double room_width, double room_depth,
-    int min_path_width) const {
-    
-    std::map<std::string, std::map<std::string, bool>> corner_status;
-    std::vector<std::string> corners = {"top-left", "top-right", "bottom-left", "bottom-right"};
-    
-    for (const auto& corner : corners) {
-        corner_status[corner]["valid"] = true;  // Simplified - assume valid
+    bool has_enclosed = false;
+    for (size_t cell = 0; cell < occupied.size(); ++cell) {
+        if (pathway[cell] && !reached[cell]) {
+            has_enclosed = true;
+            break;
+        }
     }
-    
-    return std::make_tuple(true, corner_status);
-}
 
-// Check opposite walls distance
-std::tuple<bool, std::vector<std::string>> BathroomScoringFunction::check_opposite_walls_distance(
-    const std::vector<PlacedObject>& placed_objects,
-    const RoomSize& room_size,
-    int min_distance) const {
-    
-    std::vector<std::string> violations;
-    
-    for (size_t i = 0; i < placed_objects.size(); ++i) {
-        for (size_t j = i + 1; j < placed_objects.size(); ++j) {
-            const auto& obj1 = placed_objects[i];
-            const auto& obj2 = placed_objects[j];
-            
-            // Check if on opposite walls
-            if ((obj1.wall == "top" && obj2.wall == "bottom") ||
-                (obj1.wall == "bottom" && obj2.wall == "top") ||
-                (obj1.wall == "left" && obj2.wall == "right") ||
-                (obj1.wall == "right" && obj2.wall == "left")) {
-                
-                double distance = 0.0;
-                if (obj1.wall == "top" && obj2.wall == "bottom") {
-                    distance = obj2.x - (obj1.x + obj1.depth);
-                } else if (obj1.wall == "bottom" && obj2.wall == "top") {
-                    distance = obj1.x - (obj2.x + obj2.depth);
-                } else if (obj1.wall == "left" && obj2.wall == "right") {
-                    distance = obj2.y - (obj1.y + obj1.width);
-                } else if (obj1.wall == "right" && obj2.wall == "left") {
-                    distance = obj1.y - (obj2.y + obj2.width);
-                }
-                
-                if (distance < min_distance) {
-                    violations.push_back(obj1.name + " and " + obj2.name);
+    // A corner is fine if something stands in it or its middle cell is reached
+    const int size = std::max(1, static_cast<int>(std::floor(CORNER_SIZE / grid)));
+    const int middle = static_cast<int>(std::floor((CORNER_SIZE / 2) / grid));
+    const int corners[4][6] = {
+        // row start, row end, column start, column end, middle row, middle column
+        {0, size, 0, size, middle, middle},
+        {0, size, gd - size, gd, middle, gd - 1 - middle},
+        {gw - size, gw, 0, size, gw - 1 - middle, middle},
+        {gw - size, gw, gd - size, gd, gw - 1 - middle, gd - 1 - middle},
+    };
+    bool corners_valid = true;
+    for (const auto& corner : corners) {
+        int row_start = slice_start(corner[0], gw), row_end = std::min(corner[1], gw);
+        int column_start = slice_start(corner[2], gd), column_end = std::min(corner[3], gd);
+        bool blocked = false;
+        for (int i = row_start; i < row_end && !blocked; ++i) {
+            for (int j = column_start; j < column_end; ++j) {
+                if (occupied[at(i, j)]) {
+                    blocked = true;
+                    break;
                 }
             }
         }
+        if (blocked) {
+            continue;
+        }
+        int row = corner[4], column = corner[5];
+        bool inside = row >= 0 && row < gw && column >= 0 && column < gd;
+        if (!(inside && reached[at(row, column)])) {
+            corners_valid = false;
+            break;
+        }
     }
-    
-    return std::make_tuple(violations.empty(), violations);
+
+    return std::make_tuple(has_enclosed, corners_valid);
 }
 
-// Main scoring function
+// Main scoring function, mirroring BathroomScoringFunction.score in optimization/scoring.py
 std::tuple<double, std::map<std::string, double>> BathroomScoringFunction::score(
     const std::vector<PlacedObject>& placed_objects,
     const std::vector<WindowDoor>& windows_doors,
     const RoomSize& room_size,
     const std::vector<std::string>& requested_objects) {
-    
+
     double total_score = 0.0;
     std::map<std::string, double> scores;
-    
-    // Initialize scoring variables
+
+    const double room_width = room_size.width;
+    const double room_depth = room_size.depth;
+
     double wall_corner_score = 10.0;
-    std::map<std::string, double> wall_coverage = {
-        {"top", 0}, {"bottom", 0}, {"left", 0}, {"right", 0}
-    };
     double corner_coverage_score = 0.0;
-    std::map<std::string, std::vector<PlacedObject>> corner_objects;
     double door_sink_score = 10.0;
     double sink_score = 0.0;
     double sink_symmetrial_door_score = 0.0;
     double door_sink_distance_score = 0.0;
     double toilet_to_door_score = 0.0;
     double corner_toilet_score = 0.0;
-    double sink_space = 0.0;
+    double hidden_sink_score = 10.0;
+    double not_enough_space = 10.0;
+    double shadow_score = 0.0;
+    double bathtub_placement_score = 0.0;
+    double bathtub_size_score = 0.0;
+    double spacing_score = static_cast<double>(placed_objects.size()) * 10.0;
+    double no_overlap_score = 10.0;
     double toilet_space = 0.0;
-    int sink_count = 0;
     int toilet_count = 0;
     int shower_count = 0;
     int bathtub_count = 0;
+    bool corner_covered = false;
+
     std::vector<Rectangle> objects_rect;
-    double shadow_score = 0.0;
-    double bathtub_placement_score = 0.0;
-    double bathtub_size_score = 0.0;
-    double hidden_sink_score = 10.0;
-    double not_enough_space = 10.0;
-    double no_overlap_score = 10.0;
-    std::string opposite_wall = "";
+    Rectangle shower_rect;
+
+    // Door terms start from the last door of the room; sinks opposite a door
+    // switch them to each door in turn, and a bathtub replaces door_wall by
+    // the list of door walls, which no wall name matches
+    std::string door_wall;
+    bool door_wall_is_list = false;
+    std::string opposite_wall;
+    std::string first_door_wall;
     std::vector<Rectangle> behind_door_space;
     std::vector<Rectangle> before_door_space;
-    double spacing_score = placed_objects.size() * 10.0;
-    Rectangle shower_rect;
-    
-    // Check enclosed spaces
-    AvailableSpace available_space = identify_available_space(
-        placed_objects, room_size, 1, windows_doors
-    );
-    
-    auto door_pos = std::make_tuple(std::string(""), 0.0, 0.0, 0.0);
-    if (check_enclosed_spaces(available_space.without_shadow, room_size.width, 
-                             room_size.depth, 60, door_pos)) {
-        scores["enclosed_spaces"] = 0.0;
-    } else {
-        scores["enclosed_spaces"] = 10.0;
-    }
-    
-    // Check corner accessibility
-    auto [corners_valid, corner_status] = check_corner_accessibility(
-        placed_objects, room_size.width, room_size.depth, 60
-    );
-    scores["corner_accessibility"] = corners_valid ? 10.0 : 0.0;
-    
-    // Process doors
-    for (const auto& door_window : windows_doors) {
-        if (door_window.name.find("door") != std::string::npos) {
-            opposite_wall = get_opposite_wall(door_window.wall);
-            behind_door_space.push_back(calculate_behind_door_space(
-                door_window.x, door_window.y, door_window.width, door_window.depth,
-                door_window.wall, door_window.hinge, room_size.width, room_size.depth
-            ));
-            before_door_space.push_back(calculate_before_door_space(
-                door_window.x, door_window.y, door_window.width, door_window.depth,
-                door_window.wall, door_window.hinge, room_size.width, room_size.depth
-            ));
-        }
-    }
-    
-    // Process all objects
+    for (const auto& wd : windows_doors) {
+        if (!is_door(wd)) {
+            continue;
+        }
+        if (first_door_wall.empty()) {
+            first_door_wall = wd.wall;
+        }
+        door_wall = wd.wall;
+        opposite_wall = get_opposite_wall(door_wall);
+        Rectangle space;
+        if (calculate_behind_door_space(wd.x, wd.y, wd.width, wd.depth, wd.wall, wd.hinge,
+                                        room_width, room_depth, space)) {
+            behind_door_space.push_back(space);
+        }
+        if (calculate_before_door_space(wd.x, wd.y, wd.width, wd.depth, wd.wall,
+                                        room_width, room_depth, space)) {
+            before_door_space.push_back(space);
+        }
+    }
+
+    static const std::set<std::string> corner_walls = {
+        "top-left", "top-right", "bottom-left", "bottom-right"
+    };
+
     for (size_t i = 0; i < placed_objects.size(); ++i) {
-        const auto& obj = placed_objects[i];
-        Rectangle obj_rect(obj.x, obj.y, obj.width, obj.depth);
-        objects_rect.push_back(obj_rect);
-        
-        std::string name_lower = obj.name;
-        std::transform(name_lower.begin(), name_lower.end(), name_lower.begin(), ::tolower);
-        
-        if (name_lower == "shower") {
+        const PlacedObject& obj = placed_objects[i];
+        const double x = obj.x, y = obj.y, width = obj.width, depth = obj.depth;
+        const std::string name = to_lower(obj.name);
+        const std::string& wall = obj.wall;
+        const Rectangle rect = object_rect(obj);
+
+        objects_rect.push_back(rect);
+        if (name == "shower") {
             shower_count++;
-            shower_rect = obj_rect;
+            shower_rect = rect;
         }
-        if (name_lower == "bathtub") {
+        if (name == "bathtub") {
             bathtub_count++;
         }
-        
-        // Wall coverage
-        if (obj.wall == "top-left") {
-            wall_coverage["top"] += obj.width;
-            wall_coverage["left"] += obj.depth;
-        } else if (obj.wall == "top-right") {
-            wall_coverage["top"] += obj.width;
-            wall_coverage["right"] += obj.depth;
-        } else if (obj.wall == "bottom-left") {
-            wall_coverage["bottom"] += obj.width;
-            wall_coverage["left"] += obj.depth;
-        } else if (obj.wall == "bottom-right") {
-            wall_coverage["bottom"] += obj.width;
-            wall_coverage["right"] += obj.depth;
-        } else if (wall_coverage.find(obj.wall) != wall_coverage.end()) {
-            if (obj.wall == "top" || obj.wall == "bottom") {
-                wall_coverage[obj.wall] += obj.width;
-            } else {
-                wall_coverage[obj.wall] += obj.depth;
-            }
-        }
-        
-        // Check window/door overlap
-        if (!windows_doors.empty() && windows_doors_overlap(
-            windows_doors, obj.x, obj.y, 0, obj.width, obj.depth, obj.height,
-            room_size.width, room_size.depth, obj.shadow, obj.name)) {
+
+        if (!windows_doors.empty() && windows_doors_overlap(windows_doors, obj, room_size)) {
             no_overlap_score = 0.0;
         }
-        
-        // Check overlap with before door space
-        if (check_overlap(before_door_space, obj_rect)) {
-            double overlap = calculate_overlap_area(before_door_space, obj_rect);
-            if (name_lower == "bathtub") {
-                not_enough_space = 10.0;
-            }
+
+        if (is_corner_placement_sink(x, y, room_width, room_depth, width, depth)) {
+            corner_covered = true;
         }
-        
-        // Sink placement
-        if (name_lower == "sink" || name_lower == "double sink") {
-            if (obj.wall == opposite_wall) {
+
+        if (name == "sink" || name == "double sink") {
+            if (wall == opposite_wall) {
                 sink_score += 10.0;
-                
-                for (const auto& door_window : windows_doors) {
-                    if (door_window.name.find("door") != std::string::npos) {
-                        Rectangle behind_space = calculate_behind_door_space(
-                            door_window.x, door_window.y, door_window.width, door_window.depth,
-                            door_window.wall, door_window.hinge, room_size.width, room_size.depth
-                        );
-                        
-                        // Check symmetry
-                        if (door_window.wall == "top" || door_window.wall == "bottom") {
-                            if (door_window.y + door_window.width <= obj.y + obj.width && 
-                                door_window.y >= obj.y) {
-                                sink_symmetrial_door_score += 10.0;
-                            }
-                        } else if (door_window.wall == "left" || door_window.wall == "right") {
-                            if (door_window.x + door_window.depth <= obj.x + obj.depth && 
-                                door_window.x >= obj.x) {
-                                sink_symmetrial_door_score += 10.0;
-                            }
+
+                for (const auto& wd : windows_doors) {
+                    if (!is_door(wd)) {
+                        continue;
+                    }
+                    door_wall = wd.wall;
+                    door_wall_is_list = false;
+                    opposite_wall = get_opposite_wall(wd.wall);
+
+                    if (wd.wall == "top" || wd.wall == "bottom") {
+                        if (wd.y + wd.width <= y + width && wd.y >= y) {
+                            sink_symmetrial_door_score += 10.0;
                         }
-                        
-                        // Check hidden behind door
-                        if (check_overlap(behind_space, obj_rect)) {
-                            if (door_window.wall != obj.wall) {
-                                double overlap = calculate_overlap_area(behind_space, obj_rect);
-                                if (overlap > 0) {
-                                    hidden_sink_score = -20.0;
-                                }
-                            }
-                            if (door_window.wall == obj.wall) {
-                                hidden_sink_score -= 20.0;
-                            }
-                        } else if (door_window.wall != obj.wall) {
-                            door_sink_score += 5.0;
-                            
-                            Rectangle door_rect(door_window.x, door_window.y, 
-                                              door_window.width, door_window.depth);
-                            if (check_euclidean_distance(door_rect, obj_rect) < 200.0) {
-                                door_sink_distance_score += 10.0;
+                    }
+                    else if (wd.wall == "left" || wd.wall == "right") {
+                        if (wd.x + wd.depth <= x + depth && wd.x >= x) {
+                            sink_symmetrial_door_score += 10.0;
+                        }
+                    }
+
+                    Rectangle behind;
+                    bool has_behind = calculate_behind_door_space(
+                        wd.x, wd.y, wd.width, wd.depth, wd.wall, wd.hinge,
+                        room_width, room_depth, behind);
+                    if (has_behind && check_overlap(behind, rect)) {
+                        if (wd.wall != wall) {
+                            if (calculate_overlap_area(behind, rect) != 0) {
+                                hidden_sink_score = -20.0;
                             }
                         }
+                        if (wd.wall == wall) {
+                            hidden_sink_score -= 20.0;
+                        }
+                    }
+                    else if (wd.wall != wall) {
+                        door_sink_score += 5.0;
+                        if (check_euclidean_distance(Rectangle(wd.x, wd.y, wd.width, wd.depth), rect) < 200) {
+                            door_sink_distance_score += 10.0;
+                        }
                     }
                 }
             }
-            
-            double space = calculate_space_before_object(obj, placed_objects, room_size);
-            sink_space += space;
-            sink_count++;
-        }
-        // Toilet placement
-        else if (name_lower == "toilet" || name_lower == "toilet bidet") {
-            if (get_opposite_wall(opposite_wall) != obj.wall) {
+        }
+        else if (name == "toilet" || name == "toilet bidet") {
+            if (door_wall_is_list || get_opposite_wall(door_wall) != wall) {
                 door_sink_score += 5.0;
             }
-            
-            if (obj.wall.find("top") != std::string::npos || 
-                obj.wall.find("bottom") != std::string::npos ||
-                obj.wall.find("left") != std::string::npos || 
-                obj.wall.find("right") != std::string::npos) {
-                corner_toilet_score = 10.0;
-            } else {
-                corner_toilet_score = 0.0;
-            }
-            
-            double space = calculate_space_before_object(obj, placed_objects, room_size);
-            toilet_space += space;
+            corner_toilet_score = corner_walls.count(wall) ? 10.0 : 0.0;
+            toilet_space += calculate_space_before_object(obj, placed_objects, room_size);
             toilet_count++;
-            
-            for (const auto& door_window : windows_doors) {
-                if (door_window.name.find("door") != std::string::npos) {
-                    if (door_window.wall == obj.wall) {
-                        door_sink_score += 5.0;
-                    }
-                    
-                    if (check_overlap(before_door_space, obj_rect)) {
-                        toilet_to_door_score += -10.0;
-                    }
-                    
-                    if (check_overlap(behind_door_space, obj_rect)) {
-                        double overlap = calculate_overlap_area(behind_door_space, obj_rect);
-                        if (std::abs(overlap - obj.width * obj.depth) < 0.1) {
-                            toilet_to_door_score += 20.0;
-                            if (door_window.wall == obj.wall) {
-                                toilet_to_door_score += 20.0;
-                            }
-                        } else if (door_window.wall == obj.wall) {
-                            toilet_to_door_score += 10.0;
-                        }
+            bool same_wall = !door_wall_is_list && door_wall == wall;
+            if (same_wall) {
+                door_sink_score += 5.0;
+            }
+            if (check_overlap(before_door_space, rect)) {
+                toilet_to_door_score -= 10.0;
+            }
+            if (check_overlap(behind_door_space, rect)) {
+                double overlap = calculate_overlap_area(behind_door_space, rect);
+                if (overlap == width * depth) {
+                    toilet_to_door_score += 20.0;
+                    if (same_wall) {
+                        toilet_to_door_score += 20.0;
                     }
                 }
+                else if (same_wall) {
+                    toilet_to_door_score += 10.0;
+                }
             }
         }
-        
+
         scores["no_overlap"] = no_overlap_score;
-        total_score += scores["no_overlap"];
-        
-        // Shadow constraints
-        auto [shadow_top, shadow_left, shadow_right, shadow_bottom] = obj.shadow;
-        if (obj.x - shadow_top >= 0 && obj.y - shadow_left >= 0 &&
-            obj.x + obj.depth + shadow_bottom <= room_size.width &&
-            obj.y + obj.width + shadow_right <= room_size.depth) {
+        total_score += no_overlap_score;
+
+        // Check shadow constraints
+        double shadow_top = std::get<0>(obj.shadow);
+        double shadow_left = std::get<1>(obj.shadow);
+        double shadow_right = std::get<2>(obj.shadow);
+        double shadow_bottom = std::get<3>(obj.shadow);
+        if (x - shadow_top >= 0 && y - shadow_left >= 0 &&
+            x + depth + shadow_bottom <= room_width &&
+            y + width + shadow_right <= room_depth) {
             shadow_score += 1.0;
         }
-        
-        // Bathtub placement
-        if (name_lower.find("bathtub") != std::string::npos) {
-            std::string door_wall = "";
-            for (const auto& wd : windows_doors) {
-                if (wd.name.find("door") != std::string::npos) {
-                    door_wall = wd.wall;
-                    break;
-                }
-            }
-            
-            if (!door_wall.empty()) {
-                std::string door_opposite_wall = get_opposite_wall(door_wall);
-                if (obj.wall.find(door_opposite_wall) != std::string::npos || 
-                    door_opposite_wall.find(obj.wall) != std::string::npos) {
-                    if ((obj.width > obj.depth && (door_opposite_wall == "top" || door_opposite_wall == "bottom")) ||
-                        (obj.width < obj.depth && (door_opposite_wall == "left" || door_opposite_wall == "right"))) {
-                        bathtub_placement_score = 10.0;
-                    } else {
-                        bathtub_placement_score = 0.0;
-                    }
-                } else {
-                    bathtub_placement_score = 10.0;
-                }
+
+        // Bathtub placement against the wall opposite the first door
+        if (contains(name, "bathtub") && !first_door_wall.empty()) {
+            door_wall_is_list = true;
+            std::string door_opposite_wall = get_opposite_wall(first_door_wall);
+            if (contains(wall, door_opposite_wall) || contains(door_opposite_wall, wall)) {
+                bool along_wall = (width > depth && (door_opposite_wall == "top" || door_opposite_wall == "bottom")) ||
+                                  (width < depth && (door_opposite_wall == "left" || door_opposite_wall == "right"));
+                bathtub_placement_score = along_wall ? 10.0 : 0.0;
             }
-            
-            if (obj.width >= 140.0 || obj.depth >= 140.0) {
-                bathtub_size_score = 10.0;
-            } else {
-                bathtub_size_score = 0.0;
+            else {
+                bathtub_placement_score = 10.0;
             }
+            bathtub_size_score = (width >= 140 || depth >= 140) ? 10.0 : 0.0;
         }
-        
-        // Check spacing with other objects
-        auto corners1 = get_corners(obj.x, obj.y, obj.width, obj.depth);
+
         for (size_t j = i + 1; j < placed_objects.size(); ++j) {
-            const auto& obj2 = placed_objects[j];
-            auto corners2 = get_corners(obj2.x, obj2.y, obj2.width, obj2.depth);
-            
-            double min_dist = min_corner_distance(corners1, corners2);
-            if (min_dist > 10.0 && min_dist < 30.0) {
+            const PlacedObject& other = placed_objects[j];
+            double distance = min_corner_distance(obj, other);
+            if (distance < 30 && distance > 10) {
                 spacing_score -= 5.0;
             }
-            
-            Rectangle obj2_rect(obj2.x, obj2.y, obj2.width, obj2.depth);
-            if (check_overlap(obj_rect, obj2_rect)) {
+            if (check_overlap(rect, obj.height, object_rect(other), other.height)) {
                 no_overlap_score = 0.0;
                 break;
             }
         }
     }
-    
-    // Calculate wall coverage score
-    double wall_coverage_score = 0.0;
-    for (const auto& [wall, coverage] : wall_coverage) {
-        double coverage_percent = 0.0;
-        if (wall == "top" || wall == "bottom") {
-            coverage_percent = (coverage / room_size.depth) * 100.0;
-        } else if (wall == "left" || wall == "right") {
-            coverage_percent = (coverage / room_size.width) * 100.0;
-        }
-        
-        if (coverage_percent >= 70.0) {
-            wall_coverage_score += 5.0;
-        }
+
+    if (corner_covered) {
+        corner_coverage_score = 10.0;
     }
-    
-    // Normalize door_sink_score
-    door_sink_score = (door_sink_score / 15.0) * 10.0;
-    
-    // Check shower space
+    door_sink_score = door_sink_score / 15.0 * 10.0;
+
     scores["shower_space"] = 10.0;
-    if (shower_count > 0) {
-        if (has_free_side(shower_rect, objects_rect)) {
-            scores["shower_space"] = 10.0;
-        }
-        else {
-            scores["shower_space"] = 0.0;
-        }
+    if (shower_count > 0 && !has_free_side(shower_rect, objects_rect)) {
+        scores["shower_space"] = 0.0;
     }
-    
-    // Add all scores
+
     scores["wall_corner_constraints"] = wall_corner_score;
     scores["corner_coverage"] = corner_coverage_score;
     scores["door_sink_toilet"] = std::max(door_sink_score, 0.0);
@@ -845,7 +812,7 @@ std::tuple<double, std::map<std::string, double>> BathroomScoringFunction::score
     scores["corner_toilet"] = corner_toilet_score;
     scores["hidden_sink"] = hidden_sink_score;
     scores["not_enough_space"] = not_enough_space;
-    
+
     if (!placed_objects.empty()) {
         scores["spacing"] = std::max(spacing_score / static_cast<double>(placed_objects.size()), 0.0);
         scores["shadow_constraints"] = std::min((shadow_score / static_cast<double>(placed_objects.size())) * 10.0, 10.0);
@@ -853,21 +820,21 @@ std::tuple<double, std::map<std::string, double>> BathroomScoringFunction::score
         scores["spacing"] = 0.0;
         scores["shadow_constraints"] = 0.0;
     }
-    
+
     if (!requested_objects.empty()) {
-        scores["requested_objects"] = (static_cast<double>(placed_objects.size()) / 
+        scores["requested_objects"] = (static_cast<double>(placed_objects.size()) /
                                        static_cast<double>(requested_objects.size())) * 10.0;
     } else {
         scores["requested_objects"] = 0.0;
     }
-    
+
     if (bathtub_count > 0) {
         scores["bathtub_placement"] = std::max(bathtub_placement_score, 0.0);
         scores["bathtub_size"] = bathtub_size_score;
         total_score += scores["bathtub_placement"];
         total_score += scores["bathtub_size"];
     }
-    
+
     // Add all scores to total
     total_score += scores["wall_corner_constraints"];
     total_score += scores["corner_coverage"];
@@ -881,54 +848,46 @@ std::tuple<double, std::map<std::string, double>> BathroomScoringFunction::score
     total_score += scores["shadow_constraints"];
     total_score += scores["hidden_sink"];
     total_score += scores["not_enough_space"];
-    total_score += scores["corner_accessibility"];
-    total_score += scores["shower_space"];
-    
-    // Calculate average free space
-    double avg_sink_space = sink_count > 0 ? sink_space / sink_count : 0.0;
+    if (shower_count > 0) {
+        total_score += scores["shower_space"];
+    }
+
     double avg_toilet_space = toilet_count > 0 ? toilet_space / toilet_count : 0.0;
-    
-    double sink_space_score = avg_sink_space > 0 ? std::min(10.0, avg_sink_space / 600.0) : 0.0;
-    double toilet_space_score = avg_toilet_space > 0 ? std::min(10.0, avg_toilet_space / 600.0) : 0.0;
-    
-    scores["toilet_free_space"] = toilet_count > 0 ? toilet_space_score : 0.0;
-    
+    scores["toilet_free_space"] = avg_toilet_space > 0 ? std::min(10.0, avg_toilet_space / 600.0) : 0.0;
     if (toilet_count > 0) {
         total_score += scores["toilet_free_space"];
         total_score += scores["toilet_to_door"];
     }
-    
-    // Check opposite walls distance
-    auto [has_sufficient_distance, violations] = check_opposite_walls_distance(
-        placed_objects, room_size, 60
-    );
-    scores["opposite_walls_distance"] = has_sufficient_distance ? 10.0 : 0.0;
+
+    scores["opposite_walls_distance"] = check_opposite_walls_distance(placed_objects, 60) ? 10.0 : 0.0;
     total_score += scores["opposite_walls_distance"];
-    
+
     // Critical constraints check
-    if (scores["no_overlap"] == 0.0 ||
+    if (no_overlap_score == 0.0 ||
         scores["wall_corner_constraints"] == 0.0 ||
         scores["opposite_walls_distance"] < 5.0 ||
-        scores["corner_accessibility"] == 0.0 ||
         scores["shower_space"] == 0.0) {
         total_score = 0.0;
     } else {
-        // Normalize score
         total_score = (total_score / static_cast<double>(scores.size())) * 10.0;
     }
-    
+
     // Additional penalties
-    if (scores["door_sink_toilet"] == 0.0 || 
-        scores["sink_opposite_door"] == 0.0 || 
+    if (scores["door_sink_toilet"] == 0.0 ||
+        scores["sink_opposite_door"] == 0.0 ||
         scores["toilet_to_door"] < 0.0) {
         total_score = std::max(total_score - 10.0, 0.0);
     }
-    
-    // Reject layouts with score < 4
+
     if (total_score < 4.0) {
         total_score = 0.0;
     }
-    
+
+    // Enclosed spaces and corner accessibility are reported, not scored
+    auto [has_enclosed, corners_accessible] = space_accessibility(placed_objects, windows_doors, room_size);
+    scores["enclosed_spaces"] = has_enclosed ? 0.0 : 10.0;
+    scores["corner_accessibility"] = corners_accessible ? 10.0 : 0.0;
+
     return std::make_tuple(total_score, scores);
 }
 
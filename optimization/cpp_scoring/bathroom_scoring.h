@@ -109,66 +109,49 @@ public:
     );
     
 private:
-    // Helper functions
-    std::vector<std::tuple<double, double>> get_corners(double x, double y, double width, double depth) const;
-    double min_corner_distance(const std::vector<std::tuple<double, double>>& corners1,
-                               const std::vector<std::tuple<double, double>>& corners2) const;
-    
+    // Helper functions, each following the Python function of the same name
+    // (utils/helpers.py, algorithms/available_space.py) including its quirks
     bool check_overlap(const Rectangle& rect1, const Rectangle& rect2) const;
+    bool check_overlap(const Rectangle& rect1, double height1, const Rectangle& rect2, double height2) const;
     bool check_overlap(const std::vector<Rectangle>& rects, const Rectangle& rect) const;
     
-    double calculate_overlap_area(const std::vector<Rectangle>& rects, const Rectangle& rect) const;
     double calculate_overlap_area(const Rectangle& rect1, const Rectangle& rect2) const;
+    double calculate_overlap_area(const std::vector<Rectangle>& rects, const Rectangle& rect) const;
     
-    bool is_corner_placement(double x, double y, double room_width, double room_depth,
-                            double obj_width, double obj_depth) const;
+    double min_corner_distance(const PlacedObject& obj1, const PlacedObject& obj2) const;
+    
+    bool is_corner_placement_sink(double x, double y, double room_width, double room_depth,
+                                  double obj_width, double obj_depth) const;
     
     std::string get_opposite_wall(const std::string& wall) const;
     
-    Rectangle calculate_behind_door_space(double door_x, double door_y, double door_width,
-                                         double door_depth, const std::string& door_wall,
-                                         const std::string& hinge, double room_width,
-                                         double room_depth) const;
+    bool calculate_behind_door_space(double door_x, double door_y, double door_width,
+                                     double door_depth, const std::string& door_wall,
+                                     const std::string& hinge, double room_width,
+                                     double room_depth, Rectangle& space) const;
     
-    Rectangle calculate_before_door_space(double door_x, double door_y, double door_width,
-                                         double door_depth, const std::string& door_wall,
-                                         const std::string& hinge, double room_width,
-                                         double room_depth) const;
+    bool calculate_before_door_space(double door_x, double door_y, double door_width,
+                                     double door_depth, const std::string& door_wall,
+                                     double room_width, double room_depth, Rectangle& space) const;
     
     double calculate_space_before_object(const PlacedObject& obj,
-                                        const std::vector<PlacedObject>& placed_objects,
-                                        const RoomSize& room_size) const;
+                                         const std::vector<PlacedObject>& placed_objects,
+                                         const RoomSize& room_size) const;
     
     double check_euclidean_distance(const Rectangle& rect1, const Rectangle& rect2) const;
     
     bool windows_doors_overlap(const std::vector<WindowDoor>& windows_doors,
-                              double x, double y, double z, double width, double depth,
-                              double height, double room_width, double room_depth,
-                              const std::tuple<double, double, double, double>& shadow,
-                              const std::string& name) const;
+                               const PlacedObject& obj, const RoomSize& room_size) const;
     
     bool has_free_side(const Rectangle& shower_rect,
-                      const std::vector<Rectangle>& objects_rect) const;
-    
-    AvailableSpace identify_available_space(const std::vector<PlacedObject>& placed_objects,
-                                           const RoomSize& room_size,
-                                           int grid_size,
-                                           const std::vector<WindowDoor>& windows_doors) const;
+                       const std::vector<Rectangle>& objects_rect) const;
     
-    bool check_enclosed_spaces(const std::vector<Rectangle>& spaces,
-                              double room_width, double room_depth,
-                              int min_distance,
-                              const std::tuple<std::string, double, double, double>& door_position) const;
+    bool check_opposite_walls_distance(const std::vector<PlacedObject>& placed_objects,
+                                       double min_distance) const;
     
-    std::tuple<bool, std::map<std::string, std::map<std::string, bool>>> check_corner_accessibility(
-        const std::vector<PlacedObject>& placed_objects,
-        double room_width, double room_depth,
-        int min_path_width) const;
-    
-    std::tuple<bool, std::vector<std::string>> check_opposite_walls_distance(
-        const std::vector<PlacedObject>& placed_objects,
-        const RoomSize& room_size,
-        int min_distance) const;
+    std::tuple<bool, bool> space_accessibility(const std::vector<PlacedObject>& placed_objects,
+                                               const std::vector<WindowDoor>& windows_doors,
+                                               const RoomSize& room_size) const;
 };
 
 } // namespace bathroom_scoring
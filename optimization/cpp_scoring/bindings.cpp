@@ -1,6 +1,9 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <pybind11/operators.h>
+#include <pybind11/numpy.h>
+#include <cstdint>
+#include <stdexcept>
 #include "bathroom_scoring.h"
 
 namespace py = pybind11;
@@ -131,7 +134,7 @@ PYBIND11_MODULE(cpp_bathroom_scoring, m) {
                     - shower_space: Shower has at least one free side
                     - toilet_free_space: Free space in front of toilet
                     - opposite_walls_distance: Minimum distance between opposite walls
-                    - corner_accessibility: All corners accessible or occupied
+                    - corner_accessibility: All corners accessible or occupied (reported, not added to the total)
                     - no_overlap: No overlaps between objects or with windows/doors
                 
                 Example:
@@ -163,6 +166,89 @@ PYBIND11_MODULE(cpp_bathroom_scoring, m) {
                     >>> score, breakdown = scorer.score([sink, toilet], [door], room)
                     >>> print(f"Total score: {score}")
                     >>> print(f"Breakdown: {breakdown}")
+             )pbdoc")
+        .def("score_batch", [](BathroomScoringFunction& self,
+                               py::array_t<double, py::array::c_style | py::array::forcecast> objects,
+                               const std::vector<std::string>& names,
+                               const std::vector<std::string>& walls,
+                               py::array_t<std::int64_t, py::array::c_style | py::array::forcecast> offsets,
+                               const std::vector<WindowDoor>& windows_doors,
+                               const RoomSize& room_size,
+                               const std::vector<std::string>& requested_objects) {
+            if (objects.ndim() != 2 || objects.shape(1) != 11) {
+                throw std::invalid_argument("objects must have shape (n, 11)");
+            }
+            if (offsets.ndim() != 1 || offsets.shape(0) < 1) {
+                throw std::invalid_argument("offsets must be a non-empty 1-D array");
+            }
+            const auto num_objects = static_cast<std::size_t>(objects.shape(0));
+            if (names.size() != num_objects || walls.size() != num_objects) {
+                throw std::invalid_argument("names and walls must have one entry per object row");
+            }
+            auto rows = objects.unchecked<2>();
+            auto bounds = offsets.unchecked<1>();
+            const auto num_layouts = static_cast<std::size_t>(offsets.shape(0) - 1);
+            for (std::size_t b = 0; b < num_layouts; ++b) {
+                if (bounds(b) < 0 || bounds(b) > bounds(b + 1) ||
+                    static_cast<std::size_t>(bounds(b + 1)) > num_objects) {
+                    throw std::invalid_argument("offsets must be increasing and within the object rows");
+                }
+            }
+
+            std::vector<std::tuple<double, std::map<std::string, double>>> results;
+            results.reserve(num_layouts);
+            {
+                // Scoring only touches C++ data, other Python threads may run meanwhile
+                py::gil_scoped_release release;
+                std::vector<PlacedObject> placed_objects;
+                for (std::size_t b = 0; b < num_layouts; ++b) {
+                    placed_objects.clear();
+                    for (auto i = bounds(b); i < bounds(b + 1); ++i) {
+                        PlacedObject obj;
+                        obj.x = rows(i, 0);
+                        obj.y = rows(i, 1);
+                        obj.width = rows(i, 2);
+                        obj.depth = rows(i, 3);
+                        obj.height = rows(i, 4);
+                        obj.shadow = std::make_tuple(rows(i, 5), rows(i, 6), rows(i, 7), rows(i, 8));
+                        obj.must_be_corner = rows(i, 9) != 0.0;
+                        obj.must_be_against_wall = rows(i, 10) != 0.0;
+                        obj.name = names[i];
+                        obj.wall = walls[i];
+                        placed_objects.push_back(std::move(obj));
+                    }
+                    results.push_back(self.score(placed_objects, windows_doors, room_size, requested_objects));
+                }
+            }
+            return results;
+        },
+             py::arg("objects"),
+             py::arg("names"),
+             py::arg("walls"),
+             py::arg("offsets"),
+             py::arg("windows_doors"),
+             py::arg("room_size"),
+             py::arg("requested_objects") = std::vector<std::string>(),
+             R"pbdoc(
+                Score many layouts of the same room in one call.
+                
+                The placed objects of all layouts are passed as one packed array
+                instead of lists of PlacedObject, layout b owns the rows
+                offsets[b]:offsets[b + 1].
+                
+                Args:
+                    objects (numpy.ndarray): float array of shape (n, 11) with the columns
+                        x, y, width, depth, height, shadow top, shadow left, shadow right,
+                        shadow bottom, must_be_corner, must_be_against_wall
+                    names (list[str]): Object name of every row
+                    walls (list[str]): Wall placement of every row
+                    offsets (numpy.ndarray): int64 array of length num_layouts + 1
+                    windows_doors (list[WindowDoor]): Windows and doors shared by all layouts
+                    room_size (RoomSize): Room dimensions
+                    requested_objects (list[str], optional): Requested object names
+                
+                Returns:
+                    list[tuple]: (total_score, score_breakdown) for every layout
              )pbdoc");
 
     // Helper function to create PlacedObject from dict
@@ -7,16 +7,34 @@ to be used as a drop-in replacement for the Python version.
 
 import sys
 import os
+import threading
+
+import numpy as np
 
 # Add the parent directory to the path to import the C++ module
 sys.path.insert(0, os.path.dirname(__file__))
 
 try:
-    import cpp_bathroom_scoring as cpp_scoring
+    # Reuse the extension the package already imported; loading it a second time
+    # as a top-level module fails in pybind11 ("type is already registered")
+    from . import cpp_bathroom_scoring as cpp_scoring
     CPP_AVAILABLE = True
 except ImportError:
-    CPP_AVAILABLE = False
-    print("Warning: C++ scoring module not available. Using Python fallback.")
+    try:
+        # Run as a script from this directory
+        import cpp_bathroom_scoring as cpp_scoring
+        CPP_AVAILABLE = True
+    except ImportError:
+        CPP_AVAILABLE = False
+        print("Warning: C++ scoring module not available. Using Python fallback.")
+
+# Columns of the packed object array passed to score_batch
+OBJECT_COLUMNS = ("x", "y", "width", "depth", "height",
+                  "shadow_top", "shadow_left", "shadow_right", "shadow_bottom",
+                  "must_be_corner", "must_be_against_wall")
+
+_shared_scorer = None
+_shared_scorer_lock = threading.Lock()
 
 
 class CppBathroomScoringWrapper:
@@ -149,15 +167,94 @@ class CppBathroomScoringWrapper:
             float(room_size[2])
         )
         
-        # Score using C++
-        self.total_score, self.score_breakdown = self.cpp_scorer.score(
+        # Score using C++ (the wrapper is shared by the process, so results are not stored on it)
+        return self.cpp_scorer.score(
             placed_objects_cpp,
             windows_doors_cpp,
             room_cpp,
             requested_objects
         )
+
+    def pack_objects(self, layouts):
+        """
+        Pack the placed objects of several layouts into flat arrays.
         
-        return self.total_score, self.score_breakdown
+        Args:
+            layouts: List of Layout objects
+        
+        Returns:
+            tuple: (objects, names, walls, offsets) where objects is a float array
+                   with one OBJECT_COLUMNS row per placed object and layout b owns
+                   the rows offsets[b]:offsets[b + 1]
+        """
+        rows = []
+        names = []
+        walls = []
+        offsets = [0]
+        for layout in layouts:
+            bathroom = layout.bathroom
+            if hasattr(bathroom, "get_object_table"):
+                # Geometry columns come straight from the bathroom's cached table
+                table = bathroom.get_object_table()
+                block = np.zeros((len(table), len(OBJECT_COLUMNS)))
+                block[:, :9] = table.rows[:, table.GEOMETRY]
+                rows.extend(block)
+                for obj_entry in table.entries:
+                    obj = obj_entry["object"]
+                    names.append(str(obj.name))
+                    walls.append(str(obj.wall))
+                offsets.append(len(rows))
+                continue
+            for obj_entry in bathroom.get_placed_objects() or []:
+                obj = obj_entry["object"]
+                shadow = getattr(obj, 'shadow', (0, 0, 0, 0))
+                if not (isinstance(shadow, (list, tuple)) and len(shadow) >= 4):
+                    shadow = (0, 0, 0, 0)
+                rows.append((obj.position[0], obj.position[1], obj.width, obj.depth, obj.height,
+                             shadow[0], shadow[1], shadow[2], shadow[3],
+                             bool(getattr(obj, 'must_be_corner', False)),
+                             bool(getattr(obj, 'must_be_against_wall', False))))
+                names.append(str(obj.name))
+                walls.append(str(obj.wall))
+            offsets.append(len(rows))
+        objects = np.array(rows, dtype=np.float64).reshape(len(rows), len(OBJECT_COLUMNS))
+        return objects, names, walls, np.array(offsets, dtype=np.int64)
+
+    def score_batch(self, layouts):
+        """
+        Score several layouts with one call into C++ per room.
+        
+        Layouts sharing the room, windows/doors and requested objects (e.g. all
+        children of one beam parent) are packed into arrays and scored together.
+        
+        Args:
+            layouts: List of Layout objects
+        
+        Returns:
+            list: (total_score, score_breakdown) tuple for every layout, in order
+        """
+        if not hasattr(self.cpp_scorer, "score_batch"):
+            # Module built before the bulk entry point existed
+            return [self.score(layout) for layout in layouts]
+
+        groups = {}
+        for index, layout in enumerate(layouts):
+            bathroom = layout.bathroom
+            requested_objects = tuple(getattr(layout, "requested_objects", []) or [])
+            key = (tuple(bathroom.get_size()), id(bathroom.windows_doors), requested_objects)
+            groups.setdefault(key, []).append(index)
+
+        results = [None] * len(layouts)
+        for (room_size, _, requested_objects), indices in groups.items():
+            windows_doors_py = getattr(layouts[indices[0]].bathroom, "windows_doors", []) or []
+            windows_doors_cpp = [self._convert_window_door(wd) for wd in windows_doors_py]
+            room_cpp = cpp_scoring.RoomSize(float(room_size[0]), float(room_size[1]), float(room_size[2]))
+            objects, names, walls, offsets = self.pack_objects([layouts[i] for i in indices])
+            scored = self.cpp_scorer.score_batch(objects, names, walls, offsets,
+                                                 windows_doors_cpp, room_cpp, list(requested_objects))
+            for index, result in zip(indices, scored):
+                results[index] = result
+        return results
     
     def evaluate(self, layout, requested_objects=None, windows_doors=None):
         """
@@ -173,12 +270,16 @@ class CppBathroomScoringWrapper:
         Returns:
             tuple: (total_score: float, score_breakdown: dict)
         """
-        return self.score(layout)
+        self.total_score, self.score_breakdown = self.score(layout)
+        return self.total_score, self.score_breakdown
 
 
 def get_cpp_scorer():
     """
-    Factory function to get a C++ scorer instance.
+    Get the C++ scorer instance shared by the whole process.
+    
+    The scorer is created on first use and reused afterwards, so callers
+    scoring many layouts do not construct a new one per layout.
     
     Returns:
         CppBathroomScoringWrapper: Wrapper instance
@@ -186,7 +287,12 @@ def get_cpp_scorer():
     Raises:
         ImportError: If C++ module is not available
     """
-    return CppBathroomScoringWrapper()
+    global _shared_scorer
+    if _shared_scorer is None:
+        with _shared_scorer_lock:
+            if _shared_scorer is None:
+                _shared_scorer = CppBathroomScoringWrapper()
+    return _shared_scorer
 
 
 def is_cpp_available():
@@ -3,6 +3,7 @@ import os
 import math
 import uuid
 import time
+import numpy as np
 
 # Add the project root to the path so we can import from other modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -12,9 +13,159 @@ from utils.timing_logger import TimingContext
 from utils.helpers import check_overlap, check_euclidean_distance, is_corner_placement_sink
 from utils.helpers import get_opposite_wall, windows_doors_overlap, calculate_space_before_object, check_opposite_walls_distance, calculate_behind_door_space, calculate_overlap_area, calculate_before_door_space, has_free_side
 from algorithms.available_space import identify_available_space
-from algorithms.available_space import check_enclosed_spaces, check_corner_accessibility
+from algorithms.available_space import check_enclosed_spaces, check_corner_accessibility, space_accessibility, OccupancyGrid
+from utils.geometry import RoomGeometry, PairwiseGeometry, front_rects, opposite_wall_groups
 from models.layout import Layout
 from typing import Tuple, List
+
+# Cell size of the occupancy mask of the enclosed-space and corner-accessibility terms
+SPACE_GRID_SIZE = 10
+# Version of the scoring rules, part of the layout cache keys: bump it when a
+# term changes so that layouts scored under the old rules are not served
+SCORING_VERSION = 3
+
+
+def _order_sensitive(name):
+    """Whether the terms of an object depend on the order, see BathroomScoringFunction.order_sensitive_placements."""
+    name = name.lower()
+    return name in ("sink", "double sink", "toilet", "toilet bidet", "shower") or "bathtub" in name
+
+
+class _ScoreState:
+    """
+    Running sums of the object loop of BathroomScoringFunction.score.
+
+    A state covers the first n placed objects of a layout; adding an object
+    returns a new state, so states can be cached on the placement chain and
+    shared by all layouts that extend it.
+    """
+    __slots__ = ("opposite_wall", "door_wall", "objects_rect", "rows", "wall_coverage", "corner_covered",
+                 "shower_count", "shower_rect", "bathtub_count", "bathtub_placement_score",
+                 "bathtub_size_score", "door_sink_score", "sink_score", "sink_symmetrial_door_score",
+                 "door_sink_distance_score", "toilet_to_door_score", "corner_toilet_score",
+                 "hidden_sink_score", "not_enough_space", "toilets", "toilet_fronts", "toilet_space", "shadow_score",
+                 "no_overlap_until", "spacing_penalty", "open_rows", "wall_groups", "opposite_walls")
+
+    def __init__(self, door_geometry=None):
+        # The door terms start from the last door; the loop may switch to another door later
+        door_geometry = door_geometry or {}
+        self.opposite_wall = door_geometry.get("opposite_wall", "")
+        self.door_wall = door_geometry.get("door_wall")
+        self.objects_rect = ()
+        self.rows = np.empty((0, 5))    # x, y, width, depth, height of each object
+        self.wall_coverage = {"top": 0, "bottom": 0, "left": 0, "right": 0}
+        self.corner_covered = False
+        self.shower_count = 0
+        self.shower_rect = None
+        self.bathtub_count = 0
+        self.bathtub_placement_score = 0
+        self.bathtub_size_score = 0
+        self.door_sink_score = 10
+        self.sink_score = 0
+        self.sink_symmetrial_door_score = 0
+        self.door_sink_distance_score = 0
+        self.toilet_to_door_score = 0
+        self.corner_toilet_score = 0
+        self.hidden_sink_score = 10
+        self.not_enough_space = 10
+        self.toilets = ()               # indexes of the toilets, in placement order
+        self.toilet_fronts = np.empty((0, 4))  # space in front of each toilet, see front_rects
+        self.toilet_space = np.empty(0)        # free area of that space, less the objects placed so far
+        self.shadow_score = 0
+        self.no_overlap_until = float("inf")  # first object whose no_overlap term is 0
+        self.spacing_penalty = 0
+        self.open_rows = np.ones(0, dtype=bool)         # whether the pair loop of each object is still running
+        self.wall_groups = np.zeros((0, 4), dtype=bool)  # opposite-walls groups of each object
+        self.opposite_walls = True
+
+    def copy(self):
+        state = _ScoreState.__new__(_ScoreState)
+        for slot in _ScoreState.__slots__:
+            setattr(state, slot, getattr(self, slot))
+        return state
+
+
+class _PairTerms:
+    """
+    Pair terms of new objects with the objects of a _ScoreState.
+
+    Every new object is taken on its own as the next object placed after the
+    state's objects. The terms of all of them (overlap, spacing and
+    opposite-walls terms, and the free space in front of toilets) are read
+    from one PairwiseGeometry of the state's objects against the new ones,
+    computed when the first of them is folded in. score_batch() shares an
+    instance among the children of one beam parent.
+    """
+    __slots__ = ("objects", "room_width", "room_depth", "pairs", "index", "terms")
+
+    def __init__(self, objects, room_width, room_depth, pairs=True):
+        self.objects = objects
+        self.room_width = room_width
+        self.room_depth = room_depth
+        self.pairs = pairs
+        self.index = {id(obj): k for k, obj in enumerate(objects)}
+        self.terms = None
+
+    def get(self, state, obj):
+        """Terms of `obj` placed after the objects of `state`, or None if it is not one of the new objects."""
+        k = self.index.get(id(obj))
+        if k is None:
+            return None
+        if self.terms is None:
+            self.terms = self._compute(state)
+        return self.terms[k]
+
+    def _compute(self, state):
+        objects = self.objects
+        count = len(state.rows)
+        rows = np.array([(obj.position[0], obj.position[1], obj.width, obj.depth, obj.height) for obj in objects],
+                        dtype=np.float64)
+        rects = rows[:, :4]
+        groups = np.array([opposite_wall_groups(obj) for obj in objects], dtype=bool)
+        spacing = np.zeros(len(objects), dtype=int)
+        first_overlap = np.full(len(objects), -1)
+        open_rows = np.broadcast_to(state.open_rows, (len(objects), count))
+        opposite_walls = np.full(len(objects), state.opposite_walls)
+        if self.pairs and count:
+            # Axis 0 is the state's object k, axis 1 the new object
+            geometry = PairwiseGeometry(state.rows[:, :4], rects, state.rows[:, 4], rows[:, 4])
+            # The pair loop of object k stops at its first overlap
+            still_open = state.open_rows[:, None]
+            min_dist = geometry.min_corner_distance
+            spacing = 5 * np.count_nonzero((10 < min_dist) & (min_dist < 30) & still_open, axis=0)
+            overlap = geometry.overlap & still_open
+            first_overlap = np.where(overlap.any(axis=0), overlap.argmax(axis=0), -1)
+            open_rows = (still_open & ~overlap).T
+            # 12. Objects on opposite walls, same rules as check_opposite_walls_distance
+            if state.opposite_walls:
+                on_left, on_right, on_top, on_bottom = state.wall_groups.T[:, :, None]
+                new_left, new_right, new_top, new_bottom = groups.T
+                close = ((on_left & new_right & (geometry.gap_right < 60)) |
+                         (on_right & new_left & (geometry.gap_left < 60)) |
+                         (on_top & new_bottom & (geometry.gap_below < 60)) |
+                         (on_bottom & new_top & (geometry.gap_above < 60)))
+                opposite_walls = ~close.any(axis=0)
+
+        # 11. Free space in front of toilets, the new object takes its area from the toilets placed so far
+        toilet_space = np.broadcast_to(state.toilet_space, (len(objects), len(state.toilet_space)))
+        if len(state.toilet_space):
+            toilet_space = (state.toilet_space[:, None] - PairwiseGeometry(state.toilet_fronts, rects).overlap_area).T
+        new_toilets = [None] * len(objects)
+        toilets = [k for k, obj in enumerate(objects) if obj.name.lower() in ["toilet", "toilet bidet"]]
+        if toilets:
+            fronts, space = front_rects(rects[toilets], self.room_width, self.room_depth)
+            if count:
+                before = PairwiseGeometry(fronts, state.rows[:, :4]).overlap_area
+                # Subtract in placement order, as calculate_space_before_object does
+                for j in range(count):
+                    space = space - before[:, j]
+            space = space - PairwiseGeometry(fronts[:, None], rects[toilets, None]).overlap_area[:, 0, 0]
+            for k, toilet in enumerate(toilets):
+                new_toilets[toilet] = (fronts[k], space[k])
+        return list(zip(rows, groups, spacing.tolist(), first_overlap.tolist(), open_rows,
+                        opposite_walls.tolist(), toilet_space, new_toilets))
+
+
 class BaseScoringFunction:
     """Base class for room layout scoring functions."""
     
@@ -198,290 +349,358 @@ class BathroomScoringFunction(BaseScoringFunction):
 
         return placed_objects, windows_doors, room_size, requested_objects
 
-    def _get_corners(self, x, y, width, depth):
-        """Get the four corners of a rectangular object."""
-        return [
-            (x, y),                   # top-left
-            (x, y + width),           # top-right
-            (x + depth, y),           # bottom-left
-            (x + depth, y + width)    # bottom-right
-        ]
-
-    def _min_corner_distance(self, corners1, corners2):
-        """Calculate minimum distance between corners of two objects."""
-        return min(
-            math.sqrt((c1[0] - c2[0])**2 + (c1[1] - c2[1])**2)
-            for c1 in corners1 for c2 in corners2
-        )
-    
-    def score(self, layout):
+    @staticmethod
+    def order_sensitive_placements(placements):
+        """
+        The placements, in placement order, whose terms depend on the objects placed before them.
+
+        Sinks and bathtubs switch the door the sink and toilet terms start from,
+        and the last toilet, bathtub and shower decide their terms (see
+        _add_object). The terms of other objects are sums over all objects, so
+        layouts with the same placements score alike if these come in the same order.
+
+        Args:
+            placements: Placement descriptions in placement order, see utils.layout_hash.full_placement
+        """
+        return tuple(placement for placement in placements if _order_sensitive(placement[1]))
+
+    @staticmethod
+    def _room_geometry(layout, windows_doors, room_width, room_depth):
+        """Door/window geometry of the layout's room, shared by all layouts of a request."""
+        bathroom = layout.bathroom
+        if hasattr(bathroom, "get_room_geometry"):
+            room_geometry = bathroom.get_room_geometry()
+            if room_geometry.matches(room_width, room_depth, windows_doors):
+                return room_geometry
+        return RoomGeometry(room_width, room_depth, windows_doors)
+
+    def score(self, layout, precomputed=None, pair_terms=None, total_only=False):
         """Score a bathroom layout based on various criteria.
+
+        The per-object terms are running sums over the placed objects (see
+        _ScoreState). For a Bathroom they are cached on its placement chain, so
+        scoring a layout that adds one object to an already scored parent only
+        folds in the new object and its pairs with the parent's objects.
         
         Args:
             layout: Layout object or list of positions
-            windows_doors: List of windows and doors
-            requested_objects: List of specifically requested objects
+            precomputed: Pairwise object terms computed by score_batch()
+            pair_terms: _PairTerms shared by score_batch() with the siblings of the layout
+            total_only: Only compute the total; the critical constraints are checked
+                        first and a layout failing one is not scored any further
             
         Returns:
             float: Total score
-            dict: Breakdown of scores by category
+            dict: Breakdown of scores by category, None with total_only
         """
         placed_objects, windows_doors, (room_width, room_depth, room_height), requested_objects = (
             self._extract_layout_data(layout)
         )
-        total_score = 0
-        scores = {}
-        
+        room_geometry = self._room_geometry(layout, windows_doors, room_width, room_depth)
+        state = self._object_state(layout, placed_objects, windows_doors, room_geometry, precomputed is None, pair_terms)
+        shower_free = None
+        if total_only and placed_objects:
+            # Critical constraints zero the score, whatever the other terms are
+            if precomputed is not None:
+                no_overlap, opposite_walls = precomputed["no_overlap"] != 0, precomputed["opposite_walls"]
+            else:
+                no_overlap, opposite_walls = state.no_overlap_until >= len(placed_objects), state.opposite_walls
+            if not no_overlap or not opposite_walls:
+                return 0, None
+            if state.shower_count > 0:
+                shower_free = has_free_side(state.shower_rect, list(state.objects_rect))
+                if not shower_free:
+                    return 0, None
+        # The space terms only go into the breakdown
+        space_terms = None if total_only else self._space_terms(layout, placed_objects, room_geometry,
+                                                                room_width, room_depth)
+        total_score, scores = self._finish_score(state, placed_objects, (room_width, room_depth, room_height),
+                                                 requested_objects, precomputed, space_terms=space_terms,
+                                                 shower_free=shower_free)
+        return (total_score, None) if total_only else (total_score, scores)
 
-        # Initialize all scoring variables at once
-        wall_corner_score = 10  # Start with max score, reduce if constraints violated
-        wall_coverage = {"top": 0, "bottom": 0, "left": 0, "right": 0}
-        corner_coverage_score = 0
-        corners = ["top-left", "top-right", "bottom-left", "bottom-right"]
-        corner_objects = {corner: [] for corner in corners}
-        door_sink_score = 10
-        sink_score = 0
-        sink_symmetrial_door_score = 0
-        door_sink_distance_score = 0
-        toilet_to_door_score = 0
-        corner_toilet_score = 0
-        sink_space = 0
-        toilet_space = 0
-        sink_count = 0
-        toilet_count = 0
-        requested_score = 0
-        shower_count = 0
-        objects_rect = []
-        shadow_score = 0
-        bathtub_placement_score = 0
-        bathtub_size_score = 0
-        hidden_sink_score = 10
-        not_enough_space = 10
-        no_overlap_score = 10
-        opposite_wall = ""
-        behind_door_space = []
-        before_door_space = []
-        bathtub_count = 0
-        spacing_score = len(placed_objects) * 10
-        # # check space
+    @staticmethod
+    def _space_terms(layout, placed_objects, room_geometry, room_width, room_depth):
+        """(has_enclosed, corners_valid) of a layout, see space_accessibility for the rule.
 
+        The occupancy mask is taken from the bathroom's placement chain, where a
+        child layout derives it from its parent by painting only the new object.
+        """
+        bathroom = layout.bathroom
+        if hasattr(bathroom, "get_occupancy"):
+            occupancy = bathroom.get_occupancy(SPACE_GRID_SIZE)
+        else:
+            occupancy = OccupancyGrid.from_objects(placed_objects, (room_width, room_depth), SPACE_GRID_SIZE)
+        doors = [(door["wall"], door["x"], door["y"], door["width"]) for door in room_geometry.doors()]
+        return space_accessibility(occupancy.objects, SPACE_GRID_SIZE, doors)
 
-        # 0. check enclosed spaces
-        available_space = identify_available_space(placed_objects, (room_width, room_depth), grid_size=1, windows_doors=windows_doors)
-        available_space_without_shadow = available_space['without_shadow']
-        # if check_enclosed_spaces(available_space_without_shadow, room_width, room_depth, min_distance=60, door_position=()):
-        #     scores["enclosed_spaces"] = 0
-        # else:
-        #     scores["enclosed_spaces"] = 10
-        
-        # # 0b. Check corner accessibility (all corners must be occupied or accessible via 60cm pathway)
-        # corners_valid, corner_status = check_corner_accessibility(placed_objects, room_width, room_depth, min_path_width=60)
-        # if corners_valid:
-        #     scores["corner_accessibility"] = 10
-        # else:
-        #     scores["corner_accessibility"] = 0
-            # Penalty for inaccessible corners
-            # invalid_corners = [name for name, status in corner_status.items() if not status['valid']]
-            # print(f"Invalid corners: {invalid_corners}")  # Debug info
-       
-        # 5. Door Position Constraints
-
-        if windows_doors:
-            for door_window in windows_doors:
-                if door_window.name.startswith("door"):
-                    door_width = door_window.width
-                    door_height = door_window.height
-                    door_x = door_window.position[0]
-                    door_y = door_window.position[1]
-                    door_depth = door_window.depth
-                    door_wall = door_window.wall
-                    # if check_enclosed_spaces(available_space_without_shadow, room_width, room_depth, min_distance=60, door_position=(door_wall, door_x, door_y, door_width)):
-                    #     scores["enclosed_spaces"] = 0
-                    # else:
-                    #     scores["enclosed_spaces"] = 10
-                    hinge = door_window.hinge
-                    
-                    opposite_wall = get_opposite_wall(door_wall)
-                    behind_door_space.append(calculate_behind_door_space(door_x, door_y, door_width, door_depth, door_wall,hinge,room_width, room_depth))
-                    before_door_space.append(calculate_before_door_space(door_x, door_y, door_width, door_depth, door_wall,hinge,room_width, room_depth))
-        # Process all objects in a single loop to collect data for multiple metrics
-        for i,obj in enumerate(placed_objects):
-            obj = obj["object"]
-            x = obj.position[0]
-            y = obj.position[1]
-            width = obj.width
-            depth = obj.depth
-            height = obj.height
-            shadow = obj.shadow
-            name = obj.name
-            wall = obj.wall
-            objects_rect.append((x, y, width, depth))
-            if name.lower() == "shower":
-                shower_count += 1
-                shower_rect = (x, y, width, depth)
+    def _object_state(self, layout, placed_objects, windows_doors, room_geometry, object_terms=True, pair_terms=None):
+        """Fold the placed objects into a _ScoreState, reusing the states cached on the placement chain.
+
+        `pair_terms` may hold the terms of the last placed object, see _PairTerms.
+        """
+        bathroom = layout.bathroom
+        last = len(placed_objects) - 1
+
+        def start():
+            return _ScoreState(room_geometry.door_geometry())
+
+        def add(state, placed, index):
+            return self._add_object(state, placed, index, bathroom, windows_doors, room_geometry, object_terms,
+                                    pair_terms if index == last else None)
+
+        if object_terms and hasattr(bathroom, "get_scoring_state"):
+            key = (type(self).__qualname__, room_geometry.fingerprint())
+            return bathroom.get_scoring_state(key, start, add)
+        state = start()
+        for index in range(len(placed_objects)):
+            state = add(state, placed_objects, index)
+        return state
+
+    def _add_object(self, state, placed_objects, i, bathroom, windows_doors, room_geometry, object_terms=True,
+                    pair_terms=None):
+        """
+        Return the state with the terms of placed_objects[i] added.
+
+        Runs the body of the object loop of the scoring function for object i.
+        With object_terms, the window/door overlap, shadow, overlap/spacing and
+        opposite-walls terms of the object are added too; the pair terms of an
+        object with an earlier object are the ones the earlier object's pair
+        loop would have found. The free space before toilets is kept up to date
+        with every object and summed in _finish_score. The geometric terms come
+        from `pair_terms` when it holds the object, else from a _PairTerms of
+        the object alone.
+        """
+        room_width, room_depth = room_geometry.room_width, room_geometry.room_depth
+        obj = placed_objects[i]["object"]
+        terms = pair_terms.get(state, obj) if pair_terms is not None else None
+        if terms is None:
+            terms = _PairTerms([obj], room_width, room_depth, object_terms).get(state, obj)
+        state = state.copy()
+        door_geometry = room_geometry.door_geometry()
+        behind_door_space = door_geometry["behind_door_space"]
+        before_door_space = door_geometry["before_door_space"]
+
+        x = obj.position[0]
+        y = obj.position[1]
+        width = obj.width
+        depth = obj.depth
+        height = obj.height
+        shadow = obj.shadow
+        name = obj.name
+        wall = obj.wall
+        state.objects_rect = state.objects_rect + ((x, y, width, depth),)
+        row, groups, spacing, first_overlap, open_rows, opposite_walls, toilet_space, new_toilet = terms
+        state.rows = np.concatenate((state.rows, [row]))
+        state.toilet_space = toilet_space
+        if new_toilet is not None:
+            state.toilet_fronts = np.concatenate((state.toilet_fronts, [new_toilet[0]]))
+            state.toilet_space = np.append(toilet_space, new_toilet[1])
+        if name.lower() == "shower":
+            state.shower_count += 1
+            state.shower_rect = (x, y, width, depth)
+        if name.lower() == "bathtub":
+            state.bathtub_count += 1
+        # 3. Wall Coverage
+        wall_coverage = state.wall_coverage = dict(state.wall_coverage)
+        if wall == "top-left":
+            wall_coverage["top"] += width
+            wall_coverage["left"] += depth
+        elif wall == "top-right":
+            wall_coverage["top"] += width
+            wall_coverage["right"] += depth
+        elif wall == "bottom-left":
+            wall_coverage["bottom"] += width
+            wall_coverage["left"] += depth
+        elif wall == "bottom-right":
+            wall_coverage["bottom"] += width
+            wall_coverage["right"] += depth
+        else:
+            if wall in wall_coverage:
+                wall_coverage[wall] += width if wall in ["top", "bottom"] else depth
+        if object_terms and windows_doors and room_geometry.windows_doors_overlap(x, y, width, depth, height, shadow, name):
+            state.no_overlap_until = min(state.no_overlap_until, i)
+        # 4. Corner Coverage
+        if is_corner_placement_sink(x, y, room_width, room_depth, width, depth):
+            state.corner_covered = True
+        if check_overlap(before_door_space, (x, y, width, depth )):
+            overlap = calculate_overlap_area(before_door_space, (x, y, width, depth))
+            # if overlap > door_width*door_width-3600:
+            #     not_enough_space = -50
             if name.lower() == "bathtub":
-                bathtub_count += 1
-            # 3. Wall Coverage
-            if wall == "top-left":
-                wall_coverage["top"] += width
-                wall_coverage["left"] += depth
-            elif wall == "top-right":
-                wall_coverage["top"] += width
-                wall_coverage["right"] += depth
-            elif wall == "bottom-left":
-                wall_coverage["bottom"] += width
-                wall_coverage["left"] += depth
-            elif wall == "bottom-right":
-                wall_coverage["bottom"] += width
-                wall_coverage["right"] += depth
+                state.not_enough_space = 10
+
+        # Sink placement relative to door
+        if name.lower() in ["sink", "double sink"]:
+            if wall == state.opposite_wall:
+                state.sink_score += 10  # Reward sink opposite door
+                if windows_doors:
+                    for door in room_geometry.doors():
+                        door_width = door["width"]
+                        door_x = door["x"]
+                        door_y = door["y"]
+                        door_depth = door["depth"]
+                        door_wall = state.door_wall = door["wall"]
+                        state.opposite_wall = door["opposite_wall"]
+                        behind_door_space_single = door["behind_door_space"]
+                        # Check if sink is symmetrically placed relative to door
+                        if (door_wall == "top" or door_wall == "bottom"):
+                            if (door_y +door_width <= y+width and door_y >= y):
+                                state.sink_symmetrial_door_score += 10
+                        elif (door_wall == "left" or door_wall == "right"):
+                            if (door_x + door_depth <= x+depth and door_x >= x):
+                                state.sink_symmetrial_door_score += 10
+                        if check_overlap(behind_door_space_single, (x, y, width, depth)):
+                            if door_wall != wall:
+                                overlap = calculate_overlap_area(behind_door_space_single, (x, y, width, depth))
+                                if overlap:
+                                    state.hidden_sink_score = -20
+                            if door_wall == wall:
+                                state.hidden_sink_score -= 20
+                        elif door_wall != wall:
+                            state.door_sink_score += 5
+                            # Check distance from door to sink
+                            if check_euclidean_distance((door_x, door_y, door_width, door_depth),
+                                                        (x, y, width, depth)) < 200:
+                                state.door_sink_distance_score += 10
+
+        # Toilet placement relative to door
+        elif name.lower() in ["toilet", "toilet bidet"]:
+            door_wall = state.door_wall
+            if get_opposite_wall(door_wall) != wall:
+                state.door_sink_score += 5  # Reward toilet not opposite door
+            if wall in ["top-left", "top-right", "bottom-left", "bottom-right"]:
+                state.corner_toilet_score = 10
             else:
-                if wall in wall_coverage:
-                    wall_coverage[wall] += width if wall in ["top", "bottom"] else depth
-            if windows_doors and windows_doors_overlap(windows_doors, x, y, 0,width, depth, height, room_width, room_depth, shadow,name):
-                no_overlap_score = 0
-            # 4. Corner Coverage
-            for corner in corners:
-                if is_corner_placement_sink(x, y, room_width, room_depth, width, depth):
-                    corner_objects[corner].append(obj)
-            if check_overlap(before_door_space, (x, y, width, depth )):
-                
-                overlap = calculate_overlap_area(before_door_space, (x, y, width, depth))
-                # if overlap > door_width*door_width-3600:
-                #     not_enough_space = -50
-                if name.lower() == "bathtub":
-                    not_enough_space = 10
-
-            # Sink placement relative to door
-            if name.lower() in ["sink", "double sink"]:
-                    if wall == opposite_wall:
-                        sink_score += 10  # Reward sink opposite door
-                        if windows_doors:
-                            for door_window in windows_doors:
-                                if door_window.name.startswith("door"):
-                                    door_width = door_window.width
-                                    door_height = door_window.height
-                                    door_x = door_window.position[0]
-                                    door_y = door_window.position[1]
-                                    door_depth = door_window.depth
-                                    door_wall = door_window.wall
-                                    
-                                    hinge = door_window.hinge
-                                    
-                                    opposite_wall = get_opposite_wall(door_wall)
-                                    behind_door_space_single = calculate_behind_door_space(door_x, door_y, door_width, door_depth, door_wall,hinge,room_width, room_depth)
-                                    before_door_space_single = calculate_before_door_space(door_x, door_y, door_width, door_depth, door_wall,hinge,room_width, room_depth)
-                                    # Check if sink is symmetrically placed relative to door
-                                    if (door_wall == "top" or door_wall == "bottom"):
-                                        if (door_y +door_width <= y+width and door_y >= y):
-                                            sink_symmetrial_door_score += 10
-                                    elif (door_wall == "left" or door_wall == "right"):
-                                        if (door_x + door_depth <= x+depth and door_x >= x):
-                                            sink_symmetrial_door_score += 10
-                                    if check_overlap(behind_door_space_single, (x, y, width, depth)):
-                                        if door_wall != wall:
-                                            overlap = calculate_overlap_area(behind_door_space_single, (x, y, width, depth))
-                                            if overlap:
-                                                hidden_sink_score = -20
-                                        if door_wall == wall:
-                                            hidden_sink_score -= 20
-                                    elif door_wall != wall:
-                                        door_sink_score += 5
-                                        # Check distance from door to sink
-                                        if check_euclidean_distance((door_x, door_y, door_width, door_depth), 
-                                                                (x, y, width, depth)) < 200:
-                                            door_sink_distance_score += 10
-
-
-                # Toilet placement relative to door
-            elif name.lower() in ["toilet", "toilet bidet"]:
-                        if get_opposite_wall(door_wall) != wall:
-                            door_sink_score += 5  # Reward toilet not opposite door
-                            # Check if toilet is directly visible from door
-                        # if ((door_x <= x+depth and door_x + door_width >= x and 
-                        #              door_x - 40 <= x and door_x+door_width+40 >= x+depth) or 
-                        #             (door_y <= y+width and door_y + door_width >= y and 
-                        #              door_y - 40 <= y and door_y+door_width+40 >= y+width)):
-                        #             toilet_to_door_score = -10
-                        if wall in ["top-left", "top-right", "bottom-left", "bottom-right"]:
-                            corner_toilet_score = 10
-                        else:
-                            corner_toilet_score = 0
-                                
-                        # 11. Free space in front of key fixtures - toilet
-                        space = calculate_space_before_object(obj, placed_objects, (room_width, room_depth, room_height))
-                        toilet_space += space
-                        toilet_count += 1
-                
-                        if door_wall == wall:
-                            door_sink_score += 5  # Reward toilet on same wall as door (hidden)
-                        if check_overlap(before_door_space, (x, y, width, depth)):
-                            toilet_to_door_score += -10
-                        if check_overlap(behind_door_space, (x, y, width, depth)):
-                            overlap = calculate_overlap_area(behind_door_space, (x, y, width, depth))
-                            if overlap == width*depth:
-                                toilet_to_door_score += 20
-                                if door_wall == wall:
-                                    toilet_to_door_score += 20
-                            elif door_wall == wall:
-                                toilet_to_door_score += 10
+                state.corner_toilet_score = 0
 
-            
-            scores["no_overlap"] = no_overlap_score
-            total_score += scores["no_overlap"]         
+            # 11. Free space in front of key fixtures - toilet (summed in _finish_score)
+            state.toilets = state.toilets + (i,)
 
-                
+            if door_wall == wall:
+                state.door_sink_score += 5  # Reward toilet on same wall as door (hidden)
+            if check_overlap(before_door_space, (x, y, width, depth)):
+                state.toilet_to_door_score += -10
+            if check_overlap(behind_door_space, (x, y, width, depth)):
+                overlap = calculate_overlap_area(behind_door_space, (x, y, width, depth))
+                if overlap == width*depth:
+                    state.toilet_to_door_score += 20
+                    if door_wall == wall:
+                        state.toilet_to_door_score += 20
+                elif door_wall == wall:
+                    state.toilet_to_door_score += 10
 
-                
+        if object_terms:
             # 9. Shadow constraints (ensuring proper clearance around fixtures)
             shadow_top, shadow_left, shadow_right, shadow_bottom = shadow
             # Check if shadow is within room boundaries
             if (x - shadow_top >= 0 and y - shadow_left >= 0 and
                 x + depth + shadow_bottom <= room_width and y + width + shadow_right <= room_depth):
-                shadow_score += 1
-                
-            # 10. Bathtub placement (orientation and position)
-            if "bathtub" in name.lower():
-                # Get door wall
-                door_wall = layout.bathroom.get_door_walls()
-                door_opposite_wall = get_opposite_wall(door_wall[0])
-                # Check if bathtub is placed appropriately
-                if (door_opposite_wall in wall or wall in door_opposite_wall):
-                    # Prefer wider dimension along the wall
-                    if (width > depth and door_opposite_wall in ["top", "bottom"] )or (width < depth and door_opposite_wall in ["left", "right"]):
-                        bathtub_placement_score = 10
-                    else:
-                        bathtub_placement_score = 0
-                else:
-                    bathtub_placement_score = 10
-                if ((width >= 140) or (depth >= 140)):
-                    bathtub_size_score = 10
+                state.shadow_score += 1
+
+        # 10. Bathtub placement (orientation and position)
+        if "bathtub" in name.lower():
+            # Get door wall
+            door_wall = state.door_wall = bathroom.get_door_walls()
+            door_opposite_wall = get_opposite_wall(door_wall[0])
+            # Check if bathtub is placed appropriately
+            if (door_opposite_wall in wall or wall in door_opposite_wall):
+                # Prefer wider dimension along the wall
+                if (width > depth and door_opposite_wall in ["top", "bottom"] )or (width < depth and door_opposite_wall in ["left", "right"]):
+                    state.bathtub_placement_score = 10
                 else:
-                    bathtub_size_score = 0
-                    
-            # 11. Free space in front of key fixtures - sink
-            if name.lower() in ["sink", "double sink"]:
-                space = calculate_space_before_object(obj, placed_objects, (room_width, room_depth, room_height))
-                sink_space += space
-                sink_count += 1
-
-            corners1 = self._get_corners(x, y, width, depth)
-            # Check for overlaps with other objects
-            for j in range(i + 1, len(placed_objects)):
-                obj2 = placed_objects[j]['object']
-                x2 = obj2.position[0]
-                y2 = obj2.position[1]
-                width2 = obj2.width
-                depth2 = obj2.depth
-                height2 = obj2.height
-                corners2 = self._get_corners(x2, y2, width2, depth2)
-                # Calculate minimum corner-to-corner distance
-                min_dist = self._min_corner_distance(corners1, corners2)
-                if 10 < min_dist < 30:  # Too much free space
-                    spacing_score -= 5
-                if check_overlap((x, y, width, depth,height), (x2, y2, width2, depth2,height2)):
-                    no_overlap_score = 0
-                    break
+                    state.bathtub_placement_score = 0
+            else:
+                state.bathtub_placement_score = 10
+            if ((width >= 140) or (depth >= 140)):
+                state.bathtub_size_score = 10
+            else:
+                state.bathtub_size_score = 0
+
+        if object_terms:
+            state.spacing_penalty += spacing
+            if first_overlap >= 0:
+                # no_overlap drops to 0 from the iteration after the first object overlapping this one
+                state.no_overlap_until = min(state.no_overlap_until, first_overlap + 1)
+            state.open_rows = np.append(open_rows, True)
+            state.wall_groups = np.concatenate((state.wall_groups, [groups]))
+            state.opposite_walls = opposite_walls
+        return state
+
+    def score_bounds(self, layout, placements):
+        """score_bound() of several placements in the same layout, sharing their pair terms."""
+        room_width, room_depth = layout.bathroom.get_size()[:2]
+        pair_terms = _PairTerms([placement["object"] for placement in placements], room_width, room_depth)
+        return [self.score_bound(layout, placement, pair_terms) for placement in placements]
+
+    def score_bound(self, layout, placement, pair_terms=None):
+        """
+        Upper bound of the score of `layout` with `placement` added, without building that layout.
+
+        The parent's cached state is extended by the new object, which gives all
+        terms exactly except the free space before toilets and the free side of
+        the shower; those are assumed to be at their maximum.
+
+        Args:
+            layout: The parent Layout
+            placement: The {"object", "position"} entry that would be added
+            pair_terms: _PairTerms shared with other placements, see score_bounds()
+
+        Returns:
+            float: A value the score of the child layout cannot exceed
+        """
+        placed_objects, windows_doors, room_size, requested_objects = self._extract_layout_data(layout)
+        room_geometry = self._room_geometry(layout, windows_doors, room_size[0], room_size[1])
+        state = self._object_state(layout, placed_objects, windows_doors, room_geometry)
+        placed_objects = placed_objects + [placement]
+        state = self._add_object(state, placed_objects, len(placed_objects) - 1, layout.bathroom,
+                                 windows_doors, room_geometry, pair_terms=pair_terms)
+        return self._finish_score(state, placed_objects, room_size, requested_objects, optimistic=True)[0]
+
+    def _finish_score(self, state, placed_objects, room_size, requested_objects, precomputed=None, optimistic=False,
+                      space_terms=None, shower_free=None):
+        """Turn the folded object terms into the total score and its breakdown.
 
+        `space_terms` is the (has_enclosed, corners_valid) result of _space_terms,
+        added to the breakdown only, `shower_free` the has_free_side() result of
+        the shower if already known. With `optimistic`, the toilet free space and
+        shower space terms are not computed but set to their maximum, which gives
+        an upper bound of the score.
+        """
+        room_width, room_depth, room_height = room_size
+        total_score = 0
+        scores = {}
+        wall_corner_score = 10  # Start with max score, reduce if constraints violated
+        wall_coverage = state.wall_coverage
+        corner_coverage_score = 0
+        door_sink_score = state.door_sink_score
+        toilet_space = 0
+        toilet_count = len(state.toilets)
+        shower_count = state.shower_count
+        objects_rect = list(state.objects_rect)
+        spacing_score = len(placed_objects) * 10
+
+        if precomputed is not None and placed_objects:
+            # Overlap, spacing and shadow terms were evaluated for the whole batch
+            scores["no_overlap"] = precomputed["no_overlap"]
+            total_score += precomputed["no_overlap_total"]
+            spacing_score -= precomputed["spacing_penalty"]
+            shadow_score = precomputed["shadow"]
+        else:
+            shadow_score = state.shadow_score
+            if placed_objects:
+                # no_overlap was added once per object, with its value at that object
+                counted = min(state.no_overlap_until, len(placed_objects))
+                scores["no_overlap"] = 10 if counted == len(placed_objects) else 0
+                total_score += 10 * counted
+            spacing_score -= state.spacing_penalty
+
+        # 11. Free space in front of key fixtures - toilet
+        if optimistic:
+            toilet_space = float("inf") if state.toilets else 0
+        else:
+            for space in state.toilet_space.tolist():
+                toilet_space += space
 
         # 8. Requested objects (fulfilling user requirements)
 
@@ -498,9 +717,9 @@ class BathroomScoringFunction(BaseScoringFunction):
             if coverage_percent >= 70:  # Reward for good wall coverage
                 wall_coverage_score += 5
                 
-        # Reward for having objects in corners
-        for corner, objects in corner_objects.items():
-            if objects:
+        # Reward for having objects in corners (an object in a corner counts for all four)
+        if state.corner_covered:
+            for corner in ["top-left", "top-right", "bottom-left", "bottom-right"]:
                 corner_coverage_score += 2.5
                 
         
@@ -509,7 +728,9 @@ class BathroomScoringFunction(BaseScoringFunction):
         scores["shower_space"] = 10
         # check minimal space for shower
         if shower_count > 0:
-            has_enough_space_shower = has_free_side(shower_rect, objects_rect)
+            if shower_free is None:
+                shower_free = optimistic or has_free_side(state.shower_rect, objects_rect)
+            has_enough_space_shower = shower_free
             if has_enough_space_shower:
                 scores["shower_space"] = 10
             else:
@@ -520,13 +741,13 @@ class BathroomScoringFunction(BaseScoringFunction):
         #scores["wall_coverage"] = min(wall_coverage_score, 10)
         scores["corner_coverage"] = corner_coverage_score
         scores["door_sink_toilet"] = max(door_sink_score, 0)
-        scores["sink_opposite_door"] = max(sink_score, 0)
-        scores["sink_symmetrial_door"] = max(sink_symmetrial_door_score, 0)
-        scores["door_sink_distance"] = max(door_sink_distance_score, 0)
-        scores["toilet_to_door"] = toilet_to_door_score
-        scores["corner_toilet"] = corner_toilet_score
-        scores["hidden_sink"] = hidden_sink_score
-        scores["not_enough_space"] = not_enough_space
+        scores["sink_opposite_door"] = max(state.sink_score, 0)
+        scores["sink_symmetrial_door"] = max(state.sink_symmetrial_door_score, 0)
+        scores["door_sink_distance"] = max(state.door_sink_distance_score, 0)
+        scores["toilet_to_door"] = state.toilet_to_door_score
+        scores["corner_toilet"] = state.corner_toilet_score
+        scores["hidden_sink"] = state.hidden_sink_score
+        scores["not_enough_space"] = state.not_enough_space
 
         
         if placed_objects:
@@ -541,9 +762,9 @@ class BathroomScoringFunction(BaseScoringFunction):
 
         else:
             scores["requested_objects"] = 0
-        if bathtub_count > 0:
-            scores["bathtub_placement"] = max(bathtub_placement_score, 0)
-            scores["bathtub_size"] = bathtub_size_score
+        if state.bathtub_count > 0:
+            scores["bathtub_placement"] = max(state.bathtub_placement_score, 0)
+            scores["bathtub_size"] = state.bathtub_size_score
             total_score += scores["bathtub_placement"]
             total_score += scores["bathtub_size"]
         
@@ -561,19 +782,15 @@ class BathroomScoringFunction(BaseScoringFunction):
         total_score += scores["shadow_constraints"]
         total_score += scores["hidden_sink"]
         total_score += scores["not_enough_space"]
-        #total_score += scores["enclosed_spaces"]
-        #total_score += scores["corner_accessibility"]
         if shower_count > 0:
             total_score += scores["shower_space"]
         #else:
             #total_score += scores["shower_space"]
         
-        # Calculate average free space for sinks and toilets
-        avg_sink_space = sink_space / sink_count if sink_count > 0 else 0
+        # Calculate average free space for toilets
         avg_toilet_space = toilet_space / toilet_count if toilet_count > 0 else 0
         
         # Score based on average free space
-        sink_space_score = min(10, avg_sink_space / 600) if avg_sink_space > 0 else 0
         toilet_space_score = min(10, avg_toilet_space / 600) if avg_toilet_space > 0 else 0
         
         #scores["sink_free_space"] = sink_space_score
@@ -586,7 +803,12 @@ class BathroomScoringFunction(BaseScoringFunction):
                 total_score += scores["toilet_to_door"]
         
         # 12. Check minimum distance between objects on opposite walls
-        has_sufficient_distance, violations = check_opposite_walls_distance(placed_objects, (room_width, room_depth, room_height), min_distance=60)
+        if precomputed is not None:
+            has_sufficient_distance = precomputed["opposite_walls"]
+        elif placed_objects:
+            has_sufficient_distance = state.opposite_walls
+        else:
+            has_sufficient_distance = True
         
         if has_sufficient_distance:
             scores["opposite_walls_distance"] = 10
@@ -613,9 +835,146 @@ class BathroomScoringFunction(BaseScoringFunction):
         # According to project requirements, layouts with accessibility scores < 4 are rejected
         if total_score < 4:
             total_score = 0
-        self.total_score = total_score
-        self.score_breakdown = scores
-        return self.total_score, self.score_breakdown
+
+        # 0. Enclosed spaces and corner accessibility (all corners must be occupied or accessible via 60cm pathway),
+        # reported but not scored until their rule agrees with check_enclosed_spaces / check_corner_accessibility
+        if space_terms is not None:
+            has_enclosed, corners_valid = space_terms
+            scores["enclosed_spaces"] = 0 if has_enclosed else 10
+            scores["corner_accessibility"] = 10 if corners_valid else 0
+        # Not stored on the scorer, which is shared between threads
+        return total_score, scores
+
+    def score_batch(self, layouts, total_only=False):
+        """Score several layouts of the same room at once.
+
+        Meant for all candidates produced from one beam parent: the door geometry
+        is computed once per room, and the overlap, spacing, shadow-in-room and
+        opposite-walls terms are evaluated with array operations over the whole
+        batch. Layouts of a Bathroom are scored incrementally from the state
+        cached on their parent's placement chain instead, which is cheaper than
+        the array terms; siblings (layouts adding one object to the same
+        objects) get the pair terms of their new objects from one _PairTerms.
+        Every result is identical to calling score() on the layout.
+
+        Args:
+            layouts: List of Layout objects
+            total_only: Only compute the totals, see score()
+
+        Returns:
+            list: (total_score, score_breakdown) tuple for every layout, in order
+        """
+        results = [None] * len(layouts)
+        # Layouts can only share array terms with layouts of the same room and object count
+        groups = {}
+        # Layouts of a Bathroom share the pair terms of their last object with their siblings
+        siblings = {}
+        for index, layout in enumerate(layouts):
+            if hasattr(layout.bathroom, "get_scoring_state"):
+                placed_objects = layout.bathroom.get_placed_objects()
+                if placed_objects:
+                    key = (tuple(layout.bathroom.get_size()[:2]),
+                           tuple(id(entry["object"]) for entry in placed_objects[:-1]))
+                    siblings.setdefault(key, []).append((index, placed_objects[-1]["object"]))
+                else:
+                    results[index] = self.score(layout, total_only=total_only)
+                continue
+            placed_objects, windows_doors, room_size, _ = self._extract_layout_data(layout)
+            key = (tuple(room_size), id(layout.bathroom.windows_doors), len(placed_objects))
+            groups.setdefault(key, []).append((index, layout, placed_objects, windows_doors))
+
+        for ((room_width, room_depth), _), members in siblings.items():
+            pair_terms = _PairTerms([obj for _, obj in members], room_width, room_depth)
+            for index, _ in members:
+                results[index] = self.score(layouts[index], pair_terms=pair_terms, total_only=total_only)
+
+        for (room_size, _, _), members in groups.items():
+            windows_doors = members[0][3]
+            room_geometry = self._room_geometry(members[0][1], windows_doors, room_size[0], room_size[1])
+            tables = [getattr(member[1].bathroom, "get_object_table", None) for member in members]
+            tables = [table() for table in tables] if all(tables) else None
+            terms = self._batch_object_terms([member[2] for member in members], windows_doors, room_size,
+                                             room_geometry, tables)
+            for (index, layout, _, _), layout_terms in zip(members, terms):
+                results[index] = self.score(layout, precomputed=layout_terms, total_only=total_only)
+        return results
+
+    def _batch_object_terms(self, placed_batch, windows_doors, room_size, room_geometry=None, tables=None):
+        """Evaluate the object terms of score() for layouts with the same number of objects.
+
+        Reproduces the sequential loop exactly: the no_overlap score is added once per
+        object with the value it had at that point, and the pair loop of an object stops
+        at its first overlap, so later pairs of that object earn no spacing penalty.
+        When the PlacedObjectTable of every layout is given, the coordinates are
+        copied from it instead of being read object by object.
+        """
+        room_width, room_depth, room_height = room_size
+        num_objects = len(placed_batch[0])
+        if num_objects == 0:
+            return [{} for _ in placed_batch]
+        if room_geometry is None:
+            room_geometry = RoomGeometry(room_width, room_depth, windows_doors)
+
+        window_door_hits = {}
+        wall_groups = {}
+        coords = np.empty((len(placed_batch), num_objects, 9))
+        window_door_overlap = np.zeros((len(placed_batch), num_objects), dtype=bool)
+        walls = np.zeros((len(placed_batch), num_objects, 4), dtype=bool)
+        from_tables = tables is not None and all(len(table) == num_objects for table in tables)
+        for b, placed_objects in enumerate(placed_batch):
+            if from_tables:
+                coords[b] = tables[b].rows[:, tables[b].GEOMETRY]
+            for i, entry in enumerate(placed_objects):
+                obj = entry["object"]
+                x, y = obj.position[0], obj.position[1]
+                if not from_tables:
+                    coords[b, i, :5] = (x, y, obj.width, obj.depth, obj.height)
+                    coords[b, i, 5:] = obj.shadow
+                # The same parent objects appear in every layout of the batch
+                key = id(obj)
+                if key not in window_door_hits:
+                    window_door_hits[key] = bool(windows_doors) and bool(room_geometry.windows_doors_overlap(
+                        x, y, obj.width, obj.depth, obj.height, obj.shadow, obj.name))
+                    wall_groups[key] = opposite_wall_groups(obj)
+                window_door_overlap[b, i] = window_door_hits[key]
+                walls[b, i] = wall_groups[key]
+
+        x, y, width, depth, height = (coords[:, :, k] for k in range(5))
+        shadow_top, shadow_left, shadow_right, shadow_bottom = (coords[:, :, k] for k in range(5, 9))
+
+        # 9. Shadow constraints
+        shadow = ((x - shadow_top >= 0) & (y - shadow_left >= 0) &
+                  (x + depth + shadow_bottom <= room_width) & (y + width + shadow_right <= room_depth)).sum(axis=1)
+
+        # Pairwise terms, axis 1 is object i and axis 2 is object j
+        pairs = PairwiseGeometry(coords[:, :, :4], heights=height, other_heights=height)
+        upper = np.triu(np.ones((num_objects, num_objects), dtype=bool), k=1)
+        overlap = pairs.overlap & upper
+        min_dist = pairs.min_corner_distance
+        too_close = (10 < min_dist) & (min_dist < 30)
+
+        # The pair loop of object i ends at its first overlap (inclusive)
+        checked = upper & (np.cumsum(overlap, axis=2) - overlap == 0)
+        spacing_penalty = 5 * (checked & too_close).sum(axis=(1, 2))
+
+        # no_overlap as seen in iteration i: window/door hits up to i, pair overlaps of earlier objects
+        row_overlap = overlap.any(axis=2)
+        no_overlap = ~((np.cumsum(window_door_overlap, axis=1) > 0) |
+                       (np.cumsum(row_overlap, axis=1) - row_overlap > 0))
+
+        # 12. Objects on opposite walls, same rules as check_opposite_walls_distance
+        on_left, on_right, on_top, on_bottom = (walls[:, :, k] for k in range(4))
+        left_right = on_left[:, :, None] & on_right[:, None, :] & (pairs.gap_right < 60)
+        top_bottom = on_top[:, :, None] & on_bottom[:, None, :] & (pairs.gap_below < 60)
+        opposite_walls = ~(left_right.any(axis=(1, 2)) | top_bottom.any(axis=(1, 2)))
+
+        return [{
+            "no_overlap": 10 if no_overlap[b, -1] else 0,
+            "no_overlap_total": 10 * int(no_overlap[b].sum()),
+            "spacing_penalty": int(spacing_penalty[b]),
+            "shadow": int(shadow[b]),
+            "opposite_walls": bool(opposite_walls[b]),
+        } for b in range(len(placed_batch))]
 
 
 
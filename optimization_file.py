@@ -9,6 +9,7 @@ from utils_file import calculate_space_before_object
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from utils_file import windows_doors_overlap, check_euclidean_distance
+from algorithms.accessibility import AccessibilityMap
 
 def check_pathway_accessibility(placed_objects, room_sizes, windows_doors, path_width=60):
     """
@@ -28,250 +29,19 @@ def check_pathway_accessibility(placed_objects, room_sizes, windows_doors, path_
     """
     room_width, room_depth = room_sizes
     
-    # Create a grid for the room to check pathways
-    grid_resolution = 1  # cm per grid cell
-    grid_width = int(room_width / grid_resolution) + 1
-    grid_depth = int(room_depth / grid_resolution) + 1
-    
-    # Create a grid where 1 = occupied, 0 = free space
-    grid = np.zeros((grid_width, grid_depth))
-    
-    # Mark all objects on the grid
-    for obj in placed_objects:
-        x, y, width, depth, height, name, _, _, _ = obj
-        # Convert to grid coordinates
-        grid_x_start = max(0, int(x / grid_resolution))
-        grid_y_start = max(0, int(y / grid_resolution))
-        grid_x_end = min(grid_width, int((x + depth) / grid_resolution) + 1)
-        grid_y_end = min(grid_depth, int((y + width) / grid_resolution) + 1)
-        
-        # Mark object cells as occupied
-        grid[grid_x_start:grid_x_end, grid_y_start:grid_y_end] = 1
-    
-    # Function to check if there's a clear path of at least path_width
-    def has_clear_path(start_x, start_y, target_x, target_y):
-        """
-        Find a clear path from start to target that is at least path_width wide using A* algorithm.
-        The path can go in any direction (not just straight lines).
-        
-        Args:
-            start_x, start_y: Starting position in grid coordinates
-            target_x, target_y: Target position in grid coordinates
-        
-        Returns:
-            bool: True if there's a clear path, False otherwise
-            list: List of coordinates along the path if found, empty list otherwise
-        """
-        import heapq
-        
-        # Ensure start and target are within grid bounds
-        if (start_x < 0 or start_y < 0 or target_x < 0 or target_y < 0 or 
-            start_x >= grid_width or start_y >= grid_depth or 
-            target_x >= grid_width or target_y >= grid_depth):
-            print(f"Debug: Out of bounds - Start: ({start_x},{start_y}), Target: ({target_x},{target_y}), Grid: {grid_width}x{grid_depth}")
-            return False, []
-            
-        # Check if start position is occupied (can't start from inside an object)
-        if grid[start_x, start_y] == 1:
-            print(f"Debug: Start position ({start_x},{start_y}) is occupied")
-            return False, []
-            
-        # Create a temporary grid copy to allow reaching the target even if it's occupied
-        temp_grid = grid.copy()
-        
-        # Mark the target and adjacent cells as free, to ensure we can 'reach' the object
-        target_area_radius = 1  # Allow reaching 1 cell around the target
-        for dx in range(-target_area_radius, target_area_radius+1):
-            for dy in range(-target_area_radius, target_area_radius+1):
-                nx, ny = target_x + dx, target_y + dy
-                if 0 <= nx < grid_width and 0 <= ny < grid_depth:
-                    # Mark as free to allow reaching
-                    temp_grid[nx, ny] = 0
-            
-        # path_width in grid units
-        path_radius = max(1, int(path_width / grid_resolution) // 2)
-        print(f"Debug: Path radius = {path_radius}, Path width = {path_width}")
-        
-        # Define possible movement directions (including diagonals)
-        directions = [
-            (-1, 0), (1, 0), (0, -1), (0, 1),  # Cardinal directions
-            (-1, -1), (-1, 1), (1, -1), (1, 1)    # Diagonal directions
-        ]
-        
-        # Movement costs (regular and diagonal)
-        costs = [1, 1, 1, 1, 1.414, 1.414, 1.414, 1.414]  # sqrt(2) for diagonal moves
-        
-        # Heuristic function - Manhattan distance
-        def heuristic(x, y):
-            return abs(x - target_x) + abs(y - target_y)
-        
-        # Check if a position has adequate clearance for the path width
-        def has_adequate_clearance(x, y):
-            for r_x in range(-path_radius, path_radius + 1):
-                for r_y in range(-path_radius, path_radius + 1):
-                    check_x, check_y = x + r_x, y + r_y
-                    # Skip points outside the grid bounds
-                    if check_x < 0 or check_y < 0 or check_x >= grid_width or check_y >= grid_depth:
-                        continue
-                    # Check if there's an obstacle using our temporary grid
-                    if temp_grid[check_x, check_y] == 1:
-                        return False
-            return True
-        
-        # A* implementation
-        open_set = []  # Priority queue of nodes to explore
-        came_from = {}  # To reconstruct the path
-        g_score = {}  # Cost from start to current node
-        f_score = {}  # Estimated total cost from start to goal through current node
-        
-        # Initialize with starting point
-        start = (start_x, start_y)
-        goal = (target_x, target_y)
-        
-        # Initialize scores for start node
-        g_score[start] = 0
-        f_score[start] = heuristic(start_x, start_y)
-        
-        # Add start to open_set with priority f_score
-        heapq.heappush(open_set, (f_score[start], start))
-        
-        while open_set:
-            # Get node with lowest f_score
-            current_f, current = heapq.heappop(open_set)
-            current_x, current_y = current
-            
-            # Check if we've reached target or are close enough (within 2 cells)
-            if abs(current_x - target_x) <= 2 and abs(current_y - target_y) <= 2:
-                # Reconstruct the path
-                path = [current]
-                while current in came_from:
-                    current = came_from[current]
-                    path.append(current)
-                path.reverse()  # Start to goal
-                print(f"Debug: Path found from ({start_x},{start_y}) to ({target_x},{target_y})")
-                return True, path
-                
-            # Try each neighbor direction
-            for i, (dx, dy) in enumerate(directions):
-                next_x, next_y = current_x + dx, current_y + dy
-                neighbor = (next_x, next_y)
-                
-                # Check if the neighbor is within bounds of the grid
-                if next_x < 0 or next_y < 0 or next_x >= grid_width or next_y >= grid_depth:
-                    continue
-                
-                # Check if there's adequate clearance for the path width
-                if not has_adequate_clearance(next_x, next_y):
-                    continue
-                    
-                # Calculate tentative g_score (cost from start to neighbor through current)
-                tentative_g_score = g_score.get(current, float('inf')) + costs[i]
-                
-                # If this path is better than any previous one
-                if tentative_g_score < g_score.get(neighbor, float('inf')):
-                    # Record this path
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + heuristic(next_x, next_y)
-                    
-                    # Add to open_set if not already there
-                    if neighbor not in [item[1] for item in open_set]:
-                        heapq.heappush(open_set, (f_score[neighbor], neighbor))
-        
-        # If we get here, no path was found
-        print(f"Debug: No path found from ({start_x},{start_y}) to ({target_x},{target_y})")
-        return False, []
+    # Clearance map of the room on a 1 cm grid, computed once for all doors and objects
+    accessibility = AccessibilityMap(room_width, room_depth, [obj[:4] for obj in placed_objects], path_width)
     
     # Get door positions
     door_positions = []
-    
     for door in windows_doors:
         if 'door' in door[0].lower():  # Only check actual doors, not windows
-            door_type = door[1]  # wall type (top, bottom, left, right)
-            door_x, door_y = door[2], door[3]  # position
-            door_width = door[4]  # width
-            
-            # Calculate the center of the door
-            if door_type in ["top", "bottom"]:
-                # For top/bottom doors, the y-coordinate is the position + half the width
-                door_center_y = door_y + door_width/2
-                # X-coordinate depends on which wall
-                door_center_x = 0 if door_type == "top" else room_width
-            else:  # left or right
-                # For left/right doors, the x-coordinate is the position + half the width
-                door_center_x = door_x + door_width/2
-                # Y-coordinate depends on which wall
-                door_center_y = 0 if door_type == "left" else room_depth
-            
-            # Convert to grid coordinates
-            door_grid_x = int(door_center_x / grid_resolution)
-            door_grid_y = int(door_center_y / grid_resolution)
-            
-            # Ensure the door position is inside the grid
-            door_grid_x = max(0, min(grid_width-1, door_grid_x))
-            door_grid_y = max(0, min(grid_depth-1, door_grid_y))
-            
-            print(f"Door at wall {door_type} converted to grid: ({door_grid_x}, {door_grid_y})")
-            door_positions.append((door_grid_x, door_grid_y))
+            # wall type (top, bottom, left, right), position and width
+            door_positions.append(accessibility.door_cell(door[1], door[2], door[3], door[4]))
     
-    # Check pathway from each door to each object
-    accessible_objects = set()
-    inaccessible_objects = set()
-    accessible_paths = []
-    
-    for door_grid_x, door_grid_y in door_positions:
-        for i, obj in enumerate(placed_objects):
-            x, y, width, depth, height, name, _, _, _ = obj
-            
-            # Get multiple points around the object's perimeter and interior for more realistic accessibility
-            perimeter_points = []
-            
-            # Perimeter edges - sample points around all sides of the object
-            spacing = max(5, min(10, int(min(width, depth) / 4)))  # Dynamic sampling based on object size
-            
-            # Left edge (x constant, y varies)
-            for j in range(0, int(width), spacing):
-                perimeter_points.append((int(x / grid_resolution), int((y + j) / grid_resolution)))
-            
-            # Right edge (x+depth constant, y varies)
-            for j in range(0, int(width), spacing):
-                perimeter_points.append((int((x + depth) / grid_resolution), int((y + j) / grid_resolution)))
-            
-            # Top edge (y constant, x varies)
-            for j in range(0, int(depth), spacing):
-                perimeter_points.append((int((x + j) / grid_resolution), int(y / grid_resolution)))
-            
-            # Bottom edge (y+width constant, x varies)
-            for j in range(0, int(depth), spacing):
-                perimeter_points.append((int((x + j) / grid_resolution), int((y + width) / grid_resolution)))
-            
-            # Add the four corners
-            perimeter_points.append((int(x / grid_resolution), int(y / grid_resolution)))  # Top-left
-            perimeter_points.append((int((x + depth) / grid_resolution), int(y / grid_resolution)))  # Top-right
-            perimeter_points.append((int(x / grid_resolution), int((y + width) / grid_resolution)))  # Bottom-left
-            perimeter_points.append((int((x + depth) / grid_resolution), int((y + width) / grid_resolution)))  # Bottom-right
-            
-            # Add center point of the object
-            perimeter_points.append((int((x + depth/2) / grid_resolution), int((y + width/2) / grid_resolution)))
-            
-            # Remove duplicates
-            perimeter_points = list(set(perimeter_points))
-            
-            # Check if any perimeter point has a clear path to the door
-            has_access = False
-            for point_x, point_y in perimeter_points:
-                path_exists, path_coords = has_clear_path(door_grid_x, door_grid_y, point_x, point_y)
-                if path_exists:
-                    # Store the actual path found by BFS
-                    accessible_paths.append(path_coords)
-                    
-                    has_access = True
-                    accessible_objects.add(i)
-                    break
-            
-            # If no accessible path was found for this object from this door
-            if not has_access:
-                inaccessible_objects.add(i)
+    # One labelling of the pathway cells answers every door and object
+    accessible_objects = accessibility.accessible_objects(door_positions) if door_positions else set()
+    inaccessible_objects = set(range(len(placed_objects))) - accessible_objects if door_positions else set()
     
     # Calculate accessibility score
     # If no objects are accessible, score is 0
@@ -282,9 +52,6 @@ def check_pathway_accessibility(placed_objects, room_sizes, windows_doors, path_
     else:
         accessibility_score = len(accessible_objects) / len(placed_objects) * 10
     
-    # Remove objects from inaccessible_objects that were found accessible from other doors
-    inaccessible_objects = inaccessible_objects - accessible_objects
-    
     return accessibility_score, accessible_objects, inaccessible_objects
 
 def evaluate_room_layout(placed_objects, room_sizes, object_types_dict, windows_doors=None, requested_objects = []):
@@ -0,0 +1,131 @@
+"""
+Tests for the clearance map of the pathway accessibility check against the grid search it replaced
+"""
+import random
+from collections import deque
+
+import numpy as np
+import pytest
+
+from algorithms.accessibility import AccessibilityMap, chessboard_clearance, fill_from, label_components
+
+NEIGHBOURS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+
+def square_is_free(grid, radius):
+    """For every cell, whether the (2 radius + 1) square around it holds no occupied cell."""
+    padded = np.pad(grid.astype(int), ((radius + 1, radius), (radius + 1, radius)))
+    summed = padded.cumsum(0).cumsum(1)
+    size = 2 * radius + 1
+    counts = summed[size:, size:] - summed[:-size, size:] - summed[size:, :-size] + summed[:-size, :-size]
+    return counts == 0
+
+
+def old_has_clear_path(grid, path_radius, start, target):
+    """Reachability of the former A* search: the target's 3x3 cells are freed, arrival within 2 cells."""
+    width, depth = grid.shape
+    if not (0 <= target[0] < width and 0 <= target[1] < depth) or grid[start]:
+        return False
+    temp_grid = grid.copy()
+    temp_grid[max(0, target[0] - 1):target[0] + 2, max(0, target[1] - 1):target[1] + 2] = False
+    clear = square_is_free(temp_grid, path_radius)
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if abs(x - target[0]) <= 2 and abs(y - target[1]) <= 2:
+            return True
+        for dx, dy in NEIGHBOURS:
+            neighbour = (x + dx, y + dy)
+            if 0 <= neighbour[0] < width and 0 <= neighbour[1] < depth and neighbour not in seen and clear[neighbour]:
+                seen.add(neighbour)
+                queue.append(neighbour)
+    return False
+
+
+def old_targets(x, y, width, depth):
+    """Perimeter, corner and center points the former search tried to reach."""
+    spacing = max(5, min(10, int(min(width, depth) / 4)))
+    points = [(int(x), int(y + j)) for j in range(0, int(width), spacing)]
+    points += [(int(x + depth), int(y + j)) for j in range(0, int(width), spacing)]
+    points += [(int(x + j), int(y)) for j in range(0, int(depth), spacing)]
+    points += [(int(x + j), int(y + width)) for j in range(0, int(depth), spacing)]
+    points += [(int(x), int(y)), (int(x + depth), int(y)), (int(x), int(y + width)),
+               (int(x + depth), int(y + width)), (int(x + depth / 2), int(y + width / 2))]
+    return set(points)
+
+
+def random_rects(rng, room_width, room_depth, count, sizes):
+    rects = []
+    for _ in range(count):
+        width, depth = rng.randint(*sizes), rng.randint(*sizes)
+        x = rng.choice([0, rng.randint(0, room_width - depth), room_width - depth])
+        y = rng.choice([0, rng.randint(0, room_depth - width), room_depth - width])
+        rects.append((x, y, width, depth))
+    return rects
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_clearance_matches_square_scan(seed):
+    """Clearance above r exactly when the (2r+1) square around a cell is free"""
+    rng = np.random.default_rng(seed)
+    occupied = rng.random((70, 50)) < 0.02
+    clearance = chessboard_clearance(occupied, 9)
+    for radius in (1, 4, 8):
+        assert np.array_equal(clearance > radius, square_is_free(occupied, radius))
+
+
+@pytest.mark.parametrize("diagonal", [True, False])
+def test_fill_matches_breadth_first_search(diagonal):
+    """The run-based fill reaches the cells a plain search reaches"""
+    rng = np.random.default_rng(4)
+    mask = rng.random((60, 45)) < 0.6
+    seeds = np.zeros_like(mask)
+    seeds[0, :5] = seeds[30, 20] = True
+    steps = NEIGHBOURS if diagonal else NEIGHBOURS[:4]
+    expected = seeds & mask
+    queue = deque(zip(*np.nonzero(expected)))
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in steps:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < mask.shape[0] and 0 <= ny < mask.shape[1] and mask[nx, ny] and not expected[nx, ny]:
+                expected[nx, ny] = True
+                queue.append((nx, ny))
+    assert np.array_equal(fill_from(mask, seeds, diagonal), expected)
+
+
+@pytest.mark.parametrize("density", [0.5, 0.6, 0.7])
+def test_labels_are_the_connected_components(density):
+    """Each label covers exactly the cells a fill from one of its cells reaches"""
+    rng = np.random.default_rng(5)
+    mask = rng.random((40, 30)) < density
+    labels = label_components(mask)
+    assert np.array_equal(labels > 0, mask)
+    for label in np.unique(labels[mask]):
+        seeds = np.zeros_like(mask)
+        seeds[tuple(np.argwhere(labels == label)[0])] = True
+        assert np.array_equal(fill_from(mask, seeds), labels == label)
+
+
+@pytest.mark.parametrize("sizes", [(4, 8), (1, 3)], ids=["objects", "tiny objects"])
+@pytest.mark.parametrize("seed", range(6))
+def test_accessible_objects_match_the_former_search(seed, sizes):
+    """Objects reached from the doors are the ones the former A* search reached"""
+    rng = random.Random(seed)
+    room_width, room_depth, path_width = 50, 40, 8
+    rects = random_rects(rng, room_width, room_depth, 3, sizes)
+    accessibility = AccessibilityMap(room_width, room_depth, rects, path_width)
+    doors = [accessibility.door_cell(wall, x, y, 12) for wall, x, y in
+             rng.sample([("top", 0, 10), ("left", 20, 0), ("bottom", room_width, 5), ("right", 10, room_depth)], 2)]
+
+    expected = set()
+    for door in doors:
+        for index, (x, y, width, depth) in enumerate(rects):
+            if any(old_has_clear_path(accessibility.occupied, accessibility.path_radius, door, target)
+                   for target in old_targets(x, y, width, depth)):
+                expected.add(index)
+    assert accessibility.accessible_objects(doors) == expected
+    for door in doors:
+        for index in accessibility.accessible_objects([door]):
+            assert accessibility.path(door, index)[0] == door
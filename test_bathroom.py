@@ -0,0 +1,70 @@
+"""
+Tests for the copy-on-write storage of placed objects in Bathroom
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from models.bathroom import Bathroom
+from models.object import BathroomObject, PlacedObjectTable, object_type_code, object_type_name
+
+
+def make_entry(name, x, y, width=60, depth=50, height=85, wall="top"):
+    obj = BathroomObject(name, width, depth, height, shadow=(60, 0, 0, 0), position=(x, y), wall=wall)
+    return {"object": obj, "position": (x, y, width, depth, height, obj.shadow)}
+
+
+def test_clone_shares_parent_objects():
+    """A clone sees the parent's objects, and adding to the clone leaves the parent unchanged"""
+    bathroom = Bathroom(300, 250, 270)
+    bathroom.add_object(make_entry("sink", 0, 100))
+    clone = bathroom.clone()
+    clone.add_object(make_entry("toilet", 200, 0, 50, 60, 75, "left"))
+
+    assert [entry["object"].name for entry in bathroom.get_placed_objects()] == ["sink"]
+    assert [entry["object"].name for entry in clone.get_placed_objects()] == ["sink", "toilet"]
+    assert clone.get_placed_objects()[0] is bathroom.get_placed_objects()[0]
+
+
+def test_objects_view_is_read_only():
+    """In-place changes of the objects view fail instead of being silently lost"""
+    bathroom = Bathroom(300, 250, 270)
+    bathroom.add_object(make_entry("sink", 0, 100))
+    with pytest.raises(AttributeError):
+        bathroom.objects.append(make_entry("toilet", 200, 0))
+    with pytest.raises(AttributeError):
+        bathroom.objects.remove(bathroom.objects[0])
+
+    bathroom.objects = list(bathroom.objects) + [make_entry("toilet", 200, 0)]
+    assert len(bathroom.get_placed_objects()) == 2
+    bathroom.objects = []
+    assert bathroom.objects == ()
+
+
+def test_detach_objects_copies_entries():
+    """After detach_objects the entries may be edited without touching the clones they came from"""
+    bathroom = Bathroom(300, 250, 270)
+    bathroom.add_object(make_entry("sink", 0, 100))
+    clone = bathroom.clone()
+    clone.detach_objects()
+    clone.get_placed_objects()[0]["object"].position = (10, 100)
+
+    assert bathroom.get_placed_objects()[0]["object"].position == (0, 100)
+
+
+def test_type_codes_do_not_depend_on_first_use():
+    """Another process using the types in another order gives them the same codes"""
+    names = ["washing machine", "custom cabinet", "sink", "toilet"]
+    script = ("from models.object import object_type_code; "
+              f"print([object_type_code(name) for name in {names[::-1]!r}])")
+    other = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                           cwd=os.path.dirname(os.path.abspath(__file__)))
+    assert json.loads(other.stdout)[::-1] == [object_type_code(name) for name in names]
+
+    bathroom = Bathroom(300, 250, 270)
+    bathroom.add_object(make_entry("custom cabinet", 0, 100))
+    rows = bathroom.get_object_table().rows
+    assert object_type_name(rows[0, PlacedObjectTable.TYPE]) == "custom cabinet"
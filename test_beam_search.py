@@ -0,0 +1,183 @@
+"""
+Tests for the beam search and the branch-and-bound pruning of its children
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from algorithms.beam_search import (BeamSearch, decode_placement, decode_windows_doors, encode_placement,
+                                    encode_windows_doors, expand_encoded_layout)
+from algorithms.placement import DefaultPlacementStrategy
+from models.bathroom import Bathroom
+from models.layout import Layout, _get_cpp_scorer
+from models.object import BathroomObject
+from models.windows_doors import WindowsDoors
+from optimization.scoring import BathroomScoringFunction
+from utils.helpers import OBJECT_TYPES
+
+ROOMS = [
+    (250, 200, ["shower", "toilet", "sink"], ("door", "top", (0, 100), 80, 5, 210, "right", "inward")),
+    (300, 250, ["toilet", "sink", "shower"], ("door", "left", (0, 120), 80, 5, 210, "left", "inward")),
+    (200, 250, ["bathtub", "toilet", "sink"], ("door", "top", (0, 100), 80, 5, 210, "right", "inward")),
+]
+
+
+def make_room(width, depth, door):
+    bathroom = Bathroom(width, depth, 270, object_types=OBJECT_TYPES)
+    windows_doors = [WindowsDoors(*door)]
+    bathroom.add_window_door(windows_doors[0])
+    return bathroom, windows_doors
+
+
+def expand(layout, obj, windows_doors):
+    """Children of `layout` for every placement option of `obj`."""
+    bathroom = layout.bathroom
+    placements = DefaultPlacementStrategy().generate_options(
+        layout, obj, bathroom.OBJECT_TYPES[obj], bathroom.get_size(), bathroom.get_placed_objects(), windows_doors)
+    children = []
+    for placement in placements:
+        child = layout.clone()
+        child.bathroom.add_object(placement)
+        children.append(child)
+    return placements, children
+
+
+@pytest.mark.parametrize("room", ROOMS)
+def test_score_bounds_hold_for_every_backend(room):
+    """No child scores above its bound, whichever backend scores it"""
+    width, depth, objects, door = room
+    bathroom, windows_doors = make_room(width, depth, door)
+    scoring_function = BathroomScoringFunction()
+    scorers = [scoring_function] + [scorer for scorer in [_get_cpp_scorer()] if scorer is not None]
+    parents = [Layout(bathroom, list(objects))]
+    for obj in objects:
+        next_parents = []
+        for parent in parents:
+            placements, children = expand(parent, obj, windows_doors)
+            bounds = scoring_function.score_bounds(parent, placements)
+            for child, bound in zip(children, bounds):
+                for scorer in scorers:
+                    assert scorer.score(child)[0] <= bound + 1e-9
+            next_parents.extend(children[::max(1, len(children) // 4)])
+        parents = next_parents[:8]
+
+
+def transposed_children(objects):
+    """Two layouts of ROOMS[1] with the first option of every object, added in opposite orders."""
+    width, depth, _, door = ROOMS[1]
+    bathroom, windows_doors = make_room(width, depth, door)
+    placements = {obj: expand(Layout(bathroom, objects), obj, windows_doors)[0][0] for obj in objects}
+    children = []
+    for order in (objects, objects[::-1]):
+        child = Layout(make_room(width, depth, door)[0], objects)
+        for obj in order:
+            child.bathroom.add_object(placements[obj])
+        children.append(child)
+    return BeamSearch(bathroom, objects, beam_width=10), children
+
+
+def test_transpositions_reuse_scores_in_any_order():
+    """The same placements added in another order are not scored again"""
+    beam_search, children = transposed_children(["toilet", "washing machine"])
+    beam_search._evaluate_children(children[:1])
+    beam_search._evaluate_children(children[1:])
+    assert beam_search.transposition_hits == 1
+    assert children[1].score == children[0].score
+
+
+def test_order_sensitive_transpositions_are_scored_again():
+    """A sink changes the door the toilet terms start from, so their order is part of the entry"""
+    beam_search, children = transposed_children(["toilet", "sink"])
+    beam_search._evaluate_children(children[:1])
+    beam_search._evaluate_children(children[1:])
+    assert beam_search.transposition_hits == 0
+    assert children[1].score == BathroomScoringFunction().score(children[1])[0]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_scores_only_depend_on_the_order_of_order_sensitive_placements(seed):
+    """Shuffling the other placements around them leaves the total unchanged, and the breakdown without overlaps"""
+    rng = random.Random(seed)
+    scoring_function = BathroomScoringFunction()
+    names = ["toilet", "sink", "shower", "bathtub", "washing machine", "cabinet", "washing dryer"]
+    for _ in range(100):
+        width, depth, _, door = rng.choice(ROOMS)
+        entries = []
+        for name in rng.sample(names, rng.randint(2, 5)):
+            w, d = rng.choice([30, 45, 60, 80]), rng.choice([30, 45, 60])
+            x, y = rng.choice([0, width - d]), rng.randint(0, depth - w)
+            obj = BathroomObject(name, w, d, 85, shadow=(60, 0, 0, 0), position=(x, y),
+                                 wall=rng.choice(["top", "bottom", "top-left", "bottom-right"]))
+            entries.append({"object": obj, "position": (x, y, w, d, 85, obj.shadow)})
+        ordered = [entry for entry in entries
+                   if scoring_function.order_sensitive_placements([(None, entry["object"].name)])]
+        shuffled = entries[:]
+        rng.shuffle(shuffled)
+        ordered_slots = iter(ordered)
+        shuffled = [next(ordered_slots) if entry in ordered else entry for entry in shuffled]
+
+        results = []
+        for order in (entries, shuffled):
+            layout = Layout(make_room(width, depth, door)[0], names)
+            for entry in order:
+                layout.bathroom.add_object(entry)
+            results.append(scoring_function.score(layout))
+        assert results[1][0] == results[0][0]
+        if results[0][1]["no_overlap"]:
+            assert results[1][1] == results[0][1]
+
+
+# Beam of the seeded search in a 200x180 room
+SEEDED_BEAM = [
+    (99.019608, [("shower", (130, 0), "bottom-left"), ("sink", (125, 130), "right"), ("toilet", (0, 5), "top")]),
+    (73.186275, [("shower", (130, 110), "bottom-right"), ("sink", (70, 0), "left"), ("toilet", (130, 55), "bottom")]),
+    (93.137255, [("shower", (130, 0), "bottom-left"), ("sink", (90, 130), "right"), ("toilet", (0, 0), "top")]),
+    (72.843137, [("shower", (130, 110), "bottom-right"), ("sink", (70, 0), "left"), ("toilet", (130, 50), "bottom")]),
+    (93.137255, [("shower", (130, 0), "bottom-left"), ("sink", (125, 130), "right"), ("toilet", (0, 0), "top")]),
+]
+
+
+def seeded_beam(executor=None):
+    """(score, placements) of the beam of a seeded search in a 200x180 room, on `executor` if given."""
+    random.seed(1)
+    bathroom, windows_doors = make_room(200, 180, ("door", "left", (0, 60), 80, 5, 210, "left", "inward"))
+    beam = BeamSearch(bathroom, ["shower", "toilet"], beam_width=10, executor=executor).generate(
+        ["shower", "toilet"], windows_doors)
+    return [(round(layout.score, 6), [(p["object"].name, tuple(p["object"].position), p["object"].wall)
+                                      for p in layout.bathroom.get_placed_objects()]) for layout in beam]
+
+
+def test_seeded_search_output_is_unchanged():
+    """A seeded search keeps returning the same beam"""
+    assert seeded_beam() == SEEDED_BEAM
+
+
+@pytest.mark.parametrize("executor_type", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_parallel_expansion_gives_the_serial_beam(executor_type):
+    """Expanding the beam on an executor returns the beam of the serial search"""
+    with executor_type(max_workers=2) as executor:
+        assert seeded_beam(executor) == SEEDED_BEAM
+
+
+def test_encoded_expansion_matches_serial_children():
+    """A worker rebuilds the layout from its encoding and returns the children a serial expansion scores"""
+    width, depth, _, door = ROOMS[2]
+    bathroom, windows_doors = make_room(width, depth, door)
+    parent = Layout(bathroom, ["bathtub", "toilet", "sink"])
+    placements, _ = expand(parent, "bathtub", windows_doors)
+    parent.bathroom.add_object(placements[0])
+    assert [encode_placement(decode_placement(encode_placement(p))) for p in parent.bathroom.get_placed_objects()] \
+        == [encode_placement(p) for p in parent.bathroom.get_placed_objects()]
+    assert encode_windows_doors(decode_windows_doors(encode_windows_doors(windows_doors))) \
+        == encode_windows_doors(windows_doors)
+
+    scoring_function = BathroomScoringFunction()
+    task = (bathroom.get_size(), encode_windows_doors(windows_doors), encode_windows_doors(bathroom.windows_doors),
+            parent.requested_objects, [encode_placement(p) for p in parent.bathroom.get_placed_objects()],
+            "toilet", OBJECT_TYPES["toilet"], DefaultPlacementStrategy(), scoring_function)
+    results = expand_encoded_layout(task)
+    placements, children = expand(parent, "toilet", windows_doors)
+    Layout.evaluate_batch(children, scoring_function, True, total_only=True)
+    assert [result[0] for result in results] == [encode_placement(p) for p in placements]
+    assert [result[1] for result in results] == pytest.approx([child.score for child in children])
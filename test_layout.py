@@ -0,0 +1,115 @@
+"""
+Tests for Layout scoring state: lazy breakdowns and pickling
+"""
+import pickle
+import threading
+import time
+
+from models.bathroom import Bathroom
+from models.layout import Layout
+from models.object import BathroomObject
+from models.windows_doors import WindowsDoors
+from optimization.scoring import BathroomScoringFunction
+from utils.helpers import OBJECT_TYPES
+
+
+PLACEMENTS = (("toilet", 0, 0, 40, 60, "top-left"), ("sink", 190, 70, 60, 50, "bottom"))
+
+
+def make_layout(placements=PLACEMENTS, requested=("toilet", "sink")):
+    bathroom = Bathroom(250, 200, 270, object_types=OBJECT_TYPES)
+    bathroom.add_window_door(WindowsDoors("door", "top", (0, 110), 80, 5, 210, "left", "inward"))
+    layout = Layout(bathroom, list(requested))
+    for name, x, y, width, depth, wall in placements:
+        obj = BathroomObject(name, width, depth, 85, shadow=(60, 0, 0, 0), position=(x, y), wall=wall)
+        layout.bathroom.add_object({"object": obj, "position": (x, y, width, depth, 85, obj.shadow)})
+    return layout
+
+
+def test_total_only_breakdown_matches_score():
+    """A breakdown computed on first read belongs to the stored total"""
+    scoring_function = BathroomScoringFunction()
+    layout = make_layout()
+    Layout.evaluate_batch([layout], scoring_function, total_only=True)
+    assert layout.score_result()[1] is None
+    assert layout.score_breakdown == scoring_function.score(make_layout())[1]
+
+
+def test_pending_breakdown_is_computed_once_for_concurrent_readers():
+    """Threads reading a pending breakdown all get it, not an empty one while another computes it"""
+    class SlowScorer:
+        calls = 0
+
+        def score(self, layout):
+            SlowScorer.calls += 1
+            time.sleep(0.05)
+            return 1.0, {"spacing": 10}
+
+    layout = make_layout()
+    layout.set_score(1.0, None, SlowScorer())
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(layout.score_breakdown)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"spacing": 10}] * 4
+    assert SlowScorer.calls == 1
+
+
+def test_scoring_leaves_the_shared_scorer_unchanged():
+    """Per-call results are returned, not stored on the scorer"""
+    scoring_function = BathroomScoringFunction()
+    before = dict(scoring_function.__dict__)
+    scoring_function.score(make_layout())
+    assert scoring_function.__dict__ == before
+
+
+def test_pickle_round_trip_keeps_pending_breakdown():
+    """Pickling computes a pending breakdown instead of pickling the scorer"""
+    scoring_function = BathroomScoringFunction()
+    layout = make_layout()
+    Layout.evaluate_batch([layout], scoring_function, total_only=True)
+    restored = pickle.loads(pickle.dumps(layout))
+
+    assert "_breakdown_source" not in layout.__getstate__()
+    assert restored.score == layout.score
+    assert restored.score_breakdown == scoring_function.score(make_layout())[1]
+    assert [entry["object"].name for entry in restored.bathroom.get_placed_objects()] == ["toilet", "sink"]
+
+
+def test_layouts_pickled_before_lazy_breakdowns_load():
+    """Old pickled layouts carry score_breakdown in their __dict__"""
+    old_state = dict(make_layout().__dict__)
+    del old_state["_score_breakdown"], old_state["_breakdown_source"]
+    old_state.update(score=42.0, score_breakdown={"spacing": 10})
+    layout = Layout.__new__(Layout)
+    layout.__setstate__(old_state)
+
+    assert layout.score_breakdown == {"spacing": 10}
+    assert layout.clone().score_breakdown == {"spacing": 10}
+    assert pickle.loads(pickle.dumps(layout)).score_breakdown == {"spacing": 10}
+
+
+def test_memo_matches_placements_in_an_order_keeping_the_score():
+    """A memoized total serves the same placements added in another order, unless the order changes the score"""
+    from utils.score_memo import ScoreMemo
+
+    class OtherBackend(BathroomScoringFunction):
+        pass
+
+    memo = ScoreMemo()
+    scoring_function = BathroomScoringFunction()
+    placements = (("toilet", 0, 0, 40, 60, "top-left"), ("washing machine", 190, 140, 60, 60, "bottom"))
+    requested = ("toilet", "washing machine")
+    layout = make_layout(placements, requested)
+    memo.put(layout, scoring_function, 42.0, {"spacing": 10})
+    assert memo.get(make_layout(placements, requested), scoring_function) == (42.0, {"spacing": 10})
+    # The breakdown of another order is computed for the layout itself
+    assert memo.get(make_layout(placements[::-1], requested), scoring_function) == (42.0, None)
+    assert memo.get(make_layout(placements[::-1], requested), OtherBackend()) is None
+
+    # Sinks rebind the walls the toilet is scored against
+    memo.put(make_layout(), scoring_function, 42.0, {"spacing": 10})
+    assert memo.get(make_layout(PLACEMENTS[::-1]), scoring_function) is None
@@ -0,0 +1,68 @@
+"""
+Tests for the layout cache keys and its on-disk tier
+"""
+from models.bathroom import Bathroom
+from models.layout import Layout
+from models.object import BathroomObject
+from models.windows_doors import WindowsDoors
+from optimization.scoring import BathroomScoringFunction
+from utils.helpers import OBJECT_TYPES
+from utils.layout_cache import LayoutCache, canonical_request_key
+
+DOOR = WindowsDoors("door", "top", (0, 100), 80, 5, 210, "left", "inward")
+
+
+def key(**kwargs):
+    return canonical_request_key(250, 200, 270, ["toilet", "sink"], [DOOR], 10, **kwargs)
+
+
+def test_key_changes_with_the_scorer_version():
+    """Results scored under other rules are not served"""
+    assert key(scorer_version=2) == key(scorer_version=2)
+    assert key(scorer_version=2) != key(scorer_version=3)
+    assert key(scorer_version=2) != key()
+
+
+def test_key_keeps_the_exact_dimensions():
+    """Rooms differing by less than a millimetre are not served each other's layouts"""
+    assert canonical_request_key(250, 200, 270, ["toilet"], [DOOR], 10) == \
+        canonical_request_key(250.0, 200.0, 270.0, ["toilet"], [DOOR], 10)
+    assert canonical_request_key(250, 200, 270, ["toilet"], [DOOR], 10) != \
+        canonical_request_key(250.05, 200, 270, ["toilet"], [DOOR], 10)
+    moved = WindowsDoors("door", "top", (0, 100.05), 80, 5, 210, "left", "inward")
+    assert canonical_request_key(250, 200, 270, ["toilet"], [DOOR], 10) != \
+        canonical_request_key(250, 200, 270, ["toilet"], [moved], 10)
+
+
+def test_key_changes_with_the_schema_version(monkeypatch):
+    """Results pickled by older code are not loaded"""
+    old_key = key(scorer_version=2)
+    monkeypatch.setattr("utils.layout_cache.CACHE_SCHEMA_VERSION", -1)
+    assert key(scorer_version=2) != old_key
+
+
+def test_unreadable_disk_entry_is_a_miss(tmp_path):
+    """A corrupt pickle is counted as a miss and removed"""
+    cache = LayoutCache(disk_dir=str(tmp_path))
+    (tmp_path / "abc.pkl").write_bytes(b"not a pickle")
+
+    assert cache.get("abc") is None
+    assert cache.misses == 1
+    assert not (tmp_path / "abc.pkl").exists()
+
+
+def test_layouts_survive_the_disk_tier(tmp_path):
+    """Layouts put by one process are loaded by another with their scores"""
+    bathroom = Bathroom(250, 200, 270, object_types=OBJECT_TYPES)
+    bathroom.add_window_door(DOOR)
+    layout = Layout(bathroom, ["toilet"])
+    toilet = BathroomObject("toilet", 40, 60, 85, shadow=(60, 0, 0, 0), position=(0, 0), wall="top-left")
+    layout.bathroom.add_object({"object": toilet, "position": (0, 0, 40, 60, 85, toilet.shadow)})
+    Layout.evaluate_batch([layout], BathroomScoringFunction(), total_only=True)
+    LayoutCache(disk_dir=str(tmp_path)).put("abc", [layout])
+
+    cache = LayoutCache(disk_dir=str(tmp_path))
+    (restored,) = cache.get("abc")
+    assert cache.disk_hits == 1
+    assert restored.score == layout.score
+    assert restored.score_breakdown == layout.score_breakdown
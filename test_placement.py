@@ -0,0 +1,79 @@
+"""
+Tests for the placement option generation of DefaultPlacementStrategy and its indexes
+"""
+import random
+
+import pytest
+
+from algorithms.placement import DefaultPlacementStrategy, PlacementCandidate
+from algorithms.wall_intervals import WallIntervalIndex
+from models.bathroom import Bathroom
+from models.layout import Layout
+from models.object import BathroomObject
+from models.windows_doors import WindowsDoors
+from utils.geometry import PlacementIndex, RoomGeometry
+from utils.helpers import OBJECT_TYPES, is_valid_placement
+
+OBJECT_ATTRIBUTES = ("object_type", "name", "width", "depth", "height", "shadow", "position", "wall")
+
+
+def make_layout(placed=()):
+    bathroom = Bathroom(300, 250, 270, object_types=OBJECT_TYPES)
+    windows_doors = [WindowsDoors("door", "top", (0, 100), 80, 5, 210, "left", "inward")]
+    bathroom.add_window_door(windows_doors[0])
+    layout = Layout(bathroom, ["toilet", "sink", "shower"])
+    for name, x, y, width, depth, wall in placed:
+        obj = BathroomObject(name, width, depth, 85, shadow=(60, 0, 0, 0), position=(x, y), wall=wall)
+        layout.bathroom.add_object({"object": obj, "position": (x, y, width, depth, 85, obj.shadow)})
+    return layout, windows_doors
+
+
+def options(layout, obj, windows_doors, method):
+    bathroom = layout.bathroom
+    return list(getattr(DefaultPlacementStrategy(), method)(
+        layout, obj, bathroom.OBJECT_TYPES[obj], bathroom.get_size(), bathroom.get_placed_objects(), windows_doors))
+
+
+@pytest.mark.parametrize("obj", ["shower", "toilet", "sink"])
+def test_candidates_build_the_generated_options(obj):
+    """iter_candidates yields the options of generate_options, in order, without building objects"""
+    layout, windows_doors = make_layout([("shower", 0, 0, 80, 80, "top-left")])
+    candidates = options(layout, obj, windows_doors, "iter_candidates")
+    entries = options(layout, obj, windows_doors, "generate_options")
+
+    assert candidates and all(isinstance(candidate, PlacementCandidate) for candidate in candidates)
+    assert len(candidates) == len(entries)
+    for candidate, entry in zip(candidates, entries):
+        built = candidate.entry()
+        assert built["position"] == entry["position"]
+        for attribute in OBJECT_ATTRIBUTES:
+            assert getattr(candidate, attribute) == getattr(entry["object"], attribute)
+            assert getattr(built["object"], attribute) == getattr(entry["object"], attribute)
+
+
+def test_indexes_agree_with_is_valid_placement():
+    """The placement index gives the result of is_valid_placement, the free wall intervals never drop a valid position"""
+    rng = random.Random(7)
+    for _ in range(40):
+        layout, windows_doors = make_layout([
+            ("sink", rng.choice([0, rng.uniform(0, 220)]), rng.choice([0, rng.uniform(0, 190)]),
+             rng.choice([40, 60.5]), rng.choice([40, 75.2]), rng.choice(["top", "left", "bottom-right"]))
+            for _ in range(rng.randint(1, 3))])
+        placed = layout.bathroom.get_placed_objects()
+        room_geometry = RoomGeometry(300, 250, windows_doors)
+        placement_index = PlacementIndex.from_objects(placed)
+        wall_index = WallIntervalIndex(placed, 300, 250, windows_doors, room_geometry)
+        for _ in range(200):
+            wall = rng.choice(["top", "bottom", "left", "right"])
+            width, depth = rng.choice([(60, 45), (40, 60)])
+            shadow = rng.choice([(0, 0, 0, 0), (60, 0, 0, 0), (0, 10, 10, 0)])
+            x, y = rng.choice([0, 300 - depth]), rng.randint(-5, 250)
+            if wall in ("left", "right"):
+                x, y = rng.randint(-5, 300), rng.choice([0, 250 - width])
+            rect = (x, y, width, depth, 85, wall)
+            valid = is_valid_placement(rect, placed, shadow, 300, 250, None)
+            assert placement_index.is_valid(rect, shadow, 300, 250) == valid
+            if valid and not room_geometry.windows_doors_overlap(x, y, width, depth, 85, list(shadow), "sink"):
+                assert wall_index.is_free(x, y, width, depth, shadow, wall)
+            if wall_index.is_free(x, y, width, depth, shadow, wall):
+                assert valid
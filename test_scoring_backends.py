@@ -0,0 +1,94 @@
+"""
+Tests for the C++ scoring bridge and its agreement with the Python scoring function
+"""
+import importlib.util
+
+import pytest
+
+CPP_BUILT = importlib.util.find_spec("optimization.cpp_scoring.cpp_bathroom_scoring") is not None
+requires_cpp = pytest.mark.skipif(not CPP_BUILT, reason="C++ scoring extension is not built")
+
+
+@requires_cpp
+def test_cpp_available_when_built():
+    """The wrapper reuses the extension imported by the package instead of loading it twice"""
+    import optimization.cpp_scoring as cpp_package
+    from optimization.cpp_scoring.python_wrapper import is_cpp_available
+    from models.layout import _get_cpp_scorer
+
+    assert cpp_package.CPP_AVAILABLE
+    assert is_cpp_available()
+    assert _get_cpp_scorer() is not None
+
+
+def random_layouts(seed, count):
+    """Random layouts with overlaps, corner walls, several doors and windows, for scoring only"""
+    import random
+
+    from models.bathroom import Bathroom
+    from models.layout import Layout
+    from models.object import BathroomObject
+    from models.windows_doors import WindowsDoors
+    from utils.helpers import OBJECT_TYPES
+
+    rng = random.Random(seed)
+    names = ["toilet", "sink", "shower", "bathtub", "double sink", "washing machine", "toilet bidet"]
+    walls = ["top", "bottom", "left", "right", "top-left", "top-right", "bottom-left", "bottom-right"]
+    layouts = []
+    for _ in range(count):
+        width, depth = rng.choice([(200, 180), (250, 200), (300, 300), (220, 260)])
+        bathroom = Bathroom(width, depth, 270, object_types=OBJECT_TYPES)
+        for _ in range(rng.randint(1, 2)):
+            wall = rng.choice(["top", "bottom", "left", "right"])
+            x = 0 if wall == "top" else width if wall == "bottom" else rng.randint(0, width - 90)
+            y = 0 if wall == "left" else depth if wall == "right" else rng.randint(0, depth - 90)
+            bathroom.add_window_door(WindowsDoors("door", wall, (x, y), 80, 5, 210,
+                                                  rng.choice(["left", "right"]), "inward"))
+        if rng.random() < 0.3:
+            bathroom.add_window_door(WindowsDoors("window", "left", (rng.randint(0, width - 60), 0),
+                                                  60, 5, 100, "left", "inward"))
+        layout = Layout(bathroom, rng.sample(names, 3))
+        for _ in range(rng.randint(1, 5)):
+            name = rng.choice(names)
+            w, d = rng.choice([30, 45, 60, 80, 90, 150]), rng.choice([30, 45, 60, 80])
+            x, y = rng.choice([0, rng.randint(0, width - d), width - d]), rng.choice([0, rng.randint(0, depth - w), depth - w])
+            obj = BathroomObject(name, w, d, 85, shadow=(60, 0, 0, 0), position=(x, y), wall=rng.choice(walls))
+            layout.bathroom.add_object({"object": obj, "position": (x, y, w, d, 85, obj.shadow)})
+        layouts.append(layout)
+    return layouts
+
+
+def assert_same_score(expected, actual):
+    assert actual[0] == pytest.approx(expected[0], abs=1e-6)
+    assert set(actual[1]) == set(expected[1])
+    for key, value in expected[1].items():
+        assert float(actual[1][key]) == pytest.approx(float(value), abs=1e-6), key
+
+
+@requires_cpp
+def test_cpp_scores_match_python():
+    """The C++ scorer gives the same total and breakdown as the Python scoring function"""
+    from models.layout import _get_cpp_scorer
+    from optimization.scoring import BathroomScoringFunction
+
+    scoring_function = BathroomScoringFunction()
+    cpp_scorer = _get_cpp_scorer()
+    layouts = random_layouts(0, 400)
+    for layout in layouts:
+        assert_same_score(scoring_function.score(layout), cpp_scorer.score(layout))
+    for layout, result in zip(layouts, cpp_scorer.score_batch(layouts)):
+        assert_same_score(scoring_function.score(layout), result)
+
+
+def test_space_terms_are_reported_but_not_scored(monkeypatch):
+    """The enclosed-space and corner-accessibility terms do not move the total score"""
+    from optimization.scoring import BathroomScoringFunction
+
+    scoring_function = BathroomScoringFunction()
+    for layout in random_layouts(3, 10):
+        total, breakdown = scoring_function.score(layout)
+        assert {"enclosed_spaces", "corner_accessibility"} <= set(breakdown)
+        with monkeypatch.context() as patch:
+            patch.setattr(BathroomScoringFunction, "_space_terms", staticmethod(lambda *args: (True, False)))
+            assert scoring_function.score(layout)[0] == total
+        assert scoring_function.score(layout, total_only=True)[0] == total
@@ -0,0 +1,70 @@
+"""
+Tests for the enclosed-space and corner-accessibility rule of the scoring function
+"""
+import numpy as np
+import pytest
+
+from algorithms.available_space import space_accessibility
+
+GRID = 10
+TOP_DOOR = [("top", 0, 100, 80)]
+
+
+def room(width=300, depth=300):
+    """Occupancy of a room with an object in the top-left corner"""
+    occupied = np.zeros((width // GRID, depth // GRID), dtype=bool)
+    occupied[:6, :6] = True
+    return occupied
+
+
+def test_open_room_is_accessible():
+    """No enclosed space, the empty corners reached from the door"""
+    assert space_accessibility(room(), GRID, TOP_DOOR) == (False, True)
+
+
+def test_empty_room_is_accessible():
+    """Clearance is counted towards both walls, so every empty corner is reached"""
+    occupied = np.zeros((30, 30), dtype=bool)
+    assert space_accessibility(occupied, GRID, TOP_DOOR) == (False, True)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_rule_does_not_depend_on_orientation(seed):
+    """Mirroring the room and its door does not change the result"""
+    rng = np.random.default_rng(seed)
+    occupied = np.zeros((30, 25), dtype=bool)
+    for _ in range(4):
+        x, y = rng.integers(0, 25), rng.integers(0, 20)
+        occupied[x:x + rng.integers(3, 9), y:y + rng.integers(3, 9)] = True
+    door = ("top", 0, 5 + 10 * int(rng.integers(0, 17)), 80)
+    mirrored_door = ("top", 0, 250 - door[2] - door[3], door[3])
+    assert space_accessibility(occupied, GRID, [door]) == space_accessibility(occupied[:, ::-1], GRID, [mirrored_door])
+
+
+def test_space_cut_off_from_door_is_enclosed():
+    """Walkable space behind a full-width row of objects is enclosed, its corners unreachable"""
+    occupied = room()
+    occupied[15:18, :] = True
+    assert space_accessibility(occupied, GRID, TOP_DOOR) == (True, False)
+
+
+def test_room_edges_seed_the_fill_without_doors():
+    """Without doors both sides of the row touch a wall, so nothing is enclosed"""
+    occupied = room()
+    occupied[15:18, :] = True
+    assert space_accessibility(occupied, GRID, []) == (False, True)
+
+
+def test_narrow_pocket_is_not_enclosed():
+    """A free pocket narrower than the pathway width does not count as space"""
+    occupied = room()
+    occupied[10:16, 10:16] = True
+    occupied[11:15, 11:15] = False
+    assert space_accessibility(occupied, GRID, TOP_DOOR) == (False, True)
+
+
+def test_occupied_corner_needs_no_pathway():
+    """A corner closed off by an object in it is still valid"""
+    occupied = room()
+    occupied[22:, 22:] = True
+    assert space_accessibility(occupied, GRID, TOP_DOOR) == (False, True)
@@ -0,0 +1,73 @@
+"""
+Tests for mapping layouts between the symmetric orientations of a room
+"""
+import pytest
+
+from algorithms.symmetry import SCORE_INVARIANT_TRANSFORMS, all_transforms, canonical_transform
+from models.bathroom import Bathroom
+from models.layout import Layout
+from models.object import BathroomObject
+from models.windows_doors import WindowsDoors
+from optimization.scoring import BathroomScoringFunction
+from utils.helpers import OBJECT_TYPES
+
+PLACED = [("toilet", 0, 0, 40, 60, "top-left"), ("sink", 190, 70, 60, 50, "bottom"),
+          ("shower", 0, 170, 80, 80, "top-right")]
+
+
+DOORS = [("door", "left", (100, 0), 80, 5, 210, "left", "inward"),
+         ("door", "top", (0, 90), 80, 5, 210, "right", "inward"),
+         ("door", "right", (20, 250), 90, 5, 210, "left", "outward"),
+         ("door", "bottom", (250, 150), 80, 5, 210, "right", "inward")]
+
+
+def make_layout(door=DOORS[0]):
+    bathroom = Bathroom(250, 250, 270, object_types=OBJECT_TYPES)
+    bathroom.add_window_door(WindowsDoors(*door))
+    layout = Layout(bathroom, ["toilet", "sink", "shower"])
+    for name, x, y, width, depth, wall in PLACED:
+        obj = BathroomObject(name, width, depth, 85, shadow=(60, 0, 0, 0), position=(x, y), wall=wall)
+        layout.bathroom.add_object({"object": obj, "position": (x, y, width, depth, 85, obj.shadow)})
+    layout.evaluate(BathroomScoringFunction())
+    return layout
+
+
+@pytest.mark.parametrize("transform", all_transforms()[1:], ids=repr)
+def test_mapped_layouts_are_scored_in_their_orientation(transform):
+    """The score of a mapped layout is the score of its own arrangement, not of the original"""
+    mapped = transform.map_layout(make_layout())
+    score, score_breakdown = BathroomScoringFunction().score(mapped)
+    assert mapped.score == score
+    assert mapped.score_breakdown == score_breakdown
+
+
+def test_mapping_back_gives_the_original_score():
+    """A transform followed by its inverse scores the original arrangement"""
+    layout = make_layout()
+    for transform in all_transforms():
+        restored = transform.inverse().map_layout(transform.map_layout(layout))
+        assert restored.score == layout.score
+
+
+@pytest.mark.parametrize("transform", SCORE_INVARIANT_TRANSFORMS, ids=repr)
+@pytest.mark.parametrize("door", DOORS, ids=lambda door: door[1])
+def test_rooms_are_only_shared_across_transforms_keeping_the_score(transform, door):
+    """The canonical room is searched for the room asked for, so both must score every layout alike"""
+    layout = make_layout(door)
+    mapped = transform.map_layout(layout)
+    assert mapped.score == pytest.approx(layout.score)
+    assert mapped.score_breakdown == pytest.approx(layout.score_breakdown)
+
+
+def test_canonical_transform_only_uses_invariant_transforms():
+    """Mirrored rooms are searched on their own, variants under all transforms share a canonical room"""
+    door = WindowsDoors(*DOORS[0])
+    canonical_rooms = set()
+    for transform in all_transforms():
+        width, depth = transform.room_size(300, 250)
+        windows_doors = [transform.map_windows_door(door, 300, 250)]
+        assert canonical_transform(width, depth, windows_doors) in SCORE_INVARIANT_TRANSFORMS
+        canonical = canonical_transform(width, depth, windows_doors, transforms=all_transforms())
+        mapped = canonical.map_windows_door(windows_doors[0], width, depth)
+        canonical_rooms.add((canonical.room_size(width, depth), mapped.wall, mapped.position, mapped.hinge))
+    assert len(canonical_rooms) == 1
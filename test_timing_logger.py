@@ -0,0 +1,38 @@
+"""
+Tests for the buffered timing logger
+"""
+import threading
+from collections import deque
+
+from utils import timing_logger
+from utils.timing_logger import TimingContext
+
+
+def test_buffered_records_keep_the_info_they_were_logged_with(monkeypatch):
+    """Later changes to a TimingContext's info do not reach records already buffered"""
+    monkeypatch.setattr(timing_logger, "_mode", "buffered")
+    monkeypatch.setattr(timing_logger, "_sample_rate", 1.0)
+    monkeypatch.setattr(timing_logger, "_buffer", deque(maxlen=100))
+    monkeypatch.setattr(timing_logger, "_ensure_writer", lambda: None)
+    monkeypatch.setattr(timing_logger, "flush_timing_log", lambda: 0)
+
+    with TimingContext("scoring") as tc:
+        tc.add_info({"children": 3})
+    tc.add_info({"children": 4})
+
+    assert timing_logger._buffer[-1][6]["children"] == 3
+
+
+def test_concurrent_flushes_write_records_in_order(monkeypatch):
+    """Flushes from several threads write every record once, in logging order"""
+    written = []
+    monkeypatch.setattr(timing_logger, "_buffer", deque(range(5000), maxlen=10000))
+    monkeypatch.setattr(timing_logger, "_write_records", written.extend)
+
+    threads = [threading.Thread(target=timing_logger.flush_timing_log) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert written == list(range(5000))
@@ -0,0 +1,504 @@
+"""
+Geometry helpers shared by placement and scoring.
+"""
+
+from functools import cached_property
+
+import numpy as np
+
+from utils.helpers import (check_single_overlap, check_overlap, calculate_overlap_area, get_opposite_wall,
+                           calculate_behind_door_space, calculate_before_door_space, windows_doors_overlap,
+                           has_free_side)
+
+# Depth of the door swing area kept free in front of a door
+DOOR_SHADOW = 75
+
+
+def shadow_rect(x, y, width, depth, shadow):
+    """Rectangle covered by an object and its shadow, as built by is_valid_placement."""
+    shadow_top, shadow_left, shadow_right, shadow_bottom = shadow
+    if shadow_top == 0 and shadow_left == 0 and shadow_right == 0 and shadow_bottom == 0:
+        return (x, y, width, depth)
+    return (x - shadow_top, y - shadow_left, width + shadow_left + shadow_right,
+            depth + shadow_top + shadow_bottom)
+
+
+def _bounds(rect, other):
+    """Closed bounding box (x0, x1, y0, y1) of two (x, y, width, depth) rectangles."""
+    return (min(rect[0], other[0]), max(rect[0] + rect[3], other[0] + other[3]),
+            min(rect[1], other[1]), max(rect[1] + rect[2], other[1] + other[2]))
+
+
+def _edges(rects):
+    """Start and end along x and y of (x, y, width, depth) rectangles, shape (..., n, 2 (start, end), 2 (x, y))."""
+    start = rects[..., :2]
+    edges = np.concatenate((start, start + rects[..., [3, 2]]), axis=-1)
+    return edges.reshape(edges.shape[:-1] + (2, 2))
+
+
+class PairwiseGeometry:
+    """
+    Pairwise geometry of object rectangles, computed with NumPy broadcasting.
+
+    `rects` and `others` hold (x, y, width, depth) rows, with shapes (..., n, 4)
+    and (..., m, 4); leading axes (e.g. a batch of layouts) broadcast. Every
+    matrix has shape (..., n, m) and entry [i, j] describes rects[i] against
+    others[j]:
+
+    - overlap: check_single_overlap of the two rectangles, with the height
+      check when `heights` and `other_heights` are given
+    - min_corner_distance: smallest distance between a corner of each
+    - gap_right / gap_left: free space along y from rects[i] to others[j] on
+      its right / left, where their x ranges touch (inf elsewhere)
+    - gap_below / gap_above: the same along x, where their y ranges touch
+    - overlap_area: calculate_overlap_area of the pairs that overlap, 0 elsewhere
+
+    The gaps are what check_opposite_walls_distance compares with its minimum
+    distance, the areas what calculate_space_before_object subtracts from the
+    space in front of an object. Only the overlap is computed up front, the
+    other matrices on first use.
+    """
+
+    def __init__(self, rects, others=None, heights=None, other_heights=None):
+        rects = np.asarray(rects, dtype=np.float64)
+        if others is None:
+            others, other_heights = rects, heights
+        others = np.asarray(others, dtype=np.float64)
+        self._rects1, self._rects2 = rects[..., :, None, :], others[..., None, :, :]
+        edges, other_edges = _edges(rects), _edges(others)
+        # (..., n, m, axis) start and end of both rectangles along x and y
+        self._edges1, self._edges2 = edges[..., :, None, :, :], other_edges[..., None, :, :, :]
+        self._start1, self._end1 = self._edges1[..., 0, :], self._edges1[..., 1, :]
+        self._start2, self._end2 = self._edges2[..., 0, :], self._edges2[..., 1, :]
+        start1, end1, start2, end2 = self._start1, self._end1, self._start2, self._end2
+
+        # Same rules as check_single_overlap: inside each other, or not apart along either axis
+        inside = (((start1 >= start2) & (end1 <= end2)).all(axis=-1) |
+                  ((start2 >= start1) & (end2 <= end1)).all(axis=-1))
+        apart = ((end1 <= start2) | (end2 <= start1)).any(axis=-1)
+        overlap = inside | ~apart
+        if heights is not None and other_heights is not None:
+            overlap &= (np.asarray(heights)[..., :, None] > 0) & (np.asarray(other_heights)[..., None, :] > 0)
+        self.overlap = overlap
+
+    @cached_property
+    def min_corner_distance(self):
+        # The x and y offsets of the 16 corner pairs are independent
+        offsets = np.abs(self._edges1[..., :, None, :] - self._edges2[..., None, :, :])
+        offsets = offsets.reshape(offsets.shape[:-3] + (4, 2)).min(axis=-2)
+        return np.sqrt((offsets * offsets).sum(axis=-1))
+
+    @cached_property
+    def _gaps(self):
+        touch = (self._start1 <= self._end2) & (self._end1 >= self._start2)
+        # The gap along one axis counts where the ranges along the other axis touch
+        across = touch[..., ::-1]
+        return (np.where(across, self._start2 - self._end1, np.inf),
+                np.where(across, self._start1 - self._end2, np.inf))
+
+    @cached_property
+    def overlap_area(self):
+        # calculate_overlap_area measures the third value along x and the fourth along y
+        rects1, rects2 = self._rects1, self._rects2
+        start = np.maximum(rects1[..., :2], rects2[..., :2])
+        end = np.minimum(rects1[..., :2] + rects1[..., 2:4], rects2[..., :2] + rects2[..., 2:4])
+        extent = np.maximum(0, end - start)
+        return np.where(self.overlap, extent[..., 0] * extent[..., 1], 0)
+
+    @property
+    def gap_below(self):
+        return self._gaps[0][..., 0]
+
+    @property
+    def gap_right(self):
+        return self._gaps[0][..., 1]
+
+    @property
+    def gap_above(self):
+        return self._gaps[1][..., 0]
+
+    @property
+    def gap_left(self):
+        return self._gaps[1][..., 1]
+
+
+def front_rects(rects, room_width, room_depth):
+    """
+    Space in front of objects, as calculate_space_before_object lays it out.
+
+    The space runs from the wall an object stands against to the opposite
+    wall. For objects in the middle of the room and in corners it is the
+    object's own rectangle, with the whole room and no area respectively.
+    calculate_space_before_object then subtracts the overlap_area of every
+    placed object (including the object itself) with the space.
+
+    Args:
+        rects: (n, 4) array of (x, y, width, depth) of the objects
+        room_width: Width of the room (x axis)
+        room_depth: Depth of the room (y axis)
+
+    Returns:
+        tuple: (n, 4) array of the spaces and (n,) array of their free area
+    """
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    x, y, width, depth = rects.T
+    top, left = x == 0, y == 0
+    bottom, right = x + depth >= room_width, y + width >= room_depth
+    corner = (top & left) | (top & right) | (bottom & left) | (bottom & right)
+    # First matching wall, in the order of calculate_space_before_object; the last row is the middle
+    wall = np.stack((corner, top, left, bottom, right, np.ones_like(top))).argmax(axis=0)
+    zero = np.zeros_like(x)
+    fronts = np.array([
+        (x, y, width, depth),
+        (x, y + width, depth, room_depth - width),
+        (x + depth, y, room_width - depth, width),
+        (x, zero, depth, y),
+        (zero, y, x, width),
+        (x, y, width, depth),
+    ])
+    front = fronts[wall, :, np.arange(len(rects))]
+    free = np.where(wall == 0, 0, front[:, 2] * front[:, 3])
+    free = np.where(wall == 5, room_width * room_depth - width * depth, free)
+    return front, free
+
+
+def opposite_wall_groups(obj):
+    """Return (left, right, top, bottom) membership of an object as used by check_opposite_walls_distance."""
+    wall = obj.wall.lower()
+    if wall in ("left", "right", "top", "bottom"):
+        return (wall == "left", wall == "right", wall == "top", wall == "bottom")
+    if wall not in ("top-left", "top-right", "bottom-left", "bottom-right"):
+        return (False, False, False, False)
+    vertical, horizontal = wall.split("-")
+    along_vertical = obj.width >= obj.depth
+    along_horizontal = obj.width <= obj.depth
+    return (horizontal == "left" and along_horizontal, horizontal == "right" and along_horizontal,
+            vertical == "top" and along_vertical, vertical == "bottom" and along_vertical)
+
+
+def _too_close_on_opposite_walls(obj, groups, other, other_groups, min_distance=60):
+    """Whether two objects break the rule of check_opposite_walls_distance, given their opposite_wall_groups."""
+    for left, right, left_groups, right_groups in ((obj, other, groups, other_groups),
+                                                   (other, obj, other_groups, groups)):
+        if left_groups[0] and right_groups[1]:
+            if (left.position[0] <= right.position[0] + right.depth and left.position[0] + left.depth >= right.position[0]
+                    and right.position[1] - (left.position[1] + left.width) < min_distance):
+                return True
+        if left_groups[2] and right_groups[3]:
+            if (left.position[1] <= right.position[1] + right.width and left.position[1] + left.width >= right.position[1]
+                    and right.position[0] - (left.position[0] + left.depth) < min_distance):
+                return True
+    return False
+
+
+class FeasibilityCheck:
+    """
+    Hard constraints of the bathroom scoring function, for one more object.
+
+    BathroomScoringFunction.score is 0 when two objects overlap, when objects
+    on opposite walls are closer than 60 cm, or when the (last) shower has no
+    free side. A FeasibilityCheck holds the placed objects of a layout, checks
+    them once, and then tells for a new object whether the layout with it
+    keeps all three rules, testing only the pairs of the new object. Only
+    the last shower counts, so a new shower is checked in place of an
+    earlier one.
+
+    The overlap of objects with windows and doors is left to the placement
+    option generators, which reject it before an option is built.
+    """
+
+    def __init__(self, placed_objects):
+        self._objects = [entry["object"] for entry in placed_objects]
+        self._groups = [opposite_wall_groups(obj) for obj in self._objects]
+        self._rects = [(obj.position[0], obj.position[1], obj.width, obj.depth) for obj in self._objects]
+        self._shower = None
+        for obj, rect in zip(self._objects, self._rects):
+            if obj.name.lower() == "shower":
+                self._shower = rect
+        self._pairs_feasible = not any(self._violates(obj, rect, groups, i) for i, (obj, rect, groups)
+                                       in enumerate(zip(self._objects, self._rects, self._groups)))
+        self.feasible = self._pairs_feasible and (self._shower is None or has_free_side(self._shower, self._rects))
+
+    def _violates(self, obj, rect, groups, count):
+        """Whether obj breaks the overlap or opposite-walls rule with one of the first `count` placed objects."""
+        for other, other_rect, other_groups in zip(self._objects[:count], self._rects, self._groups):
+            if check_overlap(rect + (obj.height,), other_rect + (other.height,)):
+                return True
+            if _too_close_on_opposite_walls(obj, groups, other, other_groups):
+                return True
+        return False
+
+    def allows(self, obj):
+        """
+        Whether the layout with `obj` placed keeps the hard constraints.
+
+        Args:
+            obj: The BathroomObject to add, at its position
+
+        Returns:
+            bool: False if the layout with obj would score 0 for an overlap, a
+                  too small opposite-walls distance or a shower without free side
+        """
+        if not self._pairs_feasible:
+            return False
+        rect = (obj.position[0], obj.position[1], obj.width, obj.depth)
+        if self._violates(obj, rect, opposite_wall_groups(obj), len(self._objects)):
+            return False
+        shower = rect if obj.name.lower() == "shower" else self._shower
+        return shower is None or has_free_side(shower, self._rects + [rect])
+
+
+class PlacementIndex:
+    """
+    Grid-bucketed index of the object and shadow rectangles of placed objects.
+
+    Each placed object is registered in every cell touched by the bounding box
+    of its object and shadow rectangles, so a validity check only compares a
+    candidate with the objects near it. Bathrooms rarely hold more than a few
+    objects; below `scan_limit` objects the cells are skipped and the
+    bounding boxes are scanned directly, which is cheaper at that size.
+
+    ``with_objects`` returns an extended copy and leaves the index it was called
+    on unchanged, so indexes can be shared between layouts like the occupancy grids.
+    """
+
+    def __init__(self, cell_size=100, scan_limit=16):
+        self.cell_size = cell_size
+        self.scan_limit = scan_limit
+        self._rects = []   # (object rectangle, shadow rectangle, bounding box) per placed object
+        self._cells = {}   # (i, j) -> tuple of indexes into _rects
+
+    def __len__(self):
+        return len(self._rects)
+
+    @classmethod
+    def from_objects(cls, placed_objects, cell_size=100):
+        """Build an index of placed {"object", "position"} entries."""
+        return cls(cell_size).with_objects(placed_objects)
+
+    def _cells_of(self, bounds):
+        x0, x1, y0, y1 = bounds
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(int(x0 // size), int(x1 // size) + 1)
+                for cy in range(int(y0 // size), int(y1 // size) + 1)]
+
+    def with_objects(self, placed_objects):
+        """Return a copy of the index with more placed objects added."""
+        index = PlacementIndex(self.cell_size, self.scan_limit)
+        index._rects = list(self._rects)
+        index._cells = dict(self._cells)
+        for entry in placed_objects:
+            obj = entry["object"]
+            rx, ry = obj.position[0], obj.position[1]
+            rect = (rx, ry, obj.width, obj.depth)
+            r_shadow = shadow_rect(rx, ry, obj.width, obj.depth, obj.shadow)
+            bounds = _bounds(rect, r_shadow)
+            i = len(index._rects)
+            index._rects.append((rect, r_shadow, bounds))
+            for cell in index._cells_of(bounds):
+                index._cells[cell] = index._cells.get(cell, ()) + (i,)
+        return index
+
+    def nearby(self, bounds):
+        """Indexes of the placed objects whose bounding box may touch the closed box `bounds`."""
+        if len(self._rects) < self.scan_limit:
+            return range(len(self._rects))
+        found = set()
+        cells = self._cells
+        for cell in self._cells_of(bounds):
+            found.update(cells.get(cell, ()))
+        return sorted(found)
+
+    def is_valid(self, new_rect, shadow_space, room_width, room_depth):
+        """
+        Same result as is_valid_placement(new_rect, placed_objects, shadow_space, ...).
+
+        Args:
+            new_rect: (x, y, width, depth, ...) of the new object
+            shadow_space: Shadow of the new object as (top, left, right, bottom)
+            room_width: Width of the room
+            room_depth: Depth of the room
+
+        Returns:
+            bool: True if the object fits in the room and does not collide with any placed object
+        """
+        x, y, width, depth = new_rect[0], new_rect[1], new_rect[2], new_rect[3]
+        if x < 0 or y < 0 or x + depth > room_width or y + width > room_depth:
+            return False
+        if not self._rects:
+            return True
+        object_space = (x, y, width, depth)
+        own_shadow = shadow_rect(x, y, width, depth, shadow_space)
+        x0, x1, y0, y1 = bounds = _bounds(object_space, own_shadow)
+
+        rects = self._rects
+        for i in self.nearby(bounds):
+            r_object_space, r_shadow_space, (rx0, rx1, ry0, ry1) = rects[i]
+            # Rectangles that do not even touch cannot overlap
+            if rx0 > x1 or x0 > rx1 or ry0 > y1 or y0 > ry1:
+                continue
+            if check_single_overlap(object_space, r_object_space):
+                return False
+            if check_single_overlap(own_shadow, r_object_space):
+                return False
+            if check_single_overlap(r_shadow_space, object_space):
+                return False
+        return True
+
+
+class RoomGeometry:
+    """
+    Door and window geometry of a room, computed once per request.
+
+    Windows and doors do not change during a search, but the swing areas,
+    behind/before-door zones and opposite walls derived from them used to be
+    recomputed for every placement candidate and every scored layout. A
+    RoomGeometry holds them for one room size and list of windows/doors; each
+    part is computed on first use, so rooms that never need a part never pay
+    for it (or fail on it).
+
+    Placement and scoring results are the same as with the helpers in
+    utils.helpers: windows_doors_overlap() matches the function of the same
+    name, and door_geometry() / doors() match what the scoring loop derives.
+    """
+
+    def __init__(self, room_width, room_depth, windows_doors):
+        self.room_width = room_width
+        self.room_depth = room_depth
+        self.windows_doors = windows_doors
+        # Lists may be extended later (Bathroom.add_window_door), remember what was compiled
+        self._compiled = tuple(windows_doors) if isinstance(windows_doors, list) else None
+        self._door_geometry = None
+        self._doors = None
+        self._overlap_checks = None
+        self._fingerprint = None
+
+    def matches(self, room_width, room_depth, windows_doors):
+        """Whether the geometry was built for this room size and these windows/doors."""
+        if room_width != self.room_width or room_depth != self.room_depth:
+            return False
+        if not isinstance(windows_doors, list) or self._compiled is None:
+            return windows_doors is self.windows_doors and self._compiled is None
+        return len(windows_doors) == len(self._compiled) and all(
+            a is b for a, b in zip(windows_doors, self._compiled))
+
+    def fingerprint(self):
+        """Hashable description of the room size and its windows/doors."""
+        if self._fingerprint is None:
+            windows_doors = self.windows_doors
+            if windows_doors is not None and not isinstance(windows_doors, list):
+                windows_doors = [windows_doors]
+            self._fingerprint = (self.room_width, self.room_depth, tuple(
+                (wd.name, str(wd.wall), tuple(wd.position), wd.width, wd.depth, wd.height,
+                 str(getattr(wd, "hinge", None)), str(getattr(wd, "way", None)))
+                for wd in windows_doors or []))
+        return self._fingerprint
+
+    def doors(self):
+        """Doors as seen by the scoring function (names starting with "door"), with their zones."""
+        if self._doors is None:
+            doors = []
+            for door_window in self.windows_doors or []:
+                if door_window.name.startswith("door"):
+                    x, y = door_window.position[0], door_window.position[1]
+                    width, depth, wall, hinge = door_window.width, door_window.depth, door_window.wall, door_window.hinge
+                    doors.append({
+                        "x": x,
+                        "y": y,
+                        "width": width,
+                        "depth": depth,
+                        "height": door_window.height,
+                        "wall": wall,
+                        "hinge": hinge,
+                        "opposite_wall": get_opposite_wall(wall),
+                        "behind_door_space": calculate_behind_door_space(x, y, width, depth, wall, hinge, self.room_width, self.room_depth),
+                        "before_door_space": calculate_before_door_space(x, y, width, depth, wall, hinge, self.room_width, self.room_depth),
+                    })
+            self._doors = doors
+        return self._doors
+
+    def door_geometry(self):
+        """
+        Door terms of the scoring function.
+
+        Returns:
+            dict: opposite_wall and door_wall of the last door, and the lists of
+                  behind_door_space and before_door_space rectangles of all doors
+        """
+        if self._door_geometry is None:
+            doors = self.doors()
+            self._door_geometry = {
+                "opposite_wall": doors[-1]["opposite_wall"] if doors else "",
+                "door_wall": doors[-1]["wall"] if doors else None,
+                "behind_door_space": [door["behind_door_space"] for door in doors],
+                "before_door_space": [door["before_door_space"] for door in doors],
+            }
+        return self._door_geometry
+
+    def _compile_overlap_checks(self):
+        """Precompute what windows_doors_overlap reads from the (last) window/door."""
+        windows_doors = self.windows_doors
+        if windows_doors is None:
+            return None
+        if isinstance(windows_doors, list):
+            if not windows_doors:
+                return {"door": False, "window": False}
+            wd = windows_doors[-1]
+        else:
+            wd = windows_doors
+        name = wd.name.lower()
+        wx, wy = wd.position[0], wd.position[1]
+        checks = {
+            "door": "door" in name,
+            "window": "window" in name,
+            "window_rect": (wx, wy, wd.width, wd.height),
+        }
+        if checks["door"]:
+            wall = wd.wall
+            if wall == "top":
+                checks["swing"] = (wx, wy, wd.width, DOOR_SHADOW)
+            elif wall == "bottom":
+                checks["swing"] = (wx - DOOR_SHADOW, wy, wd.width, DOOR_SHADOW)
+            elif wall == "left":
+                checks["swing"] = (wx, wy, DOOR_SHADOW, wd.width)
+            elif wall == "right":
+                checks["swing"] = (wx, self.room_depth - DOOR_SHADOW, DOOR_SHADOW, wd.width)
+            else:
+                # Unknown wall, leave it to windows_doors_overlap
+                return None
+            checks["behind_door_args"] = (wx, wy, wd.width, wd.height, wall, wd.hinge, self.room_width, self.room_depth)
+        return checks
+
+    def door_swing_rect(self):
+        """Swing area checked by windows_doors_overlap, or None."""
+        if self._overlap_checks is None:
+            self._overlap_checks = self._compile_overlap_checks() or {}
+        return self._overlap_checks.get("swing")
+
+    def windows_doors_overlap(self, x, y, width, depth, height, shadow, obj_type):
+        """Same result as windows_doors_overlap(windows_doors, x, y, 0, width, depth, height, ...)."""
+        if self._overlap_checks is None:
+            self._overlap_checks = self._compile_overlap_checks() or {}
+        checks = self._overlap_checks
+        if not checks:
+            return windows_doors_overlap(self.windows_doors, x, y, 0, width, depth, height,
+                                         self.room_width, self.room_depth, shadow, obj_type)
+        object_space = (x, y, width, depth)
+        if checks["door"]:
+            if check_overlap(checks["swing"], object_space):
+                return True
+            if "toilet" in obj_type.lower():
+                behind_door_space = checks.get("behind_door_space")
+                if behind_door_space is None:
+                    behind_door_space = checks["behind_door_space"] = calculate_behind_door_space(*checks["behind_door_args"])
+                if check_overlap(behind_door_space, object_space):
+                    overlap = calculate_overlap_area(behind_door_space, object_space)
+                    return overlap >= self.room_width * self.room_depth - 3600
+        if checks["window"]:
+            wx, wy, wwidth, wheight = checks["window_rect"]
+            if not(wx + wwidth <= x or x + width <= wx):
+                return True
+            if not(wy + wheight <= y or y + depth <= wy):
+                return True
+        return False
@@ -1809,6 +1809,8 @@ def optimize_object_sizes(layout):
         return layout
 
     bathroom = layout.bathroom
+    # Placed entries may be shared with other layouts of the beam
+    bathroom.detach_objects()
     room_width, room_depth, _ = bathroom.get_size()
     door_walls = bathroom.get_door_walls()
     windows_doors = getattr(bathroom, "windows_doors", None)
@@ -0,0 +1,169 @@
+"""
+Result cache for layout generation.
+This module caches beam search results keyed by a canonical form of the room request,
+so repeated requests for the same room do not run the search again.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+# Part of every cache key: bump it when the cached results change shape
+# (e.g. the pickled Layout attributes) or the key is built differently,
+# so older disk entries are not loaded
+CACHE_SCHEMA_VERSION = 3
+
+
+def _number(value):
+    """Normalize a number so that e.g. 200, 200.0 and -0.0/0 give the same key."""
+    return float(value) + 0.0
+
+
+def canonical_request_key(room_width: float, room_depth: float, room_height: float,
+                          objects_to_place: Iterable[str], windows_doors: Iterable[Any],
+                          beam_width: int, scorer_version: Any = None) -> str:
+    """
+    Build the cache key of a generation request.
+
+    Dimensions are kept exactly as validated (the search places objects against
+    the exact room and door coordinates), object names are lowercased and
+    sorted (the search sorts them by priority anyway) and windows/doors are
+    reduced to their normalized attributes. Windows/doors keep their order, as
+    scoring depends on it when there are several doors. The key also holds
+    CACHE_SCHEMA_VERSION and the version of the scoring rules, so results of
+    older code are never served.
+
+    Args:
+        room_width: Width of the room in cm
+        room_depth: Depth of the room in cm
+        room_height: Height of the room in cm
+        objects_to_place: Names of the requested objects
+        windows_doors: Windows and doors with name, wall, position, width, depth, height, hinge and way
+        beam_width: Beam width of the search
+        scorer_version: Version of the scoring function that scored the results
+
+    Returns:
+        Hex digest identifying the request
+    """
+    def text(value):
+        value = getattr(value, "value", value)  # enum members
+        return str(value).lower() if value is not None else ""
+
+    canonical = {
+        "room": [_number(room_width), _number(room_depth), _number(room_height)],
+        "objects": sorted(obj.lower() for obj in objects_to_place),
+        "windows_doors": [
+            [text(wd.name), text(wd.wall), [_number(v) for v in wd.position],
+             _number(wd.width), _number(wd.depth), _number(wd.height),
+             text(getattr(wd, "hinge", None)), text(getattr(wd, "way", None))]
+            for wd in windows_doors
+        ],
+        "beam_width": int(beam_width),
+        "schema": CACHE_SCHEMA_VERSION,
+        "scorer": text(scorer_version),
+    }
+    encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LayoutCache:
+    """
+    LRU cache of generation results with an optional on-disk tier.
+
+    The in-memory tier keeps the `max_entries` most recently used results. When
+    `disk_dir` is set, results are also pickled there and loaded back on a memory
+    miss, so they survive restarts and are shared between server processes.
+    Cached values are shared between requests and must not be modified.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.pkl"
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert into the memory tier, evicting the least recently used entries."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached result for `key`, or None, and count the hit or miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.disk_dir is not None:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    value = pickle.load(f)
+            except FileNotFoundError:
+                value = None
+            except Exception as e:
+                # Unreadable or written by incompatible code: a miss, and the next put replaces it
+                print(f"Error loading cached layout {key}: {str(e)}")
+                self._disk_path(key).unlink(missing_ok=True)
+                value = None
+            if value is not None:
+                with self._lock:
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result in memory and, if enabled, on disk."""
+        with self._lock:
+            self._remember(key, value)
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(value, f)
+                # Readers never see a partially written file
+                os.replace(tmp_path, path)
+            except Exception as e:
+                print(f"Error saving cached layout {key}: {str(e)}")
+                tmp_path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier and reset the counters (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the cache."""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_enabled": self.disk_dir is not None,
+            }
@@ -0,0 +1,70 @@
+"""
+Zobrist-style hashing of layouts.
+This module gives every placement a 64-bit key; the hash of a layout is the XOR
+of the keys of its placed objects. The hash does not depend on the order the
+objects were placed in, and adding an object only XORs one key into the hash
+of the parent layout.
+"""
+
+import hashlib
+
+_MASK = (1 << 64) - 1
+# Keys of the placements seen so far; cleared when it grows past _MAX_KEYS
+_keys = {}
+_MAX_KEYS = 1 << 20
+
+
+def zobrist_key(placement):
+    """Deterministic 64-bit key of a hashable placement description."""
+    key = _keys.get(placement)
+    if key is None:
+        if len(_keys) >= _MAX_KEYS:
+            _keys.clear()
+        digest = hashlib.blake2b(repr(placement).encode("utf-8"), digest_size=8).digest()
+        key = _keys[placement] = int.from_bytes(digest, "little") & _MASK
+    return key
+
+
+def canonical_placements(placements):
+    """Placement descriptions in an order that does not depend on the order they were placed in."""
+    return tuple(sorted(placements, key=zobrist_key))
+
+
+def scoring_placements(placements, scorer=None):
+    """
+    Placement descriptions that decide the score of a layout under `scorer`.
+
+    Layouts with equal descriptions get the same total score; overlapping
+    ones may still differ in the spacing term of their breakdown. Only the
+    placements the scorer reports as order sensitive (see
+    BathroomScoringFunction.order_sensitive_placements) keep their order; a
+    scorer that does not report them keeps the order of all placements.
+    """
+    ordered = getattr(scorer, "order_sensitive_placements", None)
+    if ordered is None:
+        return tuple(placements)
+    return canonical_placements(placements), ordered(placements)
+
+
+def signature_placement(entry):
+    """Placement as compared by BeamSearch.layout_signature: object type and rounded position."""
+    obj = entry["object"]
+    return (obj.object_type, round(obj.position[0], 2), round(obj.position[1], 2))
+
+
+def full_placement(entry):
+    """Everything about a placed object the scoring function reads."""
+    obj = entry["object"]
+    shadow = obj.shadow
+    if isinstance(shadow, list):
+        shadow = tuple(shadow)
+    return (obj.object_type, obj.name, obj.position[0], obj.position[1],
+            obj.width, obj.depth, obj.height, shadow, obj.wall)
+
+
+def xor_keys(placements):
+    """XOR of the Zobrist keys of several placements."""
+    value = 0
+    for placement in placements:
+        value ^= zobrist_key(placement)
+    return value
@@ -0,0 +1,107 @@
+"""
+Memo of layout scores.
+This module caches (score, score_breakdown) results of the scoring functions,
+keyed by the Zobrist hash of the layout and a fingerprint of the room, so
+arrangements that recur across beam entries are scored only once.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from utils.layout_hash import scoring_placements
+
+
+def room_fingerprint(bathroom) -> Tuple:
+    """Size, windows/doors and requested-independent state of a bathroom that scores depend on."""
+    return (bathroom.width, bathroom.depth, bathroom.height, bathroom.get_room_geometry().fingerprint())
+
+
+def scorer_fingerprint(scorer) -> Tuple:
+    """Backend (Python scoring function or C++ scorer) and room type of a scorer."""
+    scorer_type = type(scorer)
+    return (scorer_type.__module__, scorer_type.__qualname__, getattr(scorer, "room_type", None))
+
+
+class ScoreMemo:
+    """
+    LRU memo of layout scores.
+
+    Entries are keyed by the layout hash, the room fingerprint, the requested
+    objects and the scorer backend. An entry also stores the placements as
+    described by utils.layout_hash.scoring_placements, and is returned for a
+    layout with the same placements added in an order that keeps the score
+    (see BeamSearch._reuse_transpositions). The breakdown is only returned
+    for the same order, as it may differ for overlapping placements; it is
+    None for another order and for a layout scored total-only. Returned
+    breakdowns are copies, so callers may modify them.
+    """
+
+    def __init__(self, max_entries: int = 100000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(layout, scorer) -> Tuple:
+        """Memo key of a layout scored by `scorer` (a scoring function or C++ scorer)."""
+        bathroom = layout.bathroom
+        return (bathroom.get_layout_hash(), room_fingerprint(bathroom),
+                tuple(getattr(layout, "requested_objects", None) or ()), scorer_fingerprint(scorer))
+
+    def get(self, layout, scorer) -> Optional[Tuple[float, Dict[str, float]]]:
+        """Return the memoized (score, score_breakdown) of a layout, or None, and count the hit or miss."""
+        if self.max_entries <= 0:
+            return None
+        key = self.key(layout, scorer)
+        placements = tuple(layout.bathroom.get_placement_keys())
+        scored = scoring_placements(placements, scorer)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == scored:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if entry[3] is None or entry[1] != placements:
+                    return entry[2], None
+                return entry[2], dict(entry[3])
+            self.misses += 1
+        return None
+
+    def put(self, layout, scorer, score: float, score_breakdown: Optional[Dict[str, float]]) -> None:
+        """Remember the score of a layout, evicting the least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        key = self.key(layout, scorer)
+        placements = tuple(layout.bathroom.get_placement_keys())
+        entry = (scoring_placements(placements, scorer), placements, score,
+                 dict(score_breakdown) if score_breakdown is not None else None)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size of the memo."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# Process wide memo used by Layout.evaluate / Layout.evaluate_batch
+score_memo = ScoreMemo(max_entries=int(os.environ.get("SCORE_MEMO_SIZE", "100000")))
@@ -12,7 +12,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Tuple, Union
 
 # Import the logging module
-from utils.timing_logger import get_timing_summary
+from utils.timing_logger import get_timing_summary, flush_timing_log
 
 def load_timing_data() -> pd.DataFrame:
     """
@@ -21,6 +21,7 @@ def load_timing_data() -> pd.DataFrame:
     Returns:
         Pandas DataFrame containing the timing data
     """
+    flush_timing_log()
     csv_path = Path("logs") / "layout_timing.csv"
     if not csv_path.exists():
         return pd.DataFrame()
@@ -1,11 +1,24 @@
 """
 Timing logger utility for the bathroom layout generator.
 This module provides functions to track and log the time taken for various operations.
+
+Records are kept in an in-memory ring buffer and written to the log files in
+batches by a background thread. The behaviour is configured with environment
+variables or configure_timing_logger():
+
+    TIMING_LOG_MODE            "buffered" (default), "sync" (write on every call) or "off"
+    TIMING_LOG_SAMPLE_RATE     fraction of records to keep, between 0 and 1 (default 1)
+    TIMING_LOG_BUFFER_SIZE     records kept in memory, the oldest are dropped when full (default 10000)
+    TIMING_LOG_FLUSH_INTERVAL  seconds between background flushes (default 1)
 """
 
 import time
 import os
 import datetime
+import atexit
+import random
+import threading
+from collections import deque
 from pathlib import Path
 import csv
 from typing import Dict, Any, Optional, List
@@ -30,27 +43,62 @@ CSV_FIELDS = [
     "additional_info"
 ]
 
+LOG_MODES = ("buffered", "sync", "off")
+
+# Logger configuration, see configure_timing_logger()
+_mode = os.environ.get("TIMING_LOG_MODE", "buffered").lower()
+_sample_rate = float(os.environ.get("TIMING_LOG_SAMPLE_RATE", "1"))
+_flush_interval = float(os.environ.get("TIMING_LOG_FLUSH_INTERVAL", "1"))
+_buffer = deque(maxlen=int(os.environ.get("TIMING_LOG_BUFFER_SIZE", "10000")))
+# Own generator, sampling must not consume the global random state used by the search
+_sampler = random.Random()
+_dropped = 0
+# Held while records are taken from the buffer and written, so flushes never interleave
+_write_lock = threading.RLock()
+_wakeup = threading.Event()
+_writer_thread = None
+_writer_lock = threading.Lock()
+
 # Initialize CSV file if it doesn't exist
-if not CSV_FILE.exists():
+if _mode != "off" and not CSV_FILE.exists():
     with open(CSV_FILE, 'w', newline='') as f:
         writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
         writer.writeheader()
 
-def log_time(operation: str, duration_ms: float, layout_id: str = "", 
-             room_size: tuple = None, num_objects: int = 0,
-             additional_info: Dict[str, Any] = None) -> None:
+def configure_timing_logger(mode: Optional[str] = None, sample_rate: Optional[float] = None,
+                            buffer_size: Optional[int] = None, flush_interval: Optional[float] = None) -> None:
     """
-    Log the time taken for an operation.
+    Change the timing logger configuration at runtime.
     
     Args:
-        operation: Name of the operation being timed (e.g., "generation", "scoring")
-        duration_ms: Duration in milliseconds
-        layout_id: Identifier for the layout being processed (optional)
-        room_size: Tuple of (width, depth) of the room (optional)
-        num_objects: Number of objects being processed (optional)
-        additional_info: Additional information to include in the log (optional)
+        mode: "buffered", "sync" or "off" (optional)
+        sample_rate: Fraction of records to keep, between 0 and 1 (optional)
+        buffer_size: Maximum number of records kept in memory (optional)
+        flush_interval: Seconds between background flushes (optional)
     """
-    timestamp = datetime.datetime.now().isoformat()
+    global _mode, _sample_rate, _flush_interval, _buffer
+    if mode is not None:
+        if mode not in LOG_MODES:
+            raise ValueError(f"Unknown timing log mode '{mode}', expected one of {LOG_MODES}")
+        _mode = mode
+    if sample_rate is not None:
+        _sample_rate = min(max(float(sample_rate), 0.0), 1.0)
+    if flush_interval is not None:
+        _flush_interval = float(flush_interval)
+    if buffer_size is not None:
+        with _write_lock:
+            flush_timing_log()
+            _buffer = deque(_buffer, maxlen=int(buffer_size))
+    _wakeup.set()
+
+def timing_enabled() -> bool:
+    """Return False if timing records are discarded (no-op mode), so callers can skip measuring."""
+    return _mode != "off" and _sample_rate > 0
+
+def _format_record(record):
+    """Build the log line and CSV row of a buffered record."""
+    created, operation, duration_ms, layout_id, room_size, num_objects, additional_info = record
+    timestamp = datetime.datetime.fromtimestamp(created).isoformat()
     room_width = room_size[0] if room_size else 0
     room_depth = room_size[1] if room_size else 0
     
@@ -63,23 +111,125 @@ def log_time(operation: str, duration_ms: float, layout_id: str = "",
     if additional_info:
         log_message += f" | Info: {additional_info}"
     
+    row = {
+        "timestamp": timestamp,
+        "operation": operation,
+        "duration_ms": f"{duration_ms:.4f}",
+        "layout_id": layout_id,
+        "room_width": room_width,
+        "room_depth": room_depth,
+        "num_objects": num_objects,
+        "additional_info": str(additional_info) if additional_info else ""
+    }
+    return log_message, row
+
+def _write_records(records) -> None:
+    """Append records to the log and CSV files, opening each file once. Called with _write_lock held."""
+    if not records:
+        return
+    formatted = [_format_record(record) for record in records]
     # Write to the log file
     with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(log_message + "\n")
+        f.writelines(log_message + "\n" for log_message, _ in formatted)
     
     # Write to CSV file
+    write_header = not CSV_FILE.exists()
     with open(CSV_FILE, 'a', newline='', encoding='utf-8') as f:
         writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
-        writer.writerow({
-            "timestamp": timestamp,
-            "operation": operation,
-            "duration_ms": f"{duration_ms:.4f}",
-            "layout_id": layout_id,
-            "room_width": room_width,
-            "room_depth": room_depth,
-            "num_objects": num_objects,
-            "additional_info": str(additional_info) if additional_info else ""
-        })
+        if write_header:
+            writer.writeheader()
+        writer.writerows(row for _, row in formatted)
+
+def flush_timing_log() -> int:
+    """
+    Write all buffered records to the log files.
+    
+    Concurrent flushes (background thread, atexit, get_timing_summary) run one
+    at a time, so records are written in the order they were logged.
+    
+    Returns:
+        Number of records written
+    """
+    with _write_lock:
+        records = []
+        while True:
+            try:
+                records.append(_buffer.popleft())
+            except IndexError:
+                break
+        try:
+            _write_records(records)
+        except OSError as e:
+            print(f"Timing log flush failed: {e}")
+        return len(records)
+
+def get_dropped_records() -> int:
+    """Number of records dropped because the buffer was full."""
+    return _dropped
+
+def _writer_loop() -> None:
+    """Background thread flushing the buffer every flush interval, or earlier when it fills up."""
+    while True:
+        _wakeup.wait(_flush_interval)
+        _wakeup.clear()
+        flush_timing_log()
+
+def _ensure_writer() -> None:
+    """Start the background writer thread on first use."""
+    global _writer_thread
+    with _writer_lock:
+        if _writer_thread is None or not _writer_thread.is_alive():
+            _writer_thread = threading.Thread(target=_writer_loop, name="timing-log-writer", daemon=True)
+            _writer_thread.start()
+
+def _reset_after_fork() -> None:
+    """Child processes start with an empty buffer and their own writer thread."""
+    global _writer_thread, _write_lock, _writer_lock, _wakeup
+    _buffer.clear()
+    _writer_thread = None
+    _write_lock = threading.RLock()
+    _writer_lock = threading.Lock()
+    _wakeup = threading.Event()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+atexit.register(flush_timing_log)
+
+def log_time(operation: str, duration_ms: float, layout_id: str = "", 
+             room_size: tuple = None, num_objects: int = 0,
+             additional_info: Dict[str, Any] = None) -> None:
+    """
+    Log the time taken for an operation.
+    
+    The record is buffered and written by a background thread, unless the
+    logger is in "sync" mode. `additional_info` is copied, callers may keep
+    modifying it. Nothing is recorded in "off" mode or when the
+    record is not sampled.
+    
+    Args:
+        operation: Name of the operation being timed (e.g., "generation", "scoring")
+        duration_ms: Duration in milliseconds
+        layout_id: Identifier for the layout being processed (optional)
+        room_size: Tuple of (width, depth) of the room (optional)
+        num_objects: Number of objects being processed (optional)
+        additional_info: Additional information to include in the log (optional)
+    """
+    global _dropped
+    if _mode == "off" or (_sample_rate < 1 and _sampler.random() >= _sample_rate):
+        return
+    record = (time.time(), operation, duration_ms, layout_id, room_size, num_objects,
+              dict(additional_info) if additional_info else None)
+    if _mode == "sync":
+        with _write_lock:
+            _write_records([record])
+        return
+    if len(_buffer) == _buffer.maxlen:
+        _dropped += 1
+    _buffer.append(record)
+    if _writer_thread is None:
+        _ensure_writer()
+    if len(_buffer) * 2 >= _buffer.maxlen:
+        _wakeup.set()
 
 class TimingContext:
     """
@@ -107,6 +257,8 @@ class TimingContext:
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
+        if not timing_enabled():
+            return
         # Calculate duration when exiting the context
         end_time = time.time()
         duration_sec = (end_time - self.start_time)
@@ -148,6 +300,7 @@ def get_timing_summary(operation: Optional[str] = None,
     Returns:
         Dictionary containing summary statistics
     """
+    flush_timing_log()
     if not CSV_FILE.exists():
         return {"error": "No timing data available"}
     
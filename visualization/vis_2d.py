@@ -2,6 +2,7 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import numpy as np
 from utils.helpers import check_which_wall, convert_values
+from algorithms.accessibility import AccessibilityMap
 from models.layout import Layout
 from models.bathroom import Bathroom
 from models.windows_doors import WindowsDoors
@@ -387,93 +388,19 @@ class Visualizer2D:
         # Draw room boundaries
         ax.add_patch(patches.Rectangle((0, 0), self.room_depth, self.room_width, fill=False, edgecolor='black', linewidth=2))
         
-        # Create a grid for the room to check pathways
+        # Clearance map of the room on a 5 cm grid, shared by all doors and objects
         grid_resolution = 5  # cm per grid cell
-        grid_width = int(self.room_width / grid_resolution) + 1
-        grid_depth = int(self.room_depth / grid_resolution) + 1
+        accessibility = AccessibilityMap(self.room_width, self.room_depth,
+                                         [obj[:4] for obj in placed_objects], 60, grid_resolution)
+        grid_width = accessibility.grid_width
+        grid_depth = accessibility.grid_depth
         
-        # Create a grid where 1 = occupied, 0 = free space
-        grid = np.zeros((grid_width, grid_depth), dtype=bool)
-        
-        # Mark all objects on the grid
+        # Draw the objects
         for obj in placed_objects:
             x, y, width, depth, height, name, _, _, _ = obj
-            # Convert to grid coordinates
-            grid_x_start = max(0, int(x / grid_resolution))
-            grid_y_start = max(0, int(y / grid_resolution))
-            grid_x_end = min(grid_width, int((x + depth) / grid_resolution) + 1)
-            grid_y_end = min(grid_depth, int((y + width) / grid_resolution) + 1)
-            
-            # Mark object cells as occupied
-            grid[grid_x_start:grid_x_end, grid_y_start:grid_y_end] = 1
-            
-            # Draw the object
             ax.add_patch(patches.Rectangle((y, x), width, depth, fill=True, color='blue', alpha=0.7))
             ax.text(y + width/2, x + depth/2, name, ha="center", va="center", fontsize=10, fontweight="bold", color='white')
         
-        # Function to check if there's a clear path of at least 60cm width
-        def has_clear_path(start_x, start_y, target_x, target_y):
-            """
-            Find a clear path from start to target that is at least 60cm wide using BFS.
-            The path can go in any direction (not just straight lines).
-            
-            Args:
-            start_x, start_y: Starting position in grid coordinates
-            target_x, target_y: Target position in grid coordinates
-        
-            Returns:
-            bool: True if there's a clear path, False otherwise
-            list: List of coordinates along the path if found, empty list otherwise
-            """
-            # 60cm path width in grid units
-            path_width = int(60 / grid_resolution)
-            path_radius = path_width // 2
-            
-            # Create a visited grid to track which cells have been visited
-            visited = np.zeros_like(grid, dtype=bool)
-        
-            # Create a queue for BFS
-            queue = [(start_x, start_y, [(start_x, start_y)])]
-            visited[start_x, start_y] = True
-        
-            # Define possible movement directions (including diagonals)
-            directions = [
-                (-1, 0), (1, 0), (0, -1), (0, 1),  # Cardinal directions
-                (-1, -1), (-1, 1), (1, -1), (1, 1)    # Diagonal directions
-            ]
-        
-            while queue:
-                current_x, current_y, path = queue.pop(0)
-            
-                # Check if we've reached the target
-                if current_x == target_x and current_y == target_y:
-                    return True, path
-            
-                # Try all possible directions
-                for dx, dy in directions:
-                    new_x, new_y = current_x + dx, current_y + dy
-                    
-                    # Check if the new position is within grid bounds
-                    if (0 <= new_x < grid_width and 
-                        0 <= new_y < grid_depth and 
-                        not visited[new_x, new_y]):
-                        
-                        # Check if there's enough clearance for a 60cm wide path
-                        # We need to check a square area of path_width×path_width centered at the new position
-                        x_min = max(0, new_x - path_radius)
-                        x_max = min(grid_width, new_x + path_radius + 1)
-                        y_min = max(0, new_y - path_radius)
-                        y_max = min(grid_depth, new_y + path_radius + 1)
-                        
-                        # If there are no obstacles in this area, we can move here
-                        if not np.any(grid[x_min:x_max, y_min:y_max]):
-                            visited[new_x, new_y] = True
-                            new_path = path + [(new_x, new_y)]
-                            queue.append((new_x, new_y, new_path))
-        
-            # If we've explored all possible paths and haven't found the target, return False
-            return False, []
-        
         # Draw doors
         door_positions = []
         for door in self.windows_doors:
@@ -503,56 +430,15 @@ class Visualizer2D:
                 door_positions.append((door_grid_x, door_grid_y))
                 ax.text(door_y + door_width/2, door_x + 5, "Door", ha="center", va="center", fontsize=8, color='black')
         
-        # Check pathway from each door to each object
+        # Check pathway from each door to each object, from the shared labelling of the pathway cells
         accessible_objects = set()
         accessible_paths = []
         
-        for door_grid_x, door_grid_y in door_positions:
-            for i, obj in enumerate(self.objects):
-                x, y, width, depth, height, name, _, _, _ = obj
-                
-                # Get multiple points around the object's perimeter for more realistic accessibility
-                perimeter_points = []
-                
-                # Left side - multiple points along the left edge
-                for j in range(1, int(width / grid_resolution), 10):  # Check every 10cm
-                    perimeter_points.append((int(x / grid_resolution), int((y + j) / grid_resolution)))
-                
-                # Right side - multiple points along the right edge
-                for j in range(1, int(width / grid_resolution), 10):
-                    perimeter_points.append((int((x + depth) / grid_resolution), int((y + j) / grid_resolution)))
-                
-                # Top side - multiple points along the top edge
-                for j in range(1, int(depth / grid_resolution), 10):
-                    perimeter_points.append((int((x + j) / grid_resolution), int(y / grid_resolution)))
-                
-                # Bottom side - multiple points along the bottom edge
-                for j in range(1, int(depth / grid_resolution), 10):
-                    perimeter_points.append((int((x + j) / grid_resolution), int((y + width) / grid_resolution)))
-                
-                # Add the corners and midpoints of sides for good measure
-                perimeter_points.extend([
-                    (int(x / grid_resolution), int(y / grid_resolution)),  # top-left corner
-                    (int((x + depth) / grid_resolution), int(y / grid_resolution)),  # top-right corner
-                    (int(x / grid_resolution), int((y + width) / grid_resolution)),  # bottom-left corner
-                    (int((x + depth) / grid_resolution), int((y + width) / grid_resolution)),  # bottom-right corner
-                    (int(x / grid_resolution), int((y + width/2) / grid_resolution)),  # middle of left side
-                    (int((x + depth) / grid_resolution), int((y + width/2) / grid_resolution)),  # middle of right side
-                    (int((x + depth/2) / grid_resolution), int(y / grid_resolution)),  # middle of top side
-                    (int((x + depth/2) / grid_resolution), int((y + width) / grid_resolution))   # middle of bottom side
-                ])
-                
-                # Check if any perimeter point has a clear path to the door
-                has_access = False
-                for point_x, point_y in perimeter_points:
-                    path_exists, path_coords = has_clear_path(door_grid_x, door_grid_y, point_x, point_y)
-                    if path_exists:
-                        # Store the actual path found by BFS for visualization
-                        accessible_paths.append(path_coords)
-                        
-                        has_access = True
-                        accessible_objects.add(i)
-                        break
+        for door_cell in door_positions:
+            for i in sorted(accessibility.accessible_objects([door_cell])):
+                # Store a shortest pathway for visualization
+                accessible_paths.append(accessibility.path(door_cell, i))
+                accessible_objects.add(i)
         
         # Draw all accessible paths with 60cm width circles at each point
         path_radius = 30  # 60cm diameter / 2 = 30cm radius
@@ -594,8 +480,8 @@ class Visualizer2D:
                     fill=True, color='lightgreen', alpha=0.2, zorder=0
                 ))
         
-        # Highlight accessible vs inaccessible objects
-        for i, obj in enumerate(self.objects):
+        # Highlight accessible vs inaccessible objects (indexes of placed_objects, which the map was built from)
+        for i, obj in enumerate(placed_objects):
             x, y, width, depth, height, name, _, _, _ = obj
             if i in accessible_objects:
                 # Draw a green border around accessible objects